@@ -0,0 +1,127 @@
+import time
+from bisect import bisect_right
+
+class ConvergenceTrace:
+    """
+    Historique « anytime » d'un solveur : une entrée (temps écoulé, évaluations utilisées,
+    meilleur coût, meilleur chemin) est enregistrée à chaque amélioration.
+
+    Un seul run à la durée la plus longue suffit alors pour connaître le résultat qu'aurait
+    obtenu le solveur avec n'importe quel budget plus court (en temps ou en évaluations).
+    """
+    def __init__(self):
+        """
+        Initialise un historique vide.
+        """
+        self.times = []
+        self.evaluations = []
+        self.costs = []
+        self.paths = []
+
+    def record(self, elapsed, evaluations, cost, path):
+        """
+        Enregistre une amélioration du meilleur coût.
+        """
+        self.times.append(elapsed)
+        self.evaluations.append(evaluations)
+        self.costs.append(cost)
+        self.paths.append(list(path))
+
+    def best_at(self, duration):
+        """
+        Renvoie le meilleur (chemin, coût) connu après `duration` secondes,
+        ou (None, inf) si aucun chemin n'avait encore été trouvé.
+        """
+        return self._best(bisect_right(self.times, duration) - 1)
+
+    def best_within_evaluations(self, max_evaluations):
+        """
+        Renvoie le meilleur (chemin, coût) connu après `max_evaluations` évaluations.
+        """
+        return self._best(bisect_right(self.evaluations, max_evaluations) - 1)
+
+    def _best(self, index):
+        if index < 0:
+            return None, float('inf')
+        return self.paths[index], self.costs[index]
+
+    def to_records(self):
+        """
+        Renvoie l'historique sous forme de liste de dictionnaires (sérialisable en JSON).
+        """
+        return [
+            {"elapsed": t, "evaluations": e, "cost": c, "path": p}
+            for t, e, c, p in zip(self.times, self.evaluations, self.costs, self.paths)
+        ]
+
+    def __len__(self):
+        return len(self.times)
+
+class ShiftedTrace:
+    """
+    Vue d'un `ConvergenceTrace` pour une étape qui commence après un travail déjà fait
+    (étape précédente d'un solveur composé, run précédent repris d'un `SolverState`) : les entrées sont
+    décalées de `elapsed` secondes et `evaluations` évaluations, et seules les améliorations sont gardées.
+    """
+    def __init__(self, trace, elapsed, evaluations):
+        self.trace, self.elapsed, self.evaluations = trace, elapsed, evaluations
+
+    def record(self, elapsed, evaluations, cost, path):
+        if not len(self.trace) or cost < self.trace.costs[-1]:
+            self.trace.record(self.elapsed + elapsed, self.evaluations + evaluations, cost, path)
+
+    def __len__(self):
+        return len(self.trace)
+
+    @property
+    def costs(self):
+        return self.trace.costs
+
+class SearchBudget:
+    """
+    Budget d'un solveur, en secondes (`duration`), en nombre d'évaluations (`max_evaluations`)
+    ou les deux : le premier épuisé arrête la recherche.
+    Un budget en évaluations rend les comparaisons indépendantes de la charge de la machine.
+    """
+    def __init__(self, duration=None, max_evaluations=None):
+        """
+        Initialise le budget et démarre le chronomètre.
+        """
+        if duration is None and max_evaluations is None:
+            raise ValueError("Il faut fixer une durée, un nombre d'évaluations, ou les deux.")
+        self.duration = duration
+        self.max_evaluations = max_evaluations
+        self.start_time = time.time()
+
+    def elapsed(self):
+        """
+        Renvoie le temps écoulé depuis le début de la recherche.
+        """
+        return time.time() - self.start_time
+
+    def exhausted(self, evaluations):
+        """
+        Indique si le budget est épuisé après `evaluations` évaluations.
+        """
+        if self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            return True
+        return self.duration is not None and self.elapsed() >= self.duration
+
+    def remaining_evaluations(self, evaluations):
+        """
+        Renvoie le nombre d'évaluations encore autorisées (inf sans limite en évaluations).
+        """
+        if self.max_evaluations is None:
+            return float('inf')
+        return max(0, self.max_evaluations - evaluations)
+
+    def progress(self, evaluations):
+        """
+        Renvoie la fraction consommée du budget (entre 0 et 1), selon la limite la plus avancée.
+        """
+        fractions = []
+        if self.duration:
+            fractions.append(self.elapsed() / self.duration)
+        if self.max_evaluations:
+            fractions.append(evaluations / self.max_evaluations)
+        return min(1.0, max(fractions, default=1.0))
@@ -1,7 +1,11 @@
 import networkx as nx
 import subprocess
 import random
-from blackbox_interface import get_path_cost_with_blackbox
+import numpy as np
+from anytime import SearchBudget
+from blackbox_interface import get_path_cost, get_path_costs
+from graph_utils import CSRGraph, compute_hop_distances
+from rollouts import generate_random_paths, hop_length_cap
 
 def generate_random_path(G, start, target):
     """
@@ -30,6 +34,36 @@ def generate_random_path(G, start, target):
 
     return path
 
+def generate_guided_path(G, start, target, hops, max_length):
+    """
+    Variante bornée de `generate_random_path` : seuls les voisins depuis lesquels la cible reste
+    atteignable dans la limite de `max_length` arcs (d'après les distances en sauts `hops`) sont tirés.
+    Le chemin compte donc au plus `max_length` arcs, quelle que soit la taille du graphe.
+    """
+    path = [start]
+    current_node = start
+    previous_node = None
+
+    while current_node != target:
+        remaining = max_length - len(path)
+        neighbors = [neighbor for neighbor in G.neighbors(current_node) if hops[neighbor] <= remaining]
+        if not neighbors:
+            raise ValueError(f"Cible {target} inaccessible en {max_length} arcs depuis le nœud {start}.")
+
+        if previous_node in neighbors and len(neighbors) > 1:
+            neighbors.remove(previous_node)
+
+        if target in neighbors:
+            path.append(target)
+            break
+
+        next_node = random.choice(neighbors)
+        path.append(next_node)
+        previous_node = current_node
+        current_node = next_node
+
+    return path
+
 def compute_num_random_paths(num_nodes, density, alpha=0.1, beta=0.5):
     """
     Calcule dynamiquement le nombre de chemins aléatoires à générer
@@ -39,11 +73,101 @@ def compute_num_random_paths(num_nodes, density, alpha=0.1, beta=0.5):
 
 
 
-def baseline_method(G, source, target, seed, blackbox_path, density=None, num_random_paths=None):
+def beam_search(G, source, target, seed, blackbox_path, beam_width, completions=1, max_stretch=None, duration=None,
+                max_evaluations=None):
+    """
+    Recherche en faisceau : à chaque couche, chaque préfixe du faisceau est prolongé vers ses voisins
+    non visités, et chaque candidat reçoit `completions` complétions aléatoires simples vers `target`
+    (`generate_random_paths`, nœuds du préfixe exclus). Toutes les complétions de la couche sont évaluées
+    en un seul lot ; un candidat vaut le coût de sa meilleure complétion (un candidat arrivé à `target`, son
+    propre coût). Un préfixe dont la meilleure complétion ne bat pas le meilleur coût connu avant la couche
+    est abandonné ; les `beam_width` meilleurs candidats restants, chemins complets compris, forment
+    la couche suivante, et la recherche s'arrête quand il n'y reste plus de préfixe à prolonger.
+    Deux candidats qui visitent les mêmes nœuds et s'arrêtent au même endroit sont fusionnés,
+    et un chemin n'est jamais évalué deux fois.
+    Le budget, facultatif, est `duration` secondes et/ou `max_evaluations` chemins évalués.
+    Renvoie le meilleur chemin complet évalué et son coût.
+    """
+    csr = CSRGraph.from_networkx(G)
+    rng = np.random.default_rng(random.getrandbits(64))
+    hops = compute_hop_distances(G, target)
+    max_length = hop_length_cap(hops, source, max_stretch) if max_stretch else csr.num_nodes - 1
+    budget = SearchBudget(duration, max_evaluations) if duration or max_evaluations else None
+    degrees = np.diff(csr.indptr)
+    arc_weights = np.ones(csr.num_edges)
+    known_costs = {}
+    best_path, best_cost = None, float('inf')
+    beam = [[source]] if source != target else []
+    layer = 0
+    evaluations = 0
+
+    while beam and (budget is None or not budget.exhausted(evaluations)):
+        layer += 1
+        candidates = {}
+        for prefix in beam:
+            visited = frozenset(prefix)
+            for neighbor in csr.neighbors(prefix[-1]).tolist():
+                if neighbor not in visited and len(prefix) + hops[neighbor] <= max_length:
+                    candidates.setdefault((neighbor, visited), prefix + [neighbor])
+
+        options = {}
+        for key, candidate in candidates.items():
+            if candidate[-1] == target:
+                options[key] = [candidate]
+                continue
+            # Arcs entrant dans le préfixe : interdits aux complétions
+            nodes = np.array(candidate)
+            blocked = csr.edge_ids(np.concatenate([csr.neighbors(node) for node in candidate]),
+                                   np.repeat(nodes, degrees[nodes]))
+            arc_weights[blocked] = 0.0
+            rollouts = generate_random_paths(csr, candidate[-1], target, completions, arc_weights=arc_weights,
+                                             rng=rng, max_length=max_length - len(candidate) + 1, hops=hops)
+            arc_weights[blocked] = 1.0
+            options[key] = [candidate[:-1] + rollout for rollout in rollouts]
+
+        paths = {tuple(path): path for layer_paths in options.values() for path in layer_paths}
+        missing = [path for key, path in paths.items() if key not in known_costs]
+        if budget is not None:
+            missing = missing[:int(min(len(missing), budget.remaining_evaluations(evaluations)))]
+        incumbent = best_cost
+        for path, cost in zip(missing, get_path_costs(seed, missing, blackbox_path)):
+            evaluations += 1
+            known_costs[tuple(path)] = cost
+            if cost is not None and cost < best_cost:
+                best_cost, best_path = cost, path
+
+        scores = []
+        for key, candidate in candidates.items():
+            costs = [known_costs.get(tuple(path)) for path in options[key]]
+            costs = [cost for cost in costs if cost is not None]
+            finished = candidate[-1] == target
+            if costs and (finished or min(costs) < incumbent):
+                scores.append((min(costs), not finished, candidate))
+        scores.sort(key=lambda item: item[:2])
+        beam = [candidate for _, unfinished, candidate in scores[:beam_width] if unfinished]
+        print(f"[Faisceau] couche={layer}, candidats={len(candidates)}, évaluations={len(missing)}, "
+              f"meilleur coût={best_cost}")
+
+    return best_path, best_cost
+
+def baseline_method(G, source, target, seed, blackbox_path, density=None, num_random_paths=None, profile=None,
+                    max_stretch=None, beam_width=None, completions=1, duration=None, max_evaluations=None):
     """
     Implémente la méthode témoin pour trouver un chemin de coût minimal.
     Si num_random_paths n'est pas fourni, il est calculé dynamiquement.
+    `blackbox_path` peut être un `BlackBoxEvaluator` : les complétions des voisins sont alors évaluées en parallèle.
+    Si un `SolverProfile` est fourni, les évaluations y sont comptées et chronométrées.
+    Avec `max_stretch` (ex. 2.0), les complétions sont tirées par `generate_guided_path`, limitées
+    à `max_stretch` fois la distance en sauts du voisin à la cible (conseillé pour les grands graphes).
+    Avec `beam_width`, la méthode devient une recherche en faisceau (`beam_search`) de cette largeur,
+    avec `completions` complétions par candidat : compromis réglable entre qualité et débit,
+    bornée par `duration` secondes et/ou `max_evaluations` évaluations si elles sont fournies.
     """
+    if profile is not None:
+        blackbox_path = profile.instrument(blackbox_path)
+    if beam_width:
+        return beam_search(G, source, target, seed, blackbox_path, beam_width, completions, max_stretch, duration,
+                           max_evaluations)
     num_nodes = len(G.nodes())
 
     # Calcul dynamique du nombre de chemins aléatoires
@@ -55,6 +179,7 @@ def baseline_method(G, source, target, seed, blackbox_path, density=None, num_ra
         num_random_paths = compute_num_random_paths(num_nodes, density)
 
     print(f"[INFO] Nombre de chemins aléatoires générés par voisin : {num_random_paths}")
+    hops = compute_hop_distances(G, target) if max_stretch else None
 
     current_node = source
     previous_node = None
@@ -72,23 +197,29 @@ def baseline_method(G, source, target, seed, blackbox_path, density=None, num_ra
         if len(neighbors) == 1:
             next_node = neighbors[0]
             path.append(next_node)
-            total_cost = get_path_cost_with_blackbox(seed, path, blackbox_path)
+            # Seul le chemin final est évalué : le coût d'un préfixe serait aussitôt remplacé
+            if next_node == target:
+                total_cost = get_path_cost(seed, path, blackbox_path)
             previous_node = current_node
             current_node = next_node
             continue
 
         if target in neighbors:
             path.append(target)
-            total_cost = get_path_cost_with_blackbox(seed, path, blackbox_path)
+            total_cost = get_path_cost(seed, path, blackbox_path)
             break
 
         min_cost = float('inf')
         best_next_node = None
 
-        for neighbor in neighbors:
-            random_path = generate_random_path(G, neighbor, target)
-            cost = get_path_cost_with_blackbox(seed, random_path, blackbox_path)
-            if cost < min_cost:
+        if hops is not None:
+            random_paths = [generate_guided_path(G, neighbor, target, hops, hop_length_cap(hops, neighbor, max_stretch))
+                            for neighbor in neighbors]
+        else:
+            random_paths = [generate_random_path(G, neighbor, target) for neighbor in neighbors]
+        costs = get_path_costs(seed, random_paths, blackbox_path)
+        for neighbor, cost in zip(neighbors, costs):
+            if cost is not None and cost < min_cost:
                 min_cost = cost
                 best_next_node = neighbor
 
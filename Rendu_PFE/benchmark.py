@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import zlib
+
+import networkx as nx
+import numpy as np
+
+from anytime import ConvergenceTrace
+from experiments import METHODS, cell_seed
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from profiling import SolverProfile
+
+try:
+    import resource
+except ImportError:
+    # Windows : pas de `resource`, le pic mémoire n'est mesuré qu'avec tracemalloc
+    resource = None
+
+# Instances de référence : tailles et densités fixes, graines dérivées de `base_seed`
+BENCHMARK_SIZES = (50, 100, 200, 1000)
+BENCHMARK_DENSITIES = (0.05, 0.2)
+# La méthode témoin n'a pas de budget : son coût ne dépend pas de `max_evaluations`
+BENCHMARK_METHODS = tuple(method for method in METHODS if method != "Baseline")
+
+# Mesures comparées d'un rapport à l'autre, avec le sens d'une amélioration
+COMPARED_METRICS = {
+    "evaluations_per_second": "higher",
+    "overhead_cpu_per_evaluation": "lower",
+    "peak_memory_mb": "lower",
+    "evaluations_to_target": "lower",
+}
+
+def reference_cost(graph, source, target, seed, oracle):
+    """
+    Coût de référence d'une instance : coût, selon l'oracle, du plus court chemin de Dijkstra
+    pour les coûts propres des arêtes (le terme d'interaction entre arêtes est ignoré).
+    Il ne dépend d'aucun solveur et reste donc le même d'un commit à l'autre.
+    """
+    edges = np.sort(np.array(graph.edges(), dtype=np.int64).reshape(-1, 2), axis=1)
+    weights = dict(zip(map(tuple, edges.tolist()), oracle.edge_costs(seed, edges[:, 0], edges[:, 1]).tolist()))
+    path = nx.dijkstra_path(graph, source, target, weight=lambda u, v, data: weights[min(u, v), max(u, v)])
+    return oracle(seed, path)
+
+def benchmark_cases(sizes=BENCHMARK_SIZES, densities=BENCHMARK_DENSITIES, methods=BENCHMARK_METHODS, base_seed=0,
+                    max_evaluations=2000, duration=60, tolerance=0.0, memory="rss"):
+    """
+    Construit la liste des cas du banc d'essai : une instance par (taille, densité), toutes les méthodes.
+    """
+    return [
+        {
+            "num_nodes": num_nodes,
+            "density": density,
+            "graph_seed": cell_seed(base_seed, num_nodes, density),
+            "seed": base_seed,
+            "method": method,
+            "max_evaluations": max_evaluations,
+            "duration": duration,
+            "tolerance": tolerance,
+            "memory": memory,
+        }
+        for num_nodes in sizes
+        for density in densities
+        for method in methods
+    ]
+
+def first_within(trace, target_cost):
+    """
+    Renvoie (temps, évaluations) de la première amélioration de `trace` de coût au plus `target_cost`,
+    ou (None, None) si la cible n'est jamais atteinte.
+    """
+    for elapsed, evaluations, cost in zip(trace.times, trace.evaluations, trace.costs):
+        if cost <= target_cost:
+            return elapsed, evaluations
+    return None, None
+
+def _peak_rss_mb():
+    # Pic de mémoire résidente du processus (ko sous Linux, octets sous macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def run_case(case):
+    """
+    Exécute un cas dans le processus courant (un processus neuf par cas, voir `run_benchmark`)
+    et renvoie ses mesures. Le solveur évalue ses chemins directement avec `LocalBlackBox`, ses messages
+    sont masqués. Le pic mémoire est le pic de mémoire résidente du processus (`memory="rss"`, avec le pic
+    atteint avant le solveur : imports et instance), ou le pic des allocations suivies par `tracemalloc`
+    (`memory="tracemalloc"`, plus lent : débit faussé). La cible est le coût de référence de l'instance
+    (`reference_cost`) augmenté de `tolerance` (en relatif).
+    """
+    graph = generate_connected_graph(case["num_nodes"], case["density"], seed=case["graph_seed"])
+    source, target = 0, case["num_nodes"] - 1
+    oracle = LocalBlackBox()
+    reference = reference_cost(graph, source, target, case["seed"], oracle)
+    target_cost = reference * (1 + case["tolerance"])
+
+    solver_seed = cell_seed(case["graph_seed"], zlib.crc32(case["method"].encode()))
+    random.seed(solver_seed)
+    np.random.seed(solver_seed % 2 ** 32)
+    trace, profile = ConvergenceTrace(), SolverProfile(case["method"])
+    tracing = case["memory"] == "tracemalloc"
+    if tracing:
+        tracemalloc.start()
+    memory_before = _peak_rss_mb() if resource is not None and not tracing else None
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        METHODS[case["method"]](graph, source, target, case["seed"], oracle, trace, profile, case["duration"],
+                                case["max_evaluations"])
+    wall_time, cpu_time = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    if tracing:
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    else:
+        peak_memory = _peak_rss_mb() if resource is not None else None
+
+    stats = profile.evaluations
+    time_to_target, evaluations_to_target = first_within(trace, target_cost)
+    best_cost = trace.costs[-1] if len(trace) else None
+    return {
+        **{key: case[key] for key in ("num_nodes", "density", "graph_seed", "method", "max_evaluations",
+                                      "duration", "tolerance", "memory")},
+        "num_edges": graph.number_of_edges(),
+        "evaluations": stats.calls,
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "blackbox_time": stats.total_latency,
+        "evaluations_per_second": stats.calls / wall_time if wall_time else None,
+        # L'oracle tourne dans le processus : son temps mesuré est retiré du temps CPU du solveur
+        "overhead_cpu_per_evaluation": max(0.0, cpu_time - stats.total_latency) / stats.calls if stats.calls else None,
+        "peak_memory_mb": peak_memory,
+        "memory_before_mb": memory_before,
+        "best_cost": best_cost,
+        "reference_cost": reference,
+        "target_cost": target_cost,
+        "time_to_target": time_to_target,
+        "evaluations_to_target": evaluations_to_target,
+        "phases": profile.summary()["phases"],
+    }
+
+def environment():
+    """
+    Décrit l'environnement du banc d'essai : commit, versions de Python et NumPy, machine.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def run_benchmark(cases, max_workers=1):
+    """
+    Exécute les cas, chacun dans un processus neuf (pic mémoire propre au cas), au plus `max_workers`
+    à la fois (1 par défaut : les mesures de débit ne se disputent pas les cœurs).
+    Renvoie le rapport : environnement et mesures de chaque cas.
+    """
+    results = []
+    with multiprocessing.Pool(max_workers, maxtasksperchild=1) as pool:
+        for case, result in zip(cases, pool.imap(run_case, cases)):
+            results.append(result)
+            print(f"[Banc d'essai] {case['method']}, {case['num_nodes']} nœuds, densité {case['density']} : "
+                  f"{result['evaluations_per_second'] or 0:.0f} éval/s, "
+                  f"cible atteinte en {result['evaluations_to_target']} évaluations")
+    return {"environment": environment(), "results": results}
+
+def compare_reports(reference, current, threshold=0.25):
+    """
+    Compare deux rapports cas par cas (taille, densité, méthode) sur `COMPARED_METRICS` et renvoie
+    les régressions : mesure dégradée de plus de `threshold` (en relatif), ou cible qui n'est plus atteinte.
+    """
+    def key(result):
+        return result["num_nodes"], result["density"], result["method"]
+
+    previous = {key(result): result for result in reference["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        for metric, direction in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if old is None:
+                continue
+            if new is None:
+                worse = metric == "evaluations_to_target"
+            elif direction == "higher":
+                worse = new < old * (1 - threshold)
+            else:
+                worse = new > old * (1 + threshold)
+            if worse:
+                regressions.append({"case": key(result), "metric": metric, "before": old, "after": new})
+    return regressions
+
+def main(argv=None):
+    """
+    Ligne de commande : `run` exécute le banc d'essai et écrit le rapport JSON,
+    `compare` compare deux rapports et renvoie 1 en cas de régression.
+    """
+    parser = argparse.ArgumentParser(description="Banc d'essai des solveurs sur l'oracle local.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="exécute le banc d'essai")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES))
+    run.add_argument("--densities", type=float, nargs="+", default=list(BENCHMARK_DENSITIES))
+    run.add_argument("--methods", nargs="+", default=list(BENCHMARK_METHODS), choices=list(METHODS))
+    run.add_argument("--max-evaluations", type=int, default=2000)
+    run.add_argument("--duration", type=float, default=60, help="borne de sécurité par cas (s)")
+    run.add_argument("--tolerance", type=float, default=0.0, help="cible : coût de référence * (1 + tolérance)")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--memory", choices=["rss", "tracemalloc"], default="rss")
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--output", default="benchmark_results.json")
+    compare = commands.add_parser("compare", help="compare deux rapports")
+    compare.add_argument("reference")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        cases = benchmark_cases(args.sizes, args.densities, args.methods, args.seed, args.max_evaluations,
+                                args.duration, args.tolerance, args.memory)
+        report = run_benchmark(cases, args.workers)
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=1)
+        print(f"[Banc d'essai] Rapport écrit dans {args.output}")
+        return 0
+
+    with open(args.reference, encoding="utf-8") as reference, open(args.current, encoding="utf-8") as current:
+        regressions = compare_reports(json.load(reference), json.load(current), args.threshold)
+    for regression in regressions:
+        print(f"[Régression] {regression['case']} {regression['metric']} : "
+              f"{regression['before']} -> {regression['after']}")
+    print(f"[Banc d'essai] {len(regressions)} régression(s)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,669 @@
+import asyncio
+import math
+import os
+import queue
+import signal
 import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from cost_cache import PathCostCache
 
-def get_path_cost_with_blackbox(seed, path, blackbox_path):
+# Garde-fou des appels : durée maximale d'un appel ponctuel (secondes) et nombre de nouvelles tentatives
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+
+def remaining_time(timeout=None, deadline=None):
+    """
+    Temps accordé à un appel : le plus petit entre `timeout` et le temps restant avant `deadline`
+    (instant absolu de `time.monotonic`), None si aucun des deux n'est fixé.
+    """
+    limits = [limit for limit in (timeout, None if deadline is None else deadline - time.monotonic())
+              if limit is not None]
+    return min(limits, default=None)
+
+def retry_pause(kind, attempt, retries, backoff, deadline=None, stats=None):
+    """
+    Enregistre dans `stats` l'échec de type `kind` de la tentative `attempt` (numérotée à partir de 0)
+    et renvoie l'attente avant la tentative suivante : `backoff` secondes doublées à chaque tentative,
+    sans dépasser `deadline`. Renvoie None si les `retries` nouvelles tentatives sont épuisées
+    ou si `deadline` est passée.
+    """
+    give_up = attempt >= retries or deadline is not None and time.monotonic() >= deadline
+    if stats is not None:
+        stats.record_failure(kind, retried=not give_up)
+    if give_up:
+        return None
+    return max(0.0, remaining_time(backoff * 2 ** attempt, deadline))
+
+def _parse_output(returncode, stdout):
+    # (coût, type d'échec, description) d'un processus Black Box terminé
+    if returncode != 0:
+        return None, "exit", f"code de retour {returncode}"
+    try:
+        return float(stdout.strip()), None, None
+    except ValueError:
+        return None, "parse", f"sortie non numérique {stdout.strip()!r}"
+
+def _kill_process_group(process):
+    """
+    Tue un processus lancé avec `start_new_session=True` et tous ses descendants (son groupe de processus) :
+    un script d'enrobage ne laisse pas derrière lui un petit-enfant qui garde les tubes ouverts.
+    Sous Windows, seul le processus lui-même est tué.
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    else:
+        process.kill()
+
+def get_path_cost_with_blackbox(seed, path, blackbox_path, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                                backoff=0.05, deadline=None, stats=None):
     """
     Appelle la Black Box pour récupérer le coût d'un chemin donné.
 
+    Chaque tentative dure au plus `timeout` secondes, sans dépasser `deadline` (fin du budget du solveur) :
+    un processus bloqué est tué. Un échec (délai dépassé, code de retour non nul, sortie non numérique,
+    lancement impossible) est compté par type dans `stats` (`EvaluationStats`) puis l'appel est retenté
+    au plus `retries` fois, après une attente doublée à chaque fois à partir de `backoff` secondes.
+    Renvoie None si toutes les tentatives échouent.
     """
     path_str = ",".join(map(str, path))
-    try:
-        result = subprocess.run([blackbox_path, str(seed), path_str],
-                                capture_output=True, text=True)
-        return float(result.stdout.strip())
-    except Exception as e:
-        print(f"Erreur lors de l'exécution de la Black Box : {e}")
-        return None
+    for attempt in range(retries + 1):
+        time_left = remaining_time(timeout, deadline)
+        if time_left is not None and time_left <= 0:
+            kind, error = "timeout", "délai de l'appel écoulé"
+        else:
+            try:
+                process = subprocess.Popen([blackbox_path, str(seed), path_str], stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE, text=True, start_new_session=True)
+                try:
+                    stdout, _ = process.communicate(timeout=time_left)
+                except subprocess.TimeoutExpired:
+                    _kill_process_group(process)
+                    process.communicate()
+                    raise
+                cost, kind, error = _parse_output(process.returncode, stdout)
+                if kind is None:
+                    return cost
+            except subprocess.TimeoutExpired:
+                kind, error = "timeout", f"aucune réponse après {time_left:.3g} s"
+            except OSError as e:
+                kind, error = "launch", e
+        pause = retry_pause(kind, attempt, retries, backoff, deadline, stats)
+        if pause is None:
+            break
+        time.sleep(pause)
+    print(f"Erreur lors de l'exécution de la Black Box : {error}")
+    return None
+
+async def get_path_cost_with_blackbox_async(seed, path, blackbox_path, timeout=DEFAULT_TIMEOUT,
+                                            retries=DEFAULT_RETRIES, backoff=0.05, deadline=None, stats=None):
+    """
+    Version asynchrone de `get_path_cost_with_blackbox`, avec le même garde-fou (`timeout`, `retries`,
+    `deadline`, échecs comptés par type dans `stats`) : le processus Black Box est lancé avec
+    `asyncio.create_subprocess_exec`, la boucle d'événements reste libre pendant son exécution.
+    Si la tâche est annulée (budget de temps épuisé), le processus et ses descendants sont tués.
+    """
+    path_str = ",".join(map(str, path))
+    for attempt in range(retries + 1):
+        time_left = remaining_time(timeout, deadline)
+        if time_left is not None and time_left <= 0:
+            kind, error = "timeout", "délai de l'appel écoulé"
+        else:
+            try:
+                process = await asyncio.create_subprocess_exec(blackbox_path, str(seed), path_str,
+                                                               stdout=asyncio.subprocess.PIPE,
+                                                               stderr=asyncio.subprocess.PIPE,
+                                                               start_new_session=True)
+            except OSError as e:
+                kind, error = "launch", e
+            else:
+                try:
+                    stdout, _ = await asyncio.wait_for(process.communicate(), time_left)
+                except asyncio.TimeoutError:
+                    _kill_process_group(process)
+                    await process.wait()
+                    kind, error = "timeout", f"aucune réponse après {time_left:.3g} s"
+                except asyncio.CancelledError:
+                    _kill_process_group(process)
+                    await process.wait()
+                    raise
+                else:
+                    cost, kind, error = _parse_output(process.returncode, stdout.decode())
+                    if kind is None:
+                        return cost
+        pause = retry_pause(kind, attempt, retries, backoff, deadline, stats)
+        if pause is None:
+            break
+        await asyncio.sleep(pause)
+    print(f"Erreur lors de l'exécution de la Black Box : {error}")
+    return None
+
+class BlackBoxEvaluator:
+    """
+    Pool borné de processus Black Box exécutés en parallèle.
+
+    Chaque évaluation lance toujours son propre processus `blackBox.exe`, mais jusqu'à
+    `max_workers` processus tournent simultanément : les threads du pool ne font
+    qu'attendre la fin de leur sous-processus, le GIL n'est donc pas un frein.
+    Un évaluateur s'utilise partout où les solveurs attendent `blackbox_path`.
+    `blackbox_path` peut aussi être un oracle appelable (`LocalBlackBox`).
+    Chaque appel au binaire est surveillé (voir `get_path_cost_with_blackbox`) : au plus `timeout`
+    secondes par tentative, `retries` nouvelles tentatives, et jamais au-delà de la `deadline` reçue.
+    """
+    supports_deadline = True
+
+    def __init__(self, blackbox_path, max_workers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+        """
+        Initialise le pool avec le chemin du binaire et le nombre maximal de processus simultanés
+        (par défaut, le nombre de cœurs de la machine).
+        """
+        self.blackbox_path = blackbox_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="blackbox")
+
+    def _evaluate(self, seed, path, deadline, stats):
+        if isinstance(self.blackbox_path, (str, os.PathLike)):
+            return get_path_cost_with_blackbox(seed, path, self.blackbox_path, self.timeout, self.retries,
+                                               deadline=deadline, stats=stats)
+        return get_path_cost(seed, path, self.blackbox_path, deadline, stats)
+
+    def submit(self, seed, path, deadline=None, stats=None):
+        """
+        Soumet l'évaluation d'un chemin et renvoie immédiatement un `Future` contenant son coût.
+        """
+        return self._executor.submit(self._evaluate, seed, list(path), deadline, stats)
+
+    def evaluate(self, seed, path, deadline=None, stats=None):
+        """
+        Évalue un seul chemin de manière bloquante.
+        """
+        return self.submit(seed, path, deadline, stats).result()
+
+    def evaluate_batch(self, seed, paths, deadline=None, stats=None):
+        """
+        Évalue un lot de chemins en parallèle et renvoie les coûts dans l'ordre des chemins.
+        """
+        futures = [self.submit(seed, path, deadline, stats) for path in paths]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Attend la fin des évaluations en cours puis libère le pool.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Commande d'un évaluateur persistant fondé sur l'oracle local (voir `local_blackbox.serve`)
+LOCAL_SERVE_COMMAND = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_blackbox.py"),
+                       "--serve"]
+
+def _parse_cost(line):
+    """
+    Convertit une ligne de réponse d'un évaluateur persistant en coût (None pour `nan`).
+    """
+    cost = float(line)
+    return None if math.isnan(cost) else cost
+
+class PersistentEvaluator:
+    """
+    Pool d'évaluateurs persistants : `max_workers` processus lancés une seule fois, qui lisent
+    des requêtes `<seed> <id,id,...>` (une par ligne) sur leur entrée standard et renvoient
+    un coût par ligne, dans l'ordre (protocole de `local_blackbox.py --serve`).
+
+    Le coût de démarrage d'un processus est payé une fois par worker et non plus une fois par chemin ;
+    un lot est réparti entre les workers et chaque part est envoyée d'un bloc.
+    Un worker bloqué (plus de `timeout` secondes par chemin du bloc, ou `deadline` atteinte), mort
+    ou qui répond de travers est tué et relancé, puis les chemins sans réponse lui sont renvoyés
+    au plus `retries` fois ; les échecs sont comptés par type dans le `stats` reçu.
+    Les chemins encore sans réponse sont alors évalués par l'appel ponctuel
+    `get_path_cost_with_blackbox(seed, path, fallback)` si `fallback` est donné, sinon leur coût vaut None.
+    """
+    supports_deadline = True
+
+    def __init__(self, command=None, max_workers=None, fallback=None, chunk_size=256, timeout=1.0,
+                 retries=1, backoff=0.05):
+        """
+        Lance les workers. `command` est la ligne de commande d'un worker (par défaut l'oracle local),
+        `chunk_size` le nombre maximal de requêtes envoyées d'un bloc à un worker.
+        """
+        self.command = list(command or LOCAL_SERVE_COMMAND)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.fallback = fallback
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.restarts = 0
+        self._processes = queue.Queue()
+        for _ in range(self.max_workers):
+            self._processes.put(self._start())
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="evaluator")
+
+    def _start(self):
+        # Groupe de processus propre au worker : `_kill_process_group` arrête aussi ses descendants
+        return subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                text=True, bufsize=1, start_new_session=True)
+
+    def _send(self, seed, paths, costs, time_left):
+        """
+        Envoie un bloc de requêtes à un worker libre et ajoute ses réponses à `costs`.
+        Un minuteur tue le worker après `time_left` secondes ; un worker en échec est remplacé.
+        Renvoie None si tout le bloc a reçu une réponse, sinon le type d'échec et sa description.
+        """
+        process = self._processes.get()
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            _kill_process_group(process)
+
+        timer = threading.Timer(time_left, expire) if time_left is not None else None
+        failure, line = None, ""
+        try:
+            if timer is not None:
+                timer.start()
+            process.stdin.write("".join(f"{seed} {','.join(map(str, path))}\n" for path in paths))
+            process.stdin.flush()
+            for _ in paths:
+                line = process.stdout.readline()
+                costs.append(_parse_cost(line))
+        except (OSError, ValueError) as e:
+            if expired.is_set():
+                failure = ("timeout", f"aucune réponse après {time_left:.3g} s")
+            elif line:
+                failure = ("parse", f"réponse non numérique {line.strip()!r}")
+            else:
+                failure = ("exit", f"worker arrêté ({e})")
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if failure is not None or expired.is_set():
+                _kill_process_group(process)
+                process.wait()
+                process = self._start()
+                self.restarts += 1
+            self._processes.put(process)
+        return failure
+
+    def _evaluate_chunk(self, seed, paths, deadline=None, stats=None):
+        """
+        Évalue un bloc de chemins sur un worker, avec nouvelles tentatives puis repli.
+        """
+        costs = []
+        for attempt in range(self.retries + 1):
+            remaining = paths[len(costs):]
+            time_left = remaining_time(self.timeout * len(remaining) if self.timeout else None, deadline)
+            if time_left is not None and time_left <= 0:
+                failure = ("timeout", "délai de l'appel écoulé")
+            else:
+                failure = self._send(seed, remaining, costs, time_left)
+                if failure is None:
+                    return costs
+            pause = retry_pause(failure[0], attempt, self.retries, self.backoff, deadline, stats)
+            if pause is None:
+                break
+            time.sleep(pause)
+        print(f"Erreur de l'évaluateur persistant : {failure[1]} ; {len(paths) - len(costs)} chemins sans réponse")
+        if self.fallback is None:
+            return costs + [None] * (len(paths) - len(costs))
+        return costs + [get_path_cost_with_blackbox(seed, path, self.fallback, deadline=deadline, stats=stats)
+                        for path in paths[len(costs):]]
+
+    def submit(self, seed, path, deadline=None, stats=None):
+        """
+        Soumet l'évaluation d'un chemin et renvoie immédiatement un `Future` contenant son coût.
+        """
+        future = Future()
+        chunk = self._executor.submit(self._evaluate_chunk, seed, [list(path)], deadline, stats)
+        chunk.add_done_callback(lambda done: future.set_exception(done.exception()) if done.exception()
+                                else future.set_result(done.result()[0]))
+        return future
+
+    def evaluate(self, seed, path, deadline=None, stats=None):
+        """
+        Évalue un seul chemin de manière bloquante.
+        """
+        return self._evaluate_chunk(seed, [list(path)], deadline, stats)[0]
+
+    def evaluate_batch(self, seed, paths, deadline=None, stats=None):
+        """
+        Répartit un lot de chemins entre les workers et renvoie les coûts dans l'ordre des chemins.
+        """
+        paths = [list(path) for path in paths]
+        size = min(self.chunk_size, max(1, math.ceil(len(paths) / self.max_workers)))
+        futures = [self._executor.submit(self._evaluate_chunk, seed, paths[start:start + size], deadline, stats)
+                   for start in range(0, len(paths), size)]
+        return [cost for future in futures for cost in future.result()]
+
+    def close(self):
+        """
+        Attend la fin des évaluations en cours puis arrête les workers (fin de leur entrée standard).
+        """
+        self._executor.shutdown(wait=True)
+        while not self._processes.empty():
+            process = self._processes.get()
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                _kill_process_group(process)
+                process.wait()
+            process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class CachedEvaluator:
+    """
+    Évaluateur qui interroge un `PathCostCache` avant de solliciter la Black Box.
+
+    Un chemin déjà évalué pour la même graine devient une simple lecture de dictionnaire ;
+    seuls les chemins inconnus sont transmis à l'évaluateur sous-jacent (chemin du binaire
+    ou `BlackBoxEvaluator`), avec la `deadline` et les `stats` reçues.
+    """
+    supports_deadline = True
+
+    def __init__(self, evaluator, cache=None):
+        """
+        Initialise l'évaluateur avec l'évaluateur sous-jacent et le cache (un LRU mémoire par défaut).
+        """
+        self.evaluator = evaluator
+        self.cache = cache if cache is not None else PathCostCache()
+        self.max_workers = get_batch_size(evaluator)
+
+    def evaluate(self, seed, path, deadline=None, stats=None):
+        """
+        Renvoie le coût d'un chemin, depuis le cache si possible.
+        """
+        cost = self.cache.get(seed, path)
+        if cost is None:
+            cost = get_path_cost(seed, path, self.evaluator, deadline, stats)
+            self.cache.put(seed, path, cost)
+        return cost
+
+    def evaluate_batch(self, seed, paths, deadline=None, stats=None):
+        """
+        Renvoie les coûts d'un lot de chemins ; les chemins absents du cache
+        (et dédupliqués) sont évalués ensemble par l'évaluateur sous-jacent.
+        """
+        costs = [self.cache.get(seed, path) for path in paths]
+        missing = {}
+        for path, cost in zip(paths, costs):
+            if cost is None:
+                missing.setdefault(tuple(path), path)
+        if missing:
+            new_costs = get_path_costs(seed, list(missing.values()), self.evaluator, deadline, stats)
+            computed = dict(zip(missing.keys(), new_costs))
+            for key, cost in computed.items():
+                self.cache.put(seed, key, cost)
+            costs = [computed[tuple(path)] if cost is None else cost for path, cost in zip(paths, costs)]
+        return costs
+
+    def submit(self, seed, path, deadline=None, stats=None):
+        """
+        Renvoie un `Future` du coût : déjà résolu si le chemin est en cache.
+        """
+        future = Future()
+        cost = self.cache.get(seed, path)
+        if cost is not None:
+            future.set_result(cost)
+        elif hasattr(self.evaluator, "submit"):
+            future = self.evaluator.submit(seed, path, **_watchdog_options(self.evaluator, deadline, stats))
+            future.add_done_callback(
+                lambda done: done.exception() is None and self.cache.put(seed, path, done.result())
+            )
+        else:
+            cost = get_path_cost(seed, path, self.evaluator, deadline, stats)
+            self.cache.put(seed, path, cost)
+            future.set_result(cost)
+        return future
+
+    async def evaluate_async(self, seed, path, deadline=None, stats=None):
+        """
+        Version asynchrone de `evaluate` : seuls les chemins absents du cache attendent la Black Box.
+        """
+        cost = self.cache.get(seed, path)
+        if cost is None:
+            cost = await get_path_cost_async(seed, path, self.evaluator, deadline, stats)
+            self.cache.put(seed, path, cost)
+        return cost
+
+    def close(self):
+        """
+        Ferme le cache puis l'évaluateur sous-jacent.
+        """
+        self.cache.close()
+        if hasattr(self.evaluator, "close"):
+            self.evaluator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class EvaluationStats:
+    """
+    Compteurs d'évaluations de chemins : nombre d'appels, échecs (coût None),
+    temps cumulé et histogramme des latences (en secondes, par tranches logarithmiques).
+    Les tentatives échouées des appels à la Black Box sont aussi comptées par type
+    (`timeout`, `exit`, `parse`, `launch`), ainsi que les nouvelles tentatives qu'elles ont entraînées.
+    """
+    BUCKETS = (1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0, 10.0, float('inf'))
+
+    def __init__(self):
+        """
+        Initialise des compteurs vides.
+        """
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.histogram = [0] * len(self.BUCKETS)
+        self.failure_kinds = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, cost):
+        """
+        Enregistre une évaluation de durée `latency` ayant renvoyé `cost`.
+        """
+        bucket = next(i for i, bound in enumerate(self.BUCKETS) if latency <= bound)
+        with self._lock:
+            self.calls += 1
+            self.failures += cost is None
+            self.total_latency += latency
+            self.histogram[bucket] += 1
+
+    def record_failure(self, kind, retried=False):
+        """
+        Enregistre une tentative d'appel échouée de type `kind`, suivie d'une nouvelle tentative si `retried`.
+        """
+        with self._lock:
+            self.failure_kinds[kind] = self.failure_kinds.get(kind, 0) + 1
+            self.retries += retried
+
+    def percentile(self, q):
+        """
+        Renvoie une borne supérieure du quantile `q` (entre 0 et 1) des latences, lue dans l'histogramme.
+        """
+        if not self.calls:
+            return 0.0
+        threshold, seen = q * self.calls, 0
+        for bound, count in zip(self.BUCKETS, self.histogram):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return self.BUCKETS[-1]
+
+    def summary(self):
+        """
+        Renvoie les compteurs sous forme de dictionnaire (sérialisable en JSON).
+        """
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "failure_kinds": dict(self.failure_kinds),
+            "retries": self.retries,
+            "total_latency": self.total_latency,
+            "mean_latency": self.total_latency / self.calls if self.calls else 0.0,
+            "p50_latency": self.percentile(0.5),
+            "p99_latency": self.percentile(0.99),
+            "histogram": dict(zip(map(str, self.BUCKETS), self.histogram)),
+        }
+
+class InstrumentedEvaluator:
+    """
+    Évaluateur qui mesure chaque évaluation transmise à l'évaluateur sous-jacent
+    et l'enregistre dans un `EvaluationStats`.
+    Placé devant un `CachedEvaluator`, il compte aussi les succès du cache (latence quasi nulle).
+    Avec un `budget` (`SearchBudget`) limité en temps, chaque appel reçoit une `deadline` : la fin du budget,
+    plus `DEADLINE_GRACE` secondes pour laisser finir les appels lancés juste avant.
+    Les échecs par type sont comptés dans les `stats` reçues de l'appelant, sinon dans les siennes.
+    """
+    supports_deadline = True
+    DEADLINE_GRACE = 1.0
+
+    def __init__(self, evaluator, stats=None, budget=None):
+        """
+        Initialise l'évaluateur avec l'évaluateur sous-jacent et les compteurs à alimenter.
+        """
+        self.evaluator = evaluator
+        self.stats = stats if stats is not None else EvaluationStats()
+        self.budget = budget
+        self.max_workers = get_batch_size(evaluator)
+
+    def _options(self, deadline, stats):
+        # Échéance la plus proche entre celle de l'appelant et la fin du budget
+        if self.budget is not None and self.budget.duration is not None:
+            budget_deadline = (time.monotonic() + self.budget.duration - self.budget.elapsed()
+                               + self.DEADLINE_GRACE)
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        return deadline, stats if stats is not None else self.stats
+
+    def evaluate(self, seed, path, deadline=None, stats=None):
+        """
+        Évalue un chemin en mesurant la durée de l'appel.
+        """
+        start = time.perf_counter()
+        cost = get_path_cost(seed, path, self.evaluator, *self._options(deadline, stats))
+        self.stats.record(time.perf_counter() - start, cost)
+        return cost
+
+    def submit(self, seed, path, deadline=None, stats=None):
+        """
+        Soumet un chemin ; la latence est mesurée jusqu'à la résolution du `Future`.
+        """
+        if not hasattr(self.evaluator, "submit"):
+            future = Future()
+            future.set_result(self.evaluate(seed, path, deadline, stats))
+            return future
+        start = time.perf_counter()
+        future = self.evaluator.submit(seed, path, **_watchdog_options(self.evaluator,
+                                                                       *self._options(deadline, stats)))
+        future.add_done_callback(lambda done: self.stats.record(
+            time.perf_counter() - start, done.result() if done.exception() is None else None))
+        return future
+
+    async def evaluate_async(self, seed, path, deadline=None, stats=None):
+        """
+        Version asynchrone de `evaluate`, mesurée et bornée de la même façon.
+        """
+        start = time.perf_counter()
+        cost = await get_path_cost_async(seed, path, self.evaluator, *self._options(deadline, stats))
+        self.stats.record(time.perf_counter() - start, cost)
+        return cost
+
+    def evaluate_batch(self, seed, paths, deadline=None, stats=None):
+        """
+        Évalue un lot de chemins ; chaque chemin est mesuré individuellement.
+        """
+        futures = [self.submit(seed, path, deadline, stats) for path in paths]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Ferme l'évaluateur sous-jacent.
+        """
+        if hasattr(self.evaluator, "close"):
+            self.evaluator.close()
+
+def _watchdog_options(evaluator, deadline, stats):
+    """
+    Arguments `deadline` et `stats` à transmettre à un évaluateur, s'il les accepte (`supports_deadline`).
+    """
+    return {"deadline": deadline, "stats": stats} if getattr(evaluator, "supports_deadline", False) else {}
+
+def get_path_cost(seed, path, evaluator, deadline=None, stats=None):
+    """
+    Renvoie le coût d'un chemin, `evaluator` pouvant être le chemin du binaire,
+    un évaluateur (`BlackBoxEvaluator`, ...) ou un oracle appelable en mémoire
+    (`LocalBlackBox`), appelé directement sans sous-processus.
+    `deadline` (instant de `time.monotonic`) borne la durée des appels et `stats` reçoit
+    les échecs par type, pour le binaire et les évaluateurs qui les acceptent.
+    """
+    if isinstance(evaluator, (str, os.PathLike)):
+        return get_path_cost_with_blackbox(seed, path, evaluator, deadline=deadline, stats=stats)
+    if hasattr(evaluator, "evaluate"):
+        return evaluator.evaluate(seed, path, **_watchdog_options(evaluator, deadline, stats))
+    return evaluator(seed, path)
+
+def get_path_costs(seed, paths, evaluator, deadline=None, stats=None):
+    """
+    Renvoie les coûts d'une liste de chemins, dans l'ordre.
+    Les évaluateurs traitent le lot en parallèle, un simple chemin de binaire l'évalue séquentiellement.
+    """
+    if hasattr(evaluator, "evaluate_batch"):
+        return evaluator.evaluate_batch(seed, paths, **_watchdog_options(evaluator, deadline, stats))
+    return [get_path_cost(seed, path, evaluator, deadline, stats) for path in paths]
+
+def get_batch_size(evaluator):
+    """
+    Nombre de chemins qu'il est utile de soumettre d'un coup à l'évaluateur.
+    """
+    return getattr(evaluator, "max_workers", 1)
+
+async def get_path_cost_async(seed, path, evaluator, deadline=None, stats=None):
+    """
+    Équivalent asynchrone de `get_path_cost` : sous-processus asyncio pour un chemin de binaire,
+    `evaluate_async` ou `submit` pour un évaluateur, appel direct pour un oracle en mémoire.
+    `deadline` et `stats` sont transmis comme dans `get_path_cost`.
+    """
+    if isinstance(evaluator, (str, os.PathLike)):
+        return await get_path_cost_with_blackbox_async(seed, path, evaluator, deadline=deadline, stats=stats)
+    options = _watchdog_options(evaluator, deadline, stats)
+    if hasattr(evaluator, "evaluate_async"):
+        return await evaluator.evaluate_async(seed, path, **options)
+    if hasattr(evaluator, "submit"):
+        return await asyncio.wrap_future(evaluator.submit(seed, path, **options))
+    return get_path_cost(seed, path, evaluator, deadline, stats)
 
 # Exemple d'utilisation
 #blackbox_path = "h:/Desktop/pfe/blackBoxx.exe"
 #example = get_path_cost_with_blackbox(0, [17, 14, 39], blackbox_path)
 #print("Coût retourné par la Black Box :", example)
+#with BlackBoxEvaluator(blackbox_path, max_workers=8) as evaluator:
+#    costs = evaluator.evaluate_batch(0, [[17, 14, 39], [17, 39]])
+#cached = CachedEvaluator(blackbox_path, PathCostCache(db_path="path_costs.sqlite"))
+#print(cached.evaluate(0, [17, 14, 39]), cached.cache.stats())
+#from local_blackbox import LocalBlackBox
+#print(get_path_cost(0, [17, 14, 39], LocalBlackBox()))        # en mémoire
+#print(get_path_cost(0, [17, 14, 39], "./local_blackbox.py"))  # même coût, via un sous-processus
+#with PersistentEvaluator(LOCAL_SERVE_COMMAND, max_workers=4) as evaluator:  # même coût, workers persistants
+#    costs = evaluator.evaluate_batch(0, [[17, 14, 39], [17, 39]])
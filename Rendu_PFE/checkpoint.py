@@ -0,0 +1,169 @@
+import os
+import numpy as np
+
+from anytime import ConvergenceTrace, ShiftedTrace
+
+def _pack_paths(paths):
+    # Chemins de longueurs variables -> (nœuds concaténés, positions de début et de fin)
+    lengths = np.array([len(path) for path in paths], dtype=np.int64)
+    nodes = np.array([node for path in paths for node in path], dtype=np.int32)
+    return nodes, np.concatenate(([0], np.cumsum(lengths)))
+
+def _unpack_paths(nodes, offsets):
+    return [nodes[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+class SolverState:
+    """
+    État d'un solveur, sauvegardable et réutilisable d'un run à l'autre : table Q, poids d'exploration,
+    arbre de recherche (`TranspositionTable.to_arrays`), meilleur chemin connu et journal de toutes les évaluations (chemin, coût).
+
+    Passé en argument `solver_state` d'un solveur, il sert de point de départ (démarrage à chaud : un run de 100 s
+    reprend là où s'était arrêté un run de 50 s) et il est mis à jour en fin de run.
+    Le solveur ne reçoit que le budget du nouveau run : le travail déjà fait (`elapsed` secondes,
+    `evaluations` évaluations) et l'historique des améliorations (`trace`) sont tenus à jour par l'appelant
+    (voir `resume_trace`, `add_run` et `experiments.run_cell`). `seed` est la graine de la Black Box
+    des évaluations du journal : un état n'est jamais repris pour une autre graine.
+    Le fichier est un `.npz` non compressé : chaque tableau n'est lu qu'à la demande.
+    """
+    def __init__(self):
+        """
+        Initialise un état vide.
+        """
+        self.q = None
+        self.memory = None
+        self.tree = None
+        self.best_path = None
+        self.best_cost = float('inf')
+        self.paths = []
+        self.costs = []
+        self.seed = None
+        self.elapsed = 0.0
+        self.evaluations = 0
+        self.trace = ConvergenceTrace()
+
+    def __len__(self):
+        return len(self.costs)
+
+    def record(self, path, cost):
+        """
+        Ajoute une évaluation au journal et met à jour le meilleur chemin.
+        """
+        self.paths.append(list(path))
+        self.costs.append(np.nan if cost is None else cost)
+        if cost is not None and cost < self.best_cost:
+            self.best_cost = cost
+            self.best_path = list(path)
+
+    def resume_trace(self, trace):
+        """
+        Recopie l'historique sauvegardé dans `trace` (`ConvergenceTrace` vide) et renvoie la vue
+        où le solveur enregistre la suite, décalée du temps et des évaluations déjà consommés.
+        """
+        for elapsed, evaluations, cost, path in zip(self.trace.times, self.trace.evaluations, self.trace.costs,
+                                                    self.trace.paths):
+            trace.record(elapsed, evaluations, cost, path)
+        return ShiftedTrace(trace, self.elapsed, self.evaluations)
+
+    def add_run(self, trace, elapsed, evaluations):
+        """
+        Ajoute un run de `elapsed` secondes et `evaluations` évaluations au travail déjà fait ;
+        `trace` est l'historique complet (voir `resume_trace`).
+        """
+        self.trace = trace
+        self.elapsed += elapsed
+        self.evaluations += evaluations
+
+    def remaining(self, duration=None, max_evaluations=None):
+        """
+        Renvoie le budget (durée, évaluations) qui reste sur `duration` et `max_evaluations`
+        une fois retiré le travail déjà fait (None : pas de limite de ce type).
+        """
+        return (None if duration is None else max(0.0, duration - self.elapsed),
+                None if max_evaluations is None else max(0, max_evaluations - self.evaluations))
+
+    def warm_array(self, name, size, fill=0.0):
+        """
+        Renvoie une copie du tableau sauvegardé `name` (« q » ou « memory ») s'il correspond au graphe
+        (même nombre d'arcs `size`), sinon un tableau neuf rempli de `fill`.
+        """
+        saved = getattr(self, name)
+        if saved is not None and len(saved) == size:
+            return np.array(saved, dtype=np.float64)
+        return np.full(size, fill, dtype=np.float64)
+
+    def save(self, filename):
+        """
+        Écrit l'état dans `filename` (`.npz`), de manière atomique.
+        """
+        nodes, offsets = _pack_paths(self.paths)
+        trace_nodes, trace_offsets = _pack_paths(self.trace.paths)
+        arrays = {
+            "path_nodes": nodes,
+            "path_offsets": offsets,
+            "costs": np.array(self.costs, dtype=np.float64),
+            "best_path": np.array(self.best_path if self.best_path is not None else [], dtype=np.int32),
+            "best_cost": np.array(self.best_cost),
+            "seed": np.array(-1 if self.seed is None else self.seed, dtype=np.int64),
+            "elapsed": np.array(self.elapsed),
+            "evaluations": np.array(self.evaluations, dtype=np.int64),
+            "trace_times": np.array(self.trace.times, dtype=np.float64),
+            "trace_evaluations": np.array(self.trace.evaluations, dtype=np.int64),
+            "trace_costs": np.array(self.trace.costs, dtype=np.float64),
+            "trace_path_nodes": trace_nodes,
+            "trace_path_offsets": trace_offsets,
+        }
+        if self.q is not None:
+            arrays["q"] = self.q
+        if self.memory is not None:
+            arrays["memory"] = self.memory
+        if self.tree is not None:
+            arrays.update({f"tree_{name}": values for name, values in self.tree.items()})
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{filename}.{os.getpid()}.tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Relit un état sauvegardé par `save` (un état écrit avant l'ajout de la graine, du travail déjà fait
+        et de l'historique est relu sans eux).
+        """
+        state = cls()
+        with np.load(filename) as arrays:
+            state.paths = _unpack_paths(arrays["path_nodes"], arrays["path_offsets"])
+            state.costs = arrays["costs"].tolist()
+            state.best_cost = float(arrays["best_cost"])
+            state.best_path = arrays["best_path"].tolist() if arrays["best_path"].size else None
+            state.q = arrays["q"] if "q" in arrays.files else None
+            state.memory = arrays["memory"] if "memory" in arrays.files else None
+            tree = {name[len("tree_"):]: arrays[name] for name in arrays.files if name.startswith("tree_")}
+            state.tree = tree or None
+            if "seed" in arrays.files:
+                state.seed = int(arrays["seed"]) if int(arrays["seed"]) >= 0 else None
+                state.elapsed = float(arrays["elapsed"])
+                state.evaluations = int(arrays["evaluations"])
+                trace_paths = _unpack_paths(arrays["trace_path_nodes"], arrays["trace_path_offsets"])
+                for entry in zip(arrays["trace_times"].tolist(), arrays["trace_evaluations"].tolist(),
+                                 arrays["trace_costs"].tolist(), trace_paths):
+                    state.trace.record(*entry)
+        return state
+
+    @classmethod
+    def load_or_create(cls, filename, seed=None):
+        """
+        Relit l'état de `filename` s'il existe, sinon renvoie un état vide pour la graine `seed`.
+        Lève ValueError si l'état sauvegardé a été construit avec une autre graine.
+        """
+        if not filename or not os.path.exists(filename):
+            state = cls()
+            state.seed = seed
+            return state
+        state = cls.load(filename)
+        if seed is not None and state.seed is not None and state.seed != seed:
+            raise ValueError(f"{filename} : état construit avec la graine {state.seed}, pas {seed}")
+        if state.seed is None:
+            state.seed = seed
+        return state
@@ -0,0 +1,26 @@
+import pytest
+
+from local_blackbox import LocalBlackBox
+
+class CountingOracle(LocalBlackBox):
+    """
+    Oracle local qui garde la liste des chemins évalués, dans l'ordre des appels.
+    """
+    def __init__(self):
+        super().__init__()
+        self.paths = []
+
+    @property
+    def calls(self):
+        return len(self.paths)
+
+    def __call__(self, seed, path):
+        self.paths.append(tuple(path))
+        return super().__call__(seed, path)
+
+@pytest.fixture
+def counting_oracle():
+    """
+    Fabrique d'oracles `CountingOracle` : chaque appel en crée un nouveau.
+    """
+    return CountingOracle
@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class PathCostCache:
+    """
+    Cache des coûts renvoyés par la Black Box, indexé par (seed, chemin).
+
+    Le coût d'un chemin ne dépend que de la graine et de la suite de nœuds : il peut donc être
+    réutilisé entre méthodes, entre durées et entre graphes. Le cache mémoire est un LRU borné,
+    éventuellement adossé à une base SQLite qui persiste d'une exécution de `main.py` à l'autre.
+
+    Plusieurs processus peuvent partager la même base (workers de `experiments.run_grid`) :
+    elle est en mode WAL, et les nouveaux coûts sont gardés en mémoire puis écrits par une
+    transaction courte, validée immédiatement ; aucun verrou d'écriture n'est conservé entre deux appels.
+    Les coûts encore en attente sont écrits par `flush()` ou `close()`.
+    """
+    def __init__(self, max_size=100000, db_path=None, flush_every=100, flush_interval=1.0):
+        """
+        Initialise le cache LRU de taille `max_size`, et la base SQLite si `db_path` est fourni.
+        Les écritures sur disque sont regroupées par paquets de `flush_every`, ou dès que
+        la plus ancienne écriture en attente date de plus de `flush_interval` secondes.
+        """
+        self.max_size = max_size
+        self.db_path = db_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending_writes = []
+        self._oldest_pending = None
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path is not None:
+            # Mode autocommit : les transactions sont ouvertes et validées explicitement dans `_flush`
+            self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS path_costs ("
+                "seed INTEGER NOT NULL, path TEXT NOT NULL, cost REAL NOT NULL, "
+                "PRIMARY KEY (seed, path))"
+            )
+
+    @staticmethod
+    def _key(seed, path):
+        return int(seed), ",".join(map(str, path))
+
+    def get(self, seed, path):
+        """
+        Renvoie le coût mémorisé du chemin, ou None s'il n'a jamais été évalué.
+        """
+        key = self._key(seed, path)
+        with self._lock:
+            cost = self._entries.get(key)
+            if cost is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cost
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT cost FROM path_costs WHERE seed = ? AND path = ?", key
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, seed, path, cost):
+        """
+        Mémorise le coût d'un chemin (les coûts None, issus d'une erreur, sont ignorés).
+        """
+        if cost is None:
+            return
+        key = self._key(seed, path)
+        with self._lock:
+            self._remember(key, cost)
+            if self._db is not None:
+                if not self._pending_writes:
+                    self._oldest_pending = time.monotonic()
+                self._pending_writes.append((*key, cost))
+                if (len(self._pending_writes) >= self.flush_every
+                        or time.monotonic() - self._oldest_pending >= self.flush_interval):
+                    self._flush()
+
+    def flush(self):
+        """
+        Écrit sur disque les coûts en attente.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._db is None or not self._pending_writes:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("INSERT OR REPLACE INTO path_costs VALUES (?, ?, ?)", self._pending_writes)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._pending_writes = []
+
+    def _remember(self, key, cost):
+        self._entries[key] = cost
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Renvoie les compteurs de succès/échecs du cache et le taux de succès.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def close(self):
+        """
+        Écrit les entrées en attente sur disque et ferme la base.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._flush()
+                self._db.close()
+                self._db = None
+
+    def __len__(self):
+        return len(self._entries)
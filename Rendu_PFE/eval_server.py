@@ -0,0 +1,406 @@
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from blackbox_interface import (DEFAULT_RETRIES, EvaluationStats, get_batch_size, get_path_costs, remaining_time,
+                                 retry_pause)
+from cost_cache import PathCostCache
+
+def is_server_url(blackbox_path):
+    """
+    Indique si `blackbox_path` désigne un serveur d'évaluation (`http://hôte:port`) plutôt qu'un binaire.
+    """
+    return isinstance(blackbox_path, str) and blackbox_path.startswith(("http://", "https://"))
+
+class ClientStats:
+    """
+    Comptabilité d'un client du serveur : requêtes, chemins demandés, chemins servis par le cache
+    et temps passé à attendre les évaluations.
+    """
+    def __init__(self):
+        """
+        Initialise des compteurs vides.
+        """
+        self.requests = 0
+        self.paths = 0
+        self.cache_hits = 0
+        self.evaluation_time = 0.0
+        self.first_seen = None
+        self.last_seen = None
+
+    def record(self, paths, cache_hits, evaluation_time):
+        """
+        Enregistre une requête de `paths` chemins, dont `cache_hits` servis par le cache.
+        """
+        now = time.time()
+        self.first_seen = now if self.first_seen is None else self.first_seen
+        self.last_seen = now
+        self.requests += 1
+        self.paths += paths
+        self.cache_hits += cache_hits
+        self.evaluation_time += evaluation_time
+
+    def summary(self):
+        """
+        Renvoie les compteurs (et le débit en chemins par seconde) sous forme de dictionnaire.
+        """
+        elapsed = (self.last_seen - self.first_seen) if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "paths": self.paths,
+            "cache_hits": self.cache_hits,
+            "evaluation_time": self.evaluation_time,
+            "paths_per_second": self.paths / elapsed if elapsed > 0 else None,
+        }
+
+class EvaluationServer:
+    """
+    Service d'évaluation de chemins sur HTTP, partagé par plusieurs workers d'expériences
+    (sur une ou plusieurs machines).
+
+    Les clients envoient des lots `POST /evaluate` ({"client", "seed", "paths"}) et reçoivent
+    {"costs"}. Le serveur répond depuis un cache unique ; les chemins manquants de toutes
+    les requêtes en attente sont regroupés (et dédupliqués) en un seul lot pour l'évaluateur
+    sous-jacent (chemin du binaire, `BlackBoxEvaluator`, `PersistentEvaluator`, `LocalBlackBox`, ...).
+    `GET /stats` renvoie la comptabilité par client, l'état du cache et les échecs de l'évaluateur
+    sous-jacent par type (voir `EvaluationStats`).
+    """
+    def __init__(self, evaluator, host="127.0.0.1", port=0, cache=None, max_batch=1024, batch_window=0.001):
+        """
+        Prépare le serveur ; `port=0` choisit un port libre (voir `url`).
+        `batch_window` est le délai (en secondes) laissé aux requêtes concurrentes pour rejoindre un lot.
+        """
+        self.evaluator = evaluator
+        self.cache = cache if cache is not None else PathCostCache()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.clients = {}
+        self.evaluations = EvaluationStats()
+        self._clients_lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Réponses courtes sur connexion persistante : pas d'attente de Nagle entre en-têtes et corps
+            disable_nagle_algorithm = True
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except ConnectionError:
+                    # Client parti avant la réponse (délai dépassé de son côté) : le coût reste dans le cache
+                    self.close_connection = True
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    self._reply(200, server.stats())
+                else:
+                    self._reply(404, {"error": f"inconnu : {self.path}"})
+
+            def do_POST(self):
+                if self.path != "/evaluate":
+                    self._reply(404, {"error": f"inconnu : {self.path}"})
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                    costs = server.evaluate(request.get("client", self.client_address[0]),
+                                            int(request["seed"]), request["paths"])
+                except (KeyError, TypeError, ValueError) as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+                except Exception as e:
+                    self._reply(500, {"error": f"erreur de l'évaluateur : {e}"})
+                    return
+                self._reply(200, {"costs": costs})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def evaluate(self, client, seed, paths):
+        """
+        Renvoie les coûts d'un lot de chemins pour le client `client`, en passant par le cache
+        puis par le lot commun des évaluations en attente.
+        """
+        start = time.perf_counter()
+        costs = [self.cache.get(seed, path) for path in paths]
+        futures = {}
+        with self._in_flight_lock:
+            for i, cost in enumerate(costs):
+                if cost is None:
+                    # Un chemin déjà en cours d'évaluation (autre requête) n'est pas soumis une seconde fois
+                    # (le coût a pu arriver dans le cache depuis la première lecture)
+                    key = (seed, tuple(paths[i]))
+                    if key not in self._in_flight:
+                        costs[i] = self.cache.get(seed, paths[i])
+                        if costs[i] is not None:
+                            continue
+                        self._in_flight[key] = Future()
+                        self._pending.put((seed, key[1], self._in_flight[key]))
+                    futures[i] = self._in_flight[key]
+        for i, future in futures.items():
+            costs[i] = future.result()
+        with self._clients_lock:
+            stats = self.clients.setdefault(client, ClientStats())
+            stats.record(len(paths), len(paths) - len(futures), time.perf_counter() - start)
+        return costs
+
+    def _dispatch(self):
+        """
+        Boucle du thread d'évaluation : regroupe les chemins en attente, les évalue par graine
+        en un seul lot dédupliqué et remplit le cache.
+        """
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+            by_seed = {}
+            for seed, key, future in batch:
+                by_seed.setdefault(seed, {}).setdefault(key, []).append(future)
+            for seed, waiting in by_seed.items():
+                try:
+                    costs = get_path_costs(seed, [list(key) for key in waiting], self.evaluator,
+                                           stats=self.evaluations)
+                except Exception as e:
+                    for key, futures in waiting.items():
+                        with self._in_flight_lock:
+                            self._in_flight.pop((seed, key), None)
+                        for future in futures:
+                            future.set_exception(e)
+                    continue
+                for (key, futures), cost in zip(waiting.items(), costs):
+                    self.cache.put(seed, key, cost)
+                    with self._in_flight_lock:
+                        self._in_flight.pop((seed, key), None)
+                    for future in futures:
+                        future.set_result(cost)
+
+    def stats(self):
+        """
+        Renvoie la comptabilité par client, les statistiques du cache partagé et les échecs de l'évaluateur.
+        """
+        with self._clients_lock:
+            clients = {client: stats.summary() for client, stats in self.clients.items()}
+        evaluations = self.evaluations.summary()
+        return {"clients": clients, "cache": self.cache.stats(), "max_workers": get_batch_size(self.evaluator),
+                "failure_kinds": evaluations["failure_kinds"], "retries": evaluations["retries"]}
+
+    def start(self):
+        """
+        Lance le serveur et le thread d'évaluation en arrière-plan.
+        """
+        self._threads = [threading.Thread(target=self._dispatch, daemon=True),
+                         threading.Thread(target=self._httpd.serve_forever, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Lance le thread d'évaluation et sert les requêtes dans le thread courant.
+        """
+        self._threads = [threading.Thread(target=self._dispatch, daemon=True)]
+        self._threads[0].start()
+        self._httpd.serve_forever()
+
+    def close(self):
+        """
+        Arrête le serveur, le thread d'évaluation, puis ferme le cache et l'évaluateur sous-jacent.
+        """
+        if self._threads:
+            self._httpd.shutdown()
+        self._httpd.server_close()
+        self._pending.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.cache.close()
+        if hasattr(self.evaluator, "close"):
+            self.evaluator.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class RemoteEvaluator:
+    """
+    Client d'un `EvaluationServer`, utilisable partout où les solveurs attendent `blackbox_path`.
+
+    Chaque thread garde sa propre connexion HTTP persistante ; `submit` passe par un pool
+    de `max_workers` threads (par défaut, la taille de lot annoncée par le serveur).
+    Chaque requête est surveillée comme un appel à la Black Box : au plus `timeout` secondes, sans dépasser
+    la `deadline` reçue, et `retries` nouvelles tentatives. Les échecs sont comptés par type dans `stats`
+    (`timeout` : pas de réponse à temps, `exit` : connexion perdue ou erreur du serveur,
+    `parse` : réponse illisible) ; les chemins d'un lot qui échoue jusqu'au bout ont un coût None.
+    """
+    supports_deadline = True
+
+    def __init__(self, url, client=None, max_workers=None, timeout=60, retries=DEFAULT_RETRIES, backoff=0.05):
+        """
+        Initialise le client avec l'adresse du serveur et le nom sous lequel il est comptabilisé.
+        """
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port
+        self.client = client or f"{socket.gethostname()}:{os.getpid()}"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self.max_workers = max_workers or self._request("GET", "/stats")["max_workers"]
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="remote")
+
+    def _request(self, method, path, body=None, timeout=None):
+        """
+        Envoie une requête JSON au serveur et renvoie la réponse décodée, en au plus `timeout` secondes
+        (par défaut `self.timeout`). En cas d'erreur, la connexion est fermée avant de propager l'exception.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            reply = json.loads(response.read())
+        except (OSError, http.client.HTTPException, ValueError):
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"Serveur d'évaluation : {reply.get('error')}")
+        return reply
+
+    def evaluate_batch(self, seed, paths, deadline=None, stats=None):
+        """
+        Évalue un lot de chemins en une seule requête et renvoie les coûts dans l'ordre.
+        """
+        paths = [[int(node) for node in path] for path in paths]
+        body = {"client": self.client, "seed": seed, "paths": paths}
+        for attempt in range(self.retries + 1):
+            time_left = remaining_time(self.timeout, deadline)
+            if time_left is not None and time_left <= 0:
+                kind, error = "timeout", "délai de l'appel écoulé"
+            else:
+                try:
+                    return self._request("POST", "/evaluate", body, time_left)["costs"]
+                except socket.timeout:
+                    kind, error = "timeout", f"aucune réponse après {time_left:.3g} s"
+                except (OSError, http.client.HTTPException, RuntimeError) as e:
+                    kind, error = "exit", e
+                except ValueError as e:
+                    kind, error = "parse", f"réponse illisible ({e})"
+            pause = retry_pause(kind, attempt, self.retries, self.backoff, deadline, stats)
+            if pause is None:
+                break
+            time.sleep(pause)
+        print(f"Erreur du serveur d'évaluation : {error} ; {len(paths)} chemins sans réponse")
+        return [None] * len(paths)
+
+    def evaluate(self, seed, path, deadline=None, stats=None):
+        """
+        Évalue un seul chemin de manière bloquante.
+        """
+        return self.evaluate_batch(seed, [path], deadline, stats)[0]
+
+    def submit(self, seed, path, deadline=None, stats=None):
+        """
+        Soumet l'évaluation d'un chemin et renvoie immédiatement un `Future` contenant son coût.
+        """
+        return self._executor.submit(self.evaluate, seed, path, deadline, stats)
+
+    def stats(self):
+        """
+        Renvoie la comptabilité du serveur (tous clients confondus).
+        """
+        return self._request("GET", "/stats")
+
+    def close(self):
+        """
+        Attend la fin des évaluations soumises puis ferme la connexion du thread courant.
+        """
+        self._executor.shutdown(wait=True)
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def main(argv=None):
+    """
+    Lance un serveur d'évaluation : `python eval_server.py --port 8765 [--blackbox blackBox.exe]`.
+    Sans `--blackbox`, les coûts viennent de l'oracle local, servi par des évaluateurs persistants.
+    """
+    from blackbox_interface import BlackBoxEvaluator, PersistentEvaluator
+
+    parser = argparse.ArgumentParser(description="Serveur d'évaluation de chemins partagé")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--blackbox", help="chemin du binaire Black Box (par défaut : oracle local)")
+    parser.add_argument("--workers", type=int, default=None, help="évaluations simultanées")
+    parser.add_argument("--cache", default=None, help="fichier SQLite du cache partagé")
+    args = parser.parse_args(argv)
+
+    if args.blackbox:
+        evaluator = BlackBoxEvaluator(args.blackbox, max_workers=args.workers)
+    else:
+        evaluator = PersistentEvaluator(max_workers=args.workers)
+    server = EvaluationServer(evaluator, host=args.host, port=args.port, cache=PathCostCache(db_path=args.cache))
+    print(f"[Serveur] Évaluations sur {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+if __name__ == "__main__":
+    main()
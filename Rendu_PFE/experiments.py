@@ -0,0 +1,257 @@
+import json
+import os
+import random
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+import numpy as np
+
+from anytime import ConvergenceTrace
+from baseline import baseline_method
+from blackbox_interface import CachedEvaluator, PersistentEvaluator
+from checkpoint import SolverState
+from cost_cache import PathCostCache
+from eval_server import RemoteEvaluator, is_server_url
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from local_search import with_local_search
+from portfolio import portfolio_search
+from profiling import SolverProfile
+from monte_carlo import (
+    monte_carlo_simulation,
+    monte_carlo_simulation_with_exploration,
+    monte_carlo_tree_search,
+    monte_carlo_with_nested_rollouts
+)
+from q_learning import GraphEnvironment, batched_q_learning, q_learning
+
+def _run_baseline(graph, source, target, seed, evaluator, trace, profile, duration, max_evaluations, solver_state=None):
+    # La méthode témoin n'a pas de budget : son résultat vaut pour toutes les durées
+    path, cost = baseline_method(graph, source, target, seed, evaluator, profile=profile)
+    if path and cost is not None:
+        trace.record(0.0, 0, cost, path)
+
+def _run_q_learning(graph, source, target, seed, evaluator, trace, profile, duration, max_evaluations,
+                    solver_state=None):
+    env = GraphEnvironment(graph, source, target, seed, evaluator)
+    q_learning(env, duration, evaluator, trace=trace, max_evaluations=max_evaluations, profile=profile,
+               solver_state=solver_state)
+
+def _run_batched_q_learning(graph, source, target, seed, evaluator, trace, profile, duration, max_evaluations,
+                            solver_state=None):
+    env = GraphEnvironment(graph, source, target, seed, evaluator)
+    batched_q_learning(env, duration, evaluator, trace=trace, max_evaluations=max_evaluations, profile=profile,
+                       solver_state=solver_state)
+
+def _run_solver(solver, resumable=True):
+    # Seuls les solveurs `resumable` acceptent un `SolverState` (voir `checkpoint`)
+    def run(graph, source, target, seed, evaluator, trace, profile, duration, max_evaluations, solver_state=None):
+        options = {"solver_state": solver_state} if resumable else {}
+        solver(graph, source, target, duration, seed, evaluator, trace=trace,
+               max_evaluations=max_evaluations, profile=profile, **options)
+    return run
+
+# Méthodes comparées, sous les noms utilisés dans les résultats et les courbes
+METHODS = {
+    "Baseline": _run_baseline,
+    "Monte Carlo": _run_solver(monte_carlo_simulation),
+    "Monte Carlo Exploration": _run_solver(monte_carlo_simulation_with_exploration),
+    "Monte Carlo Nested Rollouts": _run_solver(monte_carlo_with_nested_rollouts, resumable=False),
+    "MCTS": _run_solver(monte_carlo_tree_search),
+    "Monte Carlo + Local Search": _run_solver(with_local_search(monte_carlo_simulation)),
+    "Q-Learning": _run_q_learning,
+    "Q-Learning Batch": _run_batched_q_learning,
+    "Portfolio": _run_solver(portfolio_search, resumable=False),
+}
+
+def cell_seed(base_seed, *keys):
+    """
+    Dérive une graine reproductible pour une cellule de la grille à partir de ses coordonnées.
+    """
+    entropy = [base_seed] + [int(round(key * 1000)) if isinstance(key, float) else key for key in keys]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+_worker_evaluator = None
+
+def _init_worker(blackbox_path, cache_path):
+    """
+    Crée, une fois par processus, l'évaluateur (précédé d'un cache) utilisé par toutes ses cellules.
+    `blackbox_path` est le chemin du binaire (un processus par chemin), une ligne de commande
+    (liste) d'évaluateur persistant (`PersistentEvaluator`, un worker par processus), l'adresse
+    d'un serveur d'évaluation partagé (`http://hôte:port`, voir `eval_server`) ou None (oracle local).
+    Le cache est fermé (coûts en attente écrits sur disque) à l'arrêt du processus.
+    """
+    global _worker_evaluator
+    if blackbox_path is None:
+        oracle = LocalBlackBox()
+    elif is_server_url(blackbox_path):
+        oracle = RemoteEvaluator(blackbox_path)
+    elif isinstance(blackbox_path, (list, tuple)):
+        oracle = PersistentEvaluator(blackbox_path, max_workers=1)
+    else:
+        oracle = blackbox_path
+    _worker_evaluator = CachedEvaluator(oracle, PathCostCache(db_path=cache_path))
+    Finalize(_worker_evaluator, _worker_evaluator.close, exitpriority=10)
+
+def cell_key(cell):
+    """
+    Identifie une cellule (ou un enregistrement) de la grille : (nœuds, densité, graphe, méthode).
+    """
+    return cell["num_nodes"], cell["density"], cell["graph_index"], cell["method"]
+
+def checkpoint_file(cell):
+    """
+    Renvoie le fichier `.npz` où est sauvegardé l'état du solveur d'une cellule, ou None.
+    """
+    if not cell.get("checkpoint_dir"):
+        return None
+    num_nodes, density, graph_index, method = cell_key(cell)
+    name = (f"{method.replace(' ', '_')}_n{num_nodes}_p{density}_g{graph_index}_b{cell['base_seed']}"
+            f"_s{cell['seed']}.npz")
+    return os.path.join(cell["checkpoint_dir"], name)
+
+def run_cell(cell):
+    """
+    Exécute une cellule (graphe, méthode) de la grille au budget le plus large et renvoie
+    un enregistrement par budget demandé, lu dans l'historique « anytime » du solveur,
+    avec le profil d'exécution (temps par phase, latences de la Black Box).
+    Avec un `checkpoint_dir`, le solveur repart de l'état sauvegardé de la cellule et ne reçoit que
+    le budget qui reste une fois retiré le travail des runs précédents (rien s'il est épuisé) ;
+    l'historique reprend à la suite du leur, puis l'état mis à jour est réécrit.
+    """
+    graph_seed = cell_seed(cell["base_seed"], cell["num_nodes"], cell["density"], cell["graph_index"])
+    solver_seed = cell_seed(graph_seed, zlib.crc32(cell["method"].encode()))
+    graph = generate_connected_graph(cell["num_nodes"], cell["density"], seed=graph_seed,
+                                     cache_dir=cell.get("graph_cache_dir"))
+    source, target = 0, cell["num_nodes"] - 1
+
+    random.seed(solver_seed)
+    np.random.seed(solver_seed % 2 ** 32)
+    trace = ConvergenceTrace()
+    profile = SolverProfile(cell["method"])
+    durations = cell["durations"] or []
+    evaluation_budgets = cell.get("evaluation_budgets") or []
+    duration, max_evaluations = max(durations, default=None), max(evaluation_budgets, default=None)
+    state_file = checkpoint_file(cell)
+    solver_state = SolverState.load_or_create(state_file, cell["seed"]) if state_file else None
+    solver_trace = trace
+    if solver_state is not None:
+        solver_trace = solver_state.resume_trace(trace)
+        duration, max_evaluations = solver_state.remaining(duration, max_evaluations)
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    if duration != 0 and max_evaluations != 0:
+        METHODS[cell["method"]](graph, source, target, cell["seed"], _worker_evaluator, solver_trace, profile,
+                                duration, max_evaluations, solver_state=solver_state)
+    wall_time, cpu_time = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    _worker_evaluator.cache.flush()
+    if state_file:
+        solver_state.add_run(trace, wall_time, profile.evaluations.calls)
+        solver_state.save(state_file)
+
+    budgets = [(duration, None, trace.best_at(duration)) for duration in durations]
+    budgets += [(None, evaluations, trace.best_within_evaluations(evaluations)) for evaluations in evaluation_budgets]
+    records = []
+    for duration, max_evaluations, (path, cost) in budgets:
+        records.append({
+            "num_nodes": cell["num_nodes"],
+            "density": cell["density"],
+            "graph_index": cell["graph_index"],
+            "graph_seed": graph_seed,
+            "method": cell["method"],
+            "duration": duration,
+            "max_evaluations": max_evaluations,
+            "cost": cost if path is not None else None,
+            "path": path,
+            "solver_seed": solver_seed,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "improvements": len(trace),
+            "profile": profile.summary(),
+            "pid": os.getpid(),
+        })
+    return records
+
+def build_cells(graph_sizes, graph_densities, durations, num_graphs, seed, methods=None, base_seed=0,
+                evaluation_budgets=None, graph_cache_dir=None, checkpoint_dir=None):
+    """
+    Construit la liste des cellules indépendantes (graphe, méthode) de la grille d'expériences.
+    Les budgets sont des durées (`durations`) et/ou des nombres d'évaluations (`evaluation_budgets`) ;
+    avec `durations=None`, seuls les budgets en évaluations, reproductibles, sont utilisés.
+    Les instances sont conservées dans `graph_cache_dir` (voir `generate_connected_graph`),
+    l'état des solveurs dans `checkpoint_dir` (voir `run_cell`).
+    """
+    methods = list(METHODS) if methods is None else methods
+    return [
+        {"num_nodes": num_nodes, "density": density, "graph_index": graph_index, "method": method,
+         "durations": sorted(durations or []), "evaluation_budgets": sorted(evaluation_budgets or []),
+         "seed": seed, "base_seed": base_seed, "graph_cache_dir": graph_cache_dir,
+         "checkpoint_dir": checkpoint_dir}
+        for num_nodes in graph_sizes
+        for density in graph_densities
+        for graph_index in range(num_graphs)
+        for method in methods
+    ]
+
+def solve_cell(cell, blackbox_path=None, cache_path=None):
+    """
+    Exécute une seule cellule dans le processus courant, avec le même évaluateur qu'un worker
+    de la grille (voir `_init_worker`), et renvoie ses enregistrements.
+    """
+    _init_worker(blackbox_path, cache_path)
+    return run_cell(cell)
+
+def run_grid(cells, store_path, blackbox_path=None, cache_path=None, max_workers=None, resume=False):
+    """
+    Répartit les cellules sur un pool de processus et ajoute leurs résultats, au fil de l'eau,
+    au fichier JSON Lines `store_path`. `blackbox_path=None` utilise l'oracle local (voir `_init_worker`).
+    Avec `resume`, les cellules déjà présentes dans `store_path` (balayage interrompu) ne sont pas relancées.
+    Renvoie la liste de tous les enregistrements produits (et relus).
+    """
+    all_records = []
+    if resume and os.path.exists(store_path):
+        all_records = load_results(store_path)
+        finished = {cell_key(record) for record in all_records}
+        cells = [cell for cell in cells if cell_key(cell) not in finished]
+        print(f"[Grille] Reprise : {len(finished)} cellules déjà terminées, {len(cells)} restantes")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(blackbox_path, cache_path)) as pool:
+        futures = [pool.submit(run_cell, cell) for cell in cells]
+        with open(store_path, "a", encoding="utf-8") as store:
+            for done, future in enumerate(as_completed(futures), start=1):
+                records = future.result()
+                for record in records:
+                    store.write(json.dumps(record) + "\n")
+                store.flush()
+                all_records.extend(records)
+                print(f"[Grille] {done}/{len(futures)} cellules terminées "
+                      f"({records[0]['method']}, {records[0]['num_nodes']} nœuds, densité {records[0]['density']})")
+    return all_records
+
+def load_results(store_path):
+    """
+    Relit tous les enregistrements d'un fichier de résultats JSON Lines.
+    """
+    with open(store_path, "r", encoding="utf-8") as store:
+        return [json.loads(line) for line in store if line.strip()]
+
+def record_budget(record):
+    """
+    Renvoie le budget d'un enregistrement : sa durée, ou à défaut son nombre d'évaluations.
+    """
+    return record["duration"] if record.get("duration") is not None else record["max_evaluations"]
+
+def average_costs(records):
+    """
+    Agrège les enregistrements : coût moyen par (nœuds, densité, budget) puis par méthode.
+    Les cellules sans chemin trouvé comptent pour un coût infini.
+    """
+    grouped = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        key = (record["num_nodes"], record["density"], record_budget(record))
+        cost = record["cost"] if record["cost"] is not None else float('inf')
+        grouped[key][record["method"]].append(cost)
+    return {key: {method: float(np.mean(costs)) for method, costs in by_method.items()}
+            for key, by_method in grouped.items()}
@@ -1,28 +1,147 @@
+import os
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
 
-def generate_connected_graph(num_nodes, probability):
+def generate_connected_graph(num_nodes, probability, seed=None, cache_dir=None):
     """
     Génère un graphe connexe avec un nombre donné de sommets et une probabilité d'avoir une arête.
-    Réessaie jusqu'à ce qu'un graphe connexe soit créé.
+    La connexité est garantie en une seule passe : un arbre couvrant aléatoire relie tous les sommets,
+    puis chaque autre paire reçoit une arête avec la probabilité `probability` (`sample_gnp_edges`).
+    Avec une graine `seed`, la même instance est régénérée à l'identique ; si `cache_dir` est fourni,
+    la liste d'arêtes est de plus conservée dans `cache_dir` (fichier `.npz` par (n, p, seed)).
     """
-    while True:
-        G = nx.gnp_random_graph(num_nodes, probability)
-        if nx.is_connected(G):
-            print(f"Graphe connexe généré avec {num_nodes} sommets et une densité de {probability}.")
-            return G
-        print("Graphe non connexe détecté, tentative de régénération...")
+    cache_file = None
+    if cache_dir is not None and seed is not None:
+        cache_file = os.path.join(cache_dir, f"graph_n{num_nodes}_p{probability}_s{seed}.npz")
+        if os.path.exists(cache_file):
+            with np.load(cache_file) as arrays:
+                return _graph_from_edges(num_nodes, arrays["edges"])
 
-def draw_graph(graph):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(num_nodes)
+    # Arbre couvrant : le i-ème sommet (dans un ordre aléatoire) se rattache à l'un des i précédents
+    parents = order[(rng.random(num_nodes - 1) * np.arange(1, num_nodes)).astype(np.int64)]
+    tree = np.column_stack((order[1:], parents))
+    edges = np.concatenate((np.sort(tree, axis=1), sample_gnp_edges(num_nodes, probability, rng)))
+    keys = np.unique(edges[:, 0].astype(np.int64) * num_nodes + edges[:, 1])
+    edges = np.column_stack((keys // num_nodes, keys % num_nodes)).astype(np.int32)
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Écriture atomique : plusieurs processus de la grille peuvent générer la même instance
+        temporary = f"{cache_file}.{os.getpid()}.tmp.npz"
+        np.savez(temporary, edges=edges, num_nodes=num_nodes)
+        os.replace(temporary, cache_file)
+    print(f"Graphe connexe généré avec {num_nodes} sommets et une densité de {probability}.")
+    return _graph_from_edges(num_nodes, edges)
+
+def sample_gnp_edges(num_nodes, probability, rng):
+    """
+    Tire les arêtes d'un graphe G(n, p) sans parcourir les n² paires : comme `nx.fast_gnp_random_graph`,
+    on saute d'une arête à la suivante selon une loi géométrique, mais par blocs NumPy.
+    Renvoie un tableau (m, 2) de paires (u, v) avec u < v.
+    """
+    num_pairs = num_nodes * (num_nodes - 1) // 2
+    if probability <= 0 or num_pairs == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if probability >= 1:
+        pairs = np.arange(num_pairs, dtype=np.int64)
+    else:
+        chunks, position = [], -1
+        chunk_size = int(num_pairs * probability * 1.1) + 16
+        while position < num_pairs:
+            steps = np.cumsum(rng.geometric(probability, size=chunk_size)) + position
+            chunks.append(steps[steps < num_pairs])
+            position = steps[-1]
+        pairs = np.concatenate(chunks)
+    # Paire numéro k = v(v-1)/2 + u, avec u < v (énumération colonne par colonne)
+    columns = ((1 + np.sqrt(1 + 8 * pairs.astype(np.float64))) // 2).astype(np.int64)
+    columns -= columns * (columns - 1) // 2 > pairs
+    columns += (columns + 1) * columns // 2 <= pairs
+    return np.column_stack((pairs - columns * (columns - 1) // 2, columns))
+
+def _graph_from_edges(num_nodes, edges):
+    graph = nx.Graph()
+    graph.add_nodes_from(range(num_nodes))
+    graph.add_edges_from(edges.tolist())
+    return graph
+
+def compute_hop_distances(graph, target):
+    """
+    Calcule, par un unique parcours en largeur depuis la cible, le nombre minimal de sauts
+    restant entre chaque nœud et `target`.
+    Renvoie un tableau indexé par l'identifiant du nœud (np.inf si la cible est inaccessible).
     """
-    Affiche le graphe avec Matplotlib.
+    reverse = graph.reverse(copy=False) if graph.is_directed() else graph
+    hops = np.full(max(graph.nodes()) + 1, np.inf)
+    for node, distance in nx.single_source_shortest_path_length(reverse, target).items():
+        hops[node] = distance
+    return hops
+
+class CSRGraph:
+    """
+    Représentation compacte (CSR) d'un graphe : les voisins du nœud `u` sont
+    `indices[indptr[u]:indptr[u + 1]]`, triés par identifiant.
+
+    Chaque arc (u, v) reçoit un identifiant entier, sa position dans `indices` : les valeurs
+    apprises par arête (table Q, poids d'exploration, ...) tiennent ainsi dans des tableaux plats.
+    Pour un graphe non orienté, (u, v) et (v, u) sont deux arcs distincts.
     """
-    plt.figure(figsize=(8, 6))
-    pos = nx.spring_layout(graph)  # Disposition des nœuds
-    nx.draw(graph, pos, with_labels=True, node_color='lightblue', edge_color='gray', node_size=500, font_size=10)
-    plt.title("Visualisation du Graphe")
-    plt.show()
+    def __init__(self, indptr, indices):
+        """
+        Initialise la structure à partir des tableaux `indptr` et `indices`.
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.num_nodes = len(indptr) - 1
+        self.num_edges = len(indices)
+        self._arc_keys = None
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """
+        Construit la représentation CSR d'un graphe networkx à nœuds entiers.
+        """
+        num_nodes = max(graph.nodes()) + 1
+        degrees = np.zeros(num_nodes + 1, dtype=np.int64)
+        rows = [sorted(graph.neighbors(node)) if node in graph else [] for node in range(num_nodes)]
+        degrees[1:] = [len(row) for row in rows]
+        indptr = np.cumsum(degrees)
+        indices = np.fromiter((v for row in rows for v in row), dtype=np.int32, count=int(indptr[-1]))
+        return cls(indptr, indices)
+
+    def neighbors(self, node):
+        """
+        Renvoie les voisins de `node` (vue sur le tableau `indices`, sans copie).
+        """
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def edge_id(self, u, v):
+        """
+        Renvoie l'identifiant de l'arc (u, v), ou -1 s'il n'existe pas.
+        """
+        first, last = self.indptr[u], self.indptr[u + 1]
+        position = first + np.searchsorted(self.indices[first:last], v)
+        if position < last and self.indices[position] == v:
+            return int(position)
+        return -1
+
+    def edge_ids(self, sources, destinations):
+        """
+        Version vectorisée de `edge_id` pour des tableaux d'extrémités (-1 pour un arc absent).
+        Les arcs sont triés par (origine, destination) : une seule recherche dichotomique suffit.
+        """
+        if self._arc_keys is None:
+            rows = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+            self._arc_keys = rows * self.num_nodes + self.indices
+        keys = np.asarray(sources, dtype=np.int64) * self.num_nodes + np.asarray(destinations, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._arc_keys, keys), max(self.num_edges - 1, 0))
+        found = self._arc_keys[positions] == keys if self.num_edges else np.zeros(keys.shape, dtype=bool)
+        return np.where(found, positions, -1)
 
-# Exemple d'utilisation
-#graph = generate_connected_graph(10, 0.2)
-#draw_graph(graph)
+    def path_edges(self, path):
+        """
+        Renvoie les identifiants des arcs successifs d'un chemin.
+        """
+        path = np.asarray(path, dtype=np.int64)
+        return self.edge_ids(path[:-1], path[1:])
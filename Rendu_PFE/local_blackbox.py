@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import sys
+import numpy as np
+
+_MASK_01 = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_KEY_U = np.uint64(0xD6E8FEB86659FD93)
+_KEY_W = np.uint64(0xA0761D6478BD642F)
+_TO_UNIT = 1.0 / float(2 ** 64)
+
+def _splitmix64(values):
+    """
+    Mélange SplitMix64 vectorisé : transforme des entiers uint64 en entiers pseudo-aléatoires.
+    """
+    z = values + _MASK_01
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+def _uniform(seed, *keys):
+    """
+    Tire un réel uniforme dans [0, 1) pour chaque combinaison (seed, clés), de manière déterministe.
+    """
+    h = _splitmix64(np.full(keys[0].shape, seed, dtype=np.uint64))
+    for key in keys:
+        h = _splitmix64(h ^ key)
+    return h.astype(np.float64) * _TO_UNIT
+
+class LocalBlackBox:
+    """
+    Oracle de coût local, déterministe et sans sous-processus, qui remplace `blackBox.exe`.
+
+    Il respecte le même contrat `<seed> <id,id,...>` : pour une graine fixée, le coût d'un
+    chemin est toujours le même. Le coût combine un coût propre à chaque arête (symétrique)
+    et un terme d'interaction entre arêtes consécutives, afin de ne pas être purement additif.
+    L'instance est appelable (`oracle(seed, path)`) et peut donc être passée directement
+    aux solveurs à la place de `blackbox_path`.
+    """
+    def __init__(self, edge_cost_range=(0.01, 0.1), turn_cost=0.02):
+        """
+        Initialise l'oracle avec l'intervalle des coûts d'arêtes et l'amplitude du terme d'interaction.
+        """
+        self.edge_cost_low, self.edge_cost_high = edge_cost_range
+        self.turn_cost = turn_cost
+
+    def edge_costs(self, seed, u, v):
+        """
+        Renvoie le coût propre de chaque arête (u[i], v[i]) pour la graine `seed`, hors terme d'interaction.
+        """
+        u, v = np.asarray(u, dtype=np.uint64), np.asarray(v, dtype=np.uint64)
+        low, high = np.minimum(u, v), np.maximum(u, v)
+        edge_draws = _uniform(np.uint64(seed & 0xFFFFFFFFFFFFFFFF), low * _KEY_U, high)
+        return self.edge_cost_low + (self.edge_cost_high - self.edge_cost_low) * edge_draws
+
+    def __call__(self, seed, path):
+        """
+        Renvoie le coût du chemin `path` (liste d'identifiants de nœuds) pour la graine `seed`.
+        """
+        nodes = np.asarray(path, dtype=np.int64).astype(np.uint64)
+        if nodes.size < 2:
+            return 0.0
+        cost = np.sum(self.edge_costs(seed, nodes[:-1], nodes[1:]))
+        seed = np.uint64(seed & 0xFFFFFFFFFFFFFFFF)
+        if nodes.size > 2:
+            turn_draws = _uniform(seed, nodes[:-2], nodes[1:-1] * _KEY_W, nodes[2:])
+            cost += self.turn_cost * np.sum(turn_draws ** 2)
+        return round(float(cost), 6)
+
+def parse_path(path_str):
+    """
+    Convertit une chaîne `id,id,...` en liste d'entiers.
+    """
+    return [int(node) for node in path_str.split(",") if node.strip()]
+
+def serve(stdin=None, stdout=None):
+    """
+    Mode évaluateur persistant : lit sur `stdin` une requête `<seed> <id,id,...>` par ligne
+    et écrit le coût correspondant sur `stdout`, une ligne par requête, dans l'ordre.
+    Une requête invalide renvoie `nan` (le message part sur stderr). S'arrête à la fin de l'entrée.
+    """
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    oracle = LocalBlackBox()
+    for line in stdin:
+        fields = line.split()
+        try:
+            seed, path = int(fields[0]), parse_path(fields[1] if len(fields) > 1 else "")
+            stdout.write(f"{oracle(seed, path)}\n")
+        except (ValueError, IndexError) as e:
+            print(f"Requête invalide {line.strip()!r} : {e}", file=sys.stderr)
+            stdout.write("nan\n")
+        stdout.flush()
+    return 0
+
+def main(argv=None):
+    """
+    Point d'entrée en ligne de commande, identique à `blackBox.exe <seed> <id,id,...>`.
+    Avec `--serve`, le processus reste actif et évalue les requêtes lues sur l'entrée standard (voir `serve`).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv == ["--serve"]:
+        return serve()
+    if len(argv) != 2:
+        print("Usage : local_blackbox.py <seed> <id,id,...> | local_blackbox.py --serve", file=sys.stderr)
+        return 2
+    try:
+        seed, path = int(argv[0]), parse_path(argv[1])
+    except ValueError as e:
+        print(f"Argument invalide : {e}", file=sys.stderr)
+        return 2
+    print(LocalBlackBox()(seed, path))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import math
+import random
+import numpy as np
+from anytime import SearchBudget, ShiftedTrace
+from blackbox_interface import get_batch_size, get_path_costs
+from graph_utils import CSRGraph, compute_hop_distances
+from profiling import SolverProfile
+from rollouts import generate_random_paths
+
+def remove_loops(path):
+    """
+    Supprime les boucles d'un chemin : à chaque nœud répété, le tronçon entre ses deux passages est retiré.
+    """
+    result, position = [], {}
+    for node in path:
+        if node in position:
+            for removed in result[position[node] + 1:]:
+                del position[removed]
+            del result[position[node] + 1:]
+        else:
+            position[node] = len(result)
+            result.append(node)
+    return result
+
+class PathNeighborhood:
+    """
+    Voisinage d'un chemin pour la recherche locale. Les mouvements, tous limités aux arêtes du graphe,
+    renvoient des chemins simples de même source et même cible :
+      - raccourci : une arête relie deux nœuds non consécutifs du chemin, le tronçon intermédiaire est retiré ;
+      - substitution : un nœud intérieur est remplacé par un voisin commun de ses deux voisins sur le chemin ;
+      - insertion : une arête (a, b) du chemin devient le détour a, w, b par un voisin commun w ;
+      - détour : le tronçon entre deux nœuds du chemin est remplacé par des marches aléatoires
+        (`generate_random_paths`, guidées par la distance en sauts à la fin du tronçon) d'au plus
+        `detour_slack` arcs de plus, hors des autres nœuds du chemin.
+    """
+    def __init__(self, G, detour_span=8, detour_slack=3, walks_per_detour=4, rng=None):
+        """
+        Prépare le voisinage pour le graphe `G` ; `detour_span` borne le nombre d'arcs d'un tronçon remplacé.
+        """
+        self.graph = G
+        self.csr = CSRGraph.from_networkx(G)
+        self.neighbor_sets = [set(self.csr.neighbors(node).tolist()) for node in range(self.csr.num_nodes)]
+        self.detour_span = detour_span
+        self.detour_slack = detour_slack
+        self.walks_per_detour = walks_per_detour
+        self._hops = {}
+        self.rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+        self._arc_weights = np.ones(self.csr.num_edges)
+
+    def shortcuts(self, path):
+        position = {node: i for i, node in enumerate(path)}
+        for i, node in enumerate(path):
+            for j in sorted(position[v] for v in self.neighbor_sets[node] if position.get(v, -1) > i + 1):
+                yield path[:i + 1] + path[j:]
+
+    def substitutions(self, path):
+        on_path = set(path)
+        for i in range(1, len(path) - 1):
+            for w in self.neighbor_sets[path[i - 1]] & self.neighbor_sets[path[i + 1]]:
+                if w not in on_path:
+                    yield path[:i] + [w] + path[i + 1:]
+
+    def insertions(self, path):
+        on_path = set(path)
+        for i in range(len(path) - 1):
+            for w in self.neighbor_sets[path[i]] & self.neighbor_sets[path[i + 1]]:
+                if w not in on_path:
+                    yield path[:i + 1] + [w] + path[i + 1:]
+
+    def hops_to(self, node):
+        """
+        Distances en sauts vers `node`, calculées une seule fois par nœud.
+        """
+        if node not in self._hops:
+            self._hops[node] = compute_hop_distances(self.graph, node)
+        return self._hops[node]
+
+    def detours(self, path, count):
+        """
+        Tire environ `count` détours aléatoires : des tronçons (i, j) au hasard, chacun remplacé par
+        `walks_per_detour` marches simples de `path[i]` à `path[j]` qui évitent les nœuds du chemin hors du tronçon.
+        """
+        csr, detours = self.csr, []
+        for _ in range(-(-count // self.walks_per_detour)):
+            if len(path) < 3:
+                break
+            i = int(self.rng.integers(len(path) - 2))
+            j = int(self.rng.integers(i + 2, min(len(path), i + self.detour_span + 1)))
+            outside = np.array(path[:i + 1] + path[j + 1:])
+            degrees = np.diff(csr.indptr)[outside]
+            blocked = csr.edge_ids(np.concatenate([csr.neighbors(node) for node in outside]),
+                                   np.repeat(outside, degrees))
+            self._arc_weights[blocked] = 0.0
+            walks = generate_random_paths(csr, path[i], path[j], self.walks_per_detour, arc_weights=self._arc_weights,
+                                          rng=self.rng, max_length=j - i + self.detour_slack, hops=self.hops_to(path[j]))
+            self._arc_weights[blocked] = 1.0
+            detours.extend(path[:i] + walk + path[j + 1:] for walk in walks)
+        return detours
+
+    def moves(self, path, limit):
+        """
+        Renvoie au plus `limit` mouvements distincts du chemin : tous les raccourcis, puis un échantillon
+        des substitutions et insertions, complété par des détours aléatoires.
+        """
+        shortcuts = list(self.shortcuts(path))
+        local = list(self.substitutions(path)) + list(self.insertions(path))
+        self.rng.shuffle(local)
+        candidates = shortcuts + local
+        candidates += self.detours(path, max(limit - len(candidates), limit // 4))
+        unique = {}
+        for candidate in candidates:
+            unique.setdefault(tuple(candidate), candidate)
+        return list(unique.values())[:limit]
+
+def local_search(G, path, seed, blackbox_path, cost=None, duration=None, max_evaluations=None, moves_per_round=None,
+                 temperature=None, cooling=0.9, trace=None, profile=None, neighborhood=None, known_costs=None):
+    """
+    Recherche locale autour d'un chemin déjà évalué (l'incumbent d'un solveur quelconque) : à chaque tour,
+    au plus `moves_per_round` mouvements du chemin courant (`PathNeighborhood`) sont évalués en un seul lot,
+    sans jamais renvoyer à la Black Box un chemin déjà connu (`known_costs`, partagé avec l'appelant).
+      - Sans `temperature` : descente gloutonne, le meilleur mouvement est accepté s'il améliore le chemin courant.
+        La recherche s'arrête quand dix tours de suite n'apportent aucun chemin nouveau.
+      - Avec `temperature` (fraction du coût initial, ex. 0.05) : recuit simulé, le meilleur mouvement du tour
+        est accepté avec la probabilité exp(-Δ / T), T étant multiplié par `cooling` à chaque tour.
+    Les boucles du chemin de départ sont d'abord retirées. Budget, `trace` et `profile` :
+    voir `monte_carlo_simulation`. Renvoie le meilleur chemin trouvé et son coût.
+    """
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Recherche locale")
+    evaluator = profile.instrument(blackbox_path, budget)
+    neighborhood = neighborhood if neighborhood is not None else PathNeighborhood(G)
+    moves_per_round = moves_per_round or max(32, get_batch_size(blackbox_path))
+    known_costs = known_costs if known_costs is not None else {}
+    eval_count = 0
+
+    def evaluate(paths):
+        nonlocal eval_count
+        paths = [candidate for candidate in paths if tuple(candidate) not in known_costs]
+        paths = paths[:int(min(len(paths), budget.remaining_evaluations(eval_count)))]
+        if paths:
+            with profile.phase("evaluation"):
+                for candidate, candidate_cost in zip(paths, get_path_costs(seed, paths, evaluator)):
+                    known_costs[tuple(candidate)] = candidate_cost
+            eval_count += len(paths)
+        return paths
+
+    if cost is not None:
+        known_costs.setdefault(tuple(path), cost)
+    path, start = list(path), remove_loops(path)
+    evaluate([path] if start == path else [path, start])
+    current, current_cost = start, known_costs.get(tuple(start))
+    if current_cost is None:
+        current, current_cost = path, known_costs.get(tuple(path))
+    best_path, best_cost = current, current_cost if current_cost is not None else float('inf')
+    if trace is not None and best_cost < float('inf'):
+        trace.record(budget.elapsed(), eval_count, best_cost, best_path)
+    heat = temperature * best_cost if temperature and best_cost < float('inf') else None
+    rounds = accepted = idle_rounds = 0
+
+    # Arrêt quand plusieurs tours de suite n'apportent aucun chemin nouveau (voisinage épuisé)
+    while not budget.exhausted(eval_count) and idle_rounds < 10:
+        rounds += 1
+        with profile.phase("generation"):
+            candidates = neighborhood.moves(current, moves_per_round)
+        fresh = evaluate(candidates)
+        idle_rounds = 0 if fresh else idle_rounds + 1
+        scored = [(known_costs[tuple(candidate)], candidate) for candidate in candidates
+                  if known_costs.get(tuple(candidate)) is not None]
+        if not scored:
+            continue
+        move_cost, move = min(scored, key=lambda item: item[0])
+        delta = move_cost - current_cost if current_cost is not None else -1.0
+        if delta < 0 or (heat and random.random() < math.exp(-delta / heat)):
+            current, current_cost = move, move_cost
+            accepted += 1
+        if heat:
+            heat *= cooling
+        if move_cost < best_cost:
+            best_cost, best_path = move_cost, move
+            print(f"[Recherche locale] tour={rounds}, eval_count={eval_count}, meilleur coût={best_cost}, "
+                  f"chemin={best_path}")
+            if trace is not None:
+                trace.record(budget.elapsed(), eval_count, best_cost, best_path)
+
+    print(f"[Recherche locale] {rounds} tours, {accepted} mouvements acceptés, {eval_count} évaluations")
+    return best_path, best_cost
+
+def with_local_search(solver, fraction=0.5, **options):
+    """
+    Enchaîne un solveur (signature de `monte_carlo_simulation`) et une recherche locale sur son meilleur chemin :
+    le solveur reçoit `1 - fraction` du budget, la recherche locale le reste (`options` lui sont transmises).
+    """
+    def run(G, source, target, duration, seed, blackbox_path, trace=None, max_evaluations=None, profile=None,
+            solver_state=None):
+        budget = SearchBudget(duration, max_evaluations)
+        profile = profile if profile is not None else SolverProfile("Recherche locale")
+        share = 1 - fraction
+        path, cost = solver(G, source, target, duration * share if duration else None, seed, blackbox_path,
+                            trace=trace, max_evaluations=int(max_evaluations * share) if max_evaluations else None,
+                            profile=profile, solver_state=solver_state)
+        if path is None:
+            return path, cost
+        used = profile.evaluations.calls
+        shifted = ShiftedTrace(trace, budget.elapsed(), used) if trace is not None else None
+        return local_search(G, path, seed, blackbox_path, cost=cost,
+                            duration=max(0.0, duration - budget.elapsed()) if duration else None,
+                            max_evaluations=max(0, max_evaluations - used) if max_evaluations else None,
+                            trace=shifted, profile=profile, **options)
+    return run
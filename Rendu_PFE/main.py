@@ -1,169 +1,172 @@
-import time
-import networkx as nx
-import numpy as np
-import matplotlib.pyplot as plt
-
-from graph_utils import generate_connected_graph
-from baseline import baseline_method
-from monte_carlo import (
-    monte_carlo_simulation,
-    monte_carlo_simulation_with_exploration,
-    monte_carlo_with_nested_rollouts
-)
-from q_learning import GraphEnvironment, q_learning, evaluate_policy
+import argparse
+import json
+import os
+import sys
 
+from blackbox_interface import LOCAL_SERVE_COMMAND
+from eval_server import is_server_url
+from experiments import METHODS, average_costs, build_cells, load_results, run_grid, solve_cell
+
+# Valeurs par défaut de la ligne de commande
 graph_sizes = [50, 100]
 graph_densities = [0.3, 0.6]
 durations = [5, 10]
 seed = 0
-blackbox_path = "h:/Desktop/pfe/blackBox.exe"
+blackbox_path = "blackBox.exe"
 num_graphs = 2
+# Instances générées conservées sur disque (.npz), identiques pour toutes les méthodes
+graph_cache_dir = "graph_cache"
 
-results = []
-
-for num_nodes in graph_sizes:
-    for density in graph_densities:
-        for duration in durations:
-            baseline_costs = []
-            mc_costs = []
-            mc_exploration_costs = []
-            mc_nested_costs = []
-            q_learning_costs = []
-
-            for _ in range(num_graphs):
-                graph = generate_connected_graph(num_nodes, density)
-                source, target = 0, num_nodes - 1
-
-                _, b_cost = baseline_method(graph, source, target, seed, blackbox_path)
-                baseline_costs.append(b_cost)
-
-                _, mc_cost = monte_carlo_simulation(graph, source, target, duration, seed, blackbox_path)
-                mc_costs.append(mc_cost)
-
-                _, mc_exp_cost = monte_carlo_simulation_with_exploration(
-                    graph, source, target, duration, seed, blackbox_path
-                )
-                mc_exploration_costs.append(mc_exp_cost)
-
-                _, mc_nested_cost = monte_carlo_with_nested_rollouts(
-                    graph, source, target, duration, seed, blackbox_path
-                )
-                mc_nested_costs.append(mc_nested_cost)
-
-                env = GraphEnvironment(graph, source, target, seed, blackbox_path)
-                q_table = q_learning(env, duration, blackbox_path)
-                _, q_cost = evaluate_policy(env, q_table, blackbox_path)
-                q_learning_costs.append(q_cost)
-
-            avg_baseline_cost = np.mean(baseline_costs)
-            avg_mc_cost = np.mean(mc_costs)
-            avg_mc_exploration_cost = np.mean(mc_exploration_costs)
-            avg_mc_nested_cost = np.mean(mc_nested_costs)
-            avg_q_learning_cost = np.mean(q_learning_costs)
-
-            result_str = (
-                f"\n=== Résultats pour Graphe={num_nodes}, Densité={density}, Duration={duration} ===\n"
-                f"Baseline : Coût moyen {avg_baseline_cost:.4f}\n"
-                f"Monte Carlo : Coût moyen {avg_mc_cost:.4f}\n"
-                f"Monte Carlo Exploration : Coût moyen {avg_mc_exploration_cost:.4f}\n"
-                f"Monte Carlo Nested Rollouts : Coût moyen {avg_mc_nested_cost:.4f}\n"
-                f"Q-Learning : Coût moyen {avg_q_learning_cost:.4f}\n"
-            )
-            results.append(result_str)
-            print(result_str)
-
-            methods = [
-                "Baseline",
-                "MC",
-                "MC+Exploration",
-                "MC+Nested",
-                "Q-Learning"
-            ]
-            costs = [
-                avg_baseline_cost,
-                avg_mc_cost,
-                avg_mc_exploration_cost,
-                avg_mc_nested_cost,
-                avg_q_learning_cost
-            ]
-            
-            plt.figure(figsize=(8, 6))
-            plt.bar(methods, costs, color=['blue','orange','green','red','purple'])
-            plt.title(f"Graphe={num_nodes}, Densité={density}, Durée={duration}")
-            plt.ylabel("Coût moyen final")
-            plt.xlabel("Méthodes")
-            plt.ylim([0, max(costs)*1.2])
-            plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-
-            plt.savefig(f"bar_G{num_nodes}_Dens{density}_Dur{duration}.png")
-            plt.close()
-
+# Résultats structurés (une ligne JSON par cellule et par durée) et résumé lisible
+store_path = "execution_results.jsonl"
 output_file = "execution_results_test.txt"
-with open(output_file, "w") as f:
-    f.writelines(results)
-
-print(f"\nLes résultats ont été sauvegardés dans {output_file}")
-
-def generate_convergence_plots_from_file(filename="execution_results_test.txt"):
-    """
-    Genère courbe de convergence.
-    """
-    import re
-    from collections import defaultdict
-
-    pattern = re.compile(r"Graphe=(\d+), Densité=([0-9.]+), Duration=(\d+)")
-    cost_pattern = re.compile(r"(.+) : Coût moyen ([0-9.]+)")
-
-    data = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
-    durations = set()
-
-    with open(filename, "r") as f:
-        lines = f.readlines()
-
-    current = None
-    for line in lines:
-        header_match = pattern.search(line)
-        if header_match:
-            graphe, dens, dur = int(header_match[1]), float(header_match[2]), int(header_match[3])
-            current = (graphe, dens, dur)
-            durations.add(dur)
-        elif current:
-            cost_match = cost_pattern.search(line)
-            if cost_match:
-                method, cost = cost_match[1], float(cost_match[2])
-                data[current[0]][current[1]][current[2]][method.strip()] = cost
-
-    methods = [
-        "Baseline",
-        "Monte Carlo",
-        "Monte Carlo Exploration",
-        "Monte Carlo Nested Rollouts",
-        "Q-Learning"
-    ]
-    colors = {
-        "Baseline": "black",
-        "Monte Carlo": "tab:blue",
-        "Monte Carlo Exploration": "tab:orange",
-        "Monte Carlo Nested Rollouts": "tab:green",
-        "Q-Learning": "tab:red"
-    }
-
-    for graphe in sorted(data.keys()):
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5), sharey=True)
-        for i, dens in enumerate([0.3, 0.6]):
-            ax = axes[i]
-            for method in methods:
-                y = []
-                for dur in sorted(durations):
-                    y.append(data[graphe][dens].get(dur, {}).get(method, None))
-                ax.plot(sorted(durations), y, marker='o', label=method, color=colors[method])
-            ax.set_title(f'Courbe de convergence - {graphe} nœuds (densité {dens})')
-            ax.set_xlabel("Temps d'entraînement (s)")
-            ax.set_ylabel("Coût")
-            ax.grid(True)
-            ax.legend()
-        fig.tight_layout()
-        plt.savefig(f"courbe_convergence_{graphe}_noeuds.png")
-        plt.close()
-
-generate_convergence_plots_from_file()
+
+def resolve_evaluator(blackbox):
+    """
+    Traduit l'option `--blackbox` en (`blackbox_path`, `cache_path`) pour `experiments` :
+      - `local` : oracle local déterministe `LocalBlackBox`, en mémoire ;
+      - `serve` : un évaluateur persistant `local_blackbox.py --serve` par worker (`LOCAL_SERVE_COMMAND`),
+        un seul démarrage de processus au lieu d'un par chemin ;
+      - `http://hôte:port` : serveur d'évaluation partagé (`python eval_server.py`), éventuellement
+        sur une autre machine ; le cache est alors celui du serveur ;
+      - sinon, le chemin du binaire, remplacé par l'oracle local s'il est introuvable (hors Windows).
+    """
+    if blackbox == "serve":
+        return LOCAL_SERVE_COMMAND, "path_costs_local.sqlite"
+    if is_server_url(blackbox):
+        return blackbox, None
+    if blackbox != "local" and not os.path.exists(blackbox):
+        print(f"[INFO] {blackbox} introuvable, utilisation de l'oracle local LocalBlackBox.")
+        blackbox = "local"
+    if blackbox == "local":
+        return None, "path_costs_local.sqlite"
+    return blackbox, "path_costs.sqlite"
+
+def write_summary(averages, filename=output_file, budget_label="Duration"):
+    """
+    Écrit le résumé des coûts moyens par configuration, au format historique du projet.
+    """
+    results = []
+    for num_nodes, density, duration in sorted(averages):
+        result_str = f"\n=== Résultats pour Graphe={num_nodes}, Densité={density}, {budget_label}={duration} ===\n"
+        for method in METHODS:
+            if method in averages[(num_nodes, density, duration)]:
+                result_str += f"{method} : Coût moyen {averages[(num_nodes, density, duration)][method]:.4f}\n"
+        results.append(result_str)
+        print(result_str)
+
+    with open(filename, "w") as f:
+        f.writelines(results)
+    print(f"\nLes résultats ont été sauvegardés dans {filename}")
+
+def report(records, store, summary):
+    """
+    Écrit le résumé des coûts moyens puis trace les figures (matplotlib n'est importé qu'ici).
+    """
+    from plotting import generate_bar_plots, generate_convergence_plots
+
+    by_evaluations = all(record.get("duration") is None for record in records)
+    averages = average_costs(records)
+    write_summary(averages, summary, "Evaluations" if by_evaluations else "Duration")
+    generate_bar_plots(averages, "Évaluations" if by_evaluations else "Durée")
+    generate_convergence_plots(store, by_evaluations)
+
+def solve(args):
+    """
+    Sous-commande `solve` : une méthode sur une instance, résultat affiché en JSON.
+    """
+    cell, = build_cells([args.nodes], [args.density], args.duration and [args.duration], 1, args.seed,
+                        methods=[args.method], base_seed=args.seed,
+                        evaluation_budgets=args.evaluations and [args.evaluations],
+                        graph_cache_dir=args.graph_cache, checkpoint_dir=args.checkpoint_dir)
+    cell["graph_index"] = args.graph_index
+    records = solve_cell(cell, *resolve_evaluator(args.blackbox))
+    for record in records:
+        print(json.dumps(record))
+    return 0 if any(record["cost"] is not None for record in records) else 1
+
+def sweep(args):
+    """
+    Sous-commande `sweep` : la grille complète (tailles, densités, budgets, instances, méthodes),
+    répartie sur un pool de processus, puis le résumé et les figures.
+    """
+    if os.path.exists(args.store) and not args.resume:
+        os.remove(args.store)
+    blackbox, cache_path = resolve_evaluator(args.blackbox)
+
+    # Chaque cellule (graphe, méthode) est indépendante : elles sont réparties sur tous les cœurs,
+    # et chaque méthode ne tourne qu'une fois, au budget le plus large (historique « anytime »).
+    cells = build_cells(args.sizes, args.densities, None if args.evaluations else args.durations, args.graphs,
+                        args.seed, methods=args.methods, base_seed=args.seed, evaluation_budgets=args.evaluations,
+                        graph_cache_dir=args.graph_cache, checkpoint_dir=args.checkpoint_dir)
+    records = run_grid(cells, args.store, blackbox_path=blackbox, cache_path=cache_path,
+                       max_workers=args.workers, resume=args.resume)
+    if not args.no_plots:
+        report(records, args.store, args.summary)
+    return 0
+
+def plot(args):
+    """
+    Sous-commande `plot` : résumé et figures à partir d'un fichier de résultats existant.
+    """
+    report(load_results(args.store), args.store, args.summary)
+    return 0
+
+def build_parser():
+    """
+    Construit l'analyseur de la ligne de commande et de ses sous-commandes `solve`, `sweep` et `plot`.
+    """
+    parser = argparse.ArgumentParser(description="Recherche de chemins de coût minimal via une Black Box.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_solver_options(command):
+        command.add_argument("--seed", type=int, default=seed, help="graine de la Black Box et des instances")
+        command.add_argument("--blackbox", default=blackbox_path,
+                             help="chemin du binaire, `local`, `serve` ou adresse http://hôte:port")
+        command.add_argument("--graph-cache", default=graph_cache_dir, help="dossier des instances générées")
+        command.add_argument("--checkpoint-dir", default=None,
+                             help="dossier d'état des solveurs (démarrage à chaud d'un lancement à l'autre)")
+
+    single = commands.add_parser("solve", help="résout une instance avec une méthode")
+    single.add_argument("--method", choices=list(METHODS), default="Monte Carlo")
+    single.add_argument("--nodes", type=int, default=graph_sizes[0])
+    single.add_argument("--density", type=float, default=graph_densities[0])
+    single.add_argument("--graph-index", type=int, default=0, help="numéro de l'instance (n, densité)")
+    single.add_argument("--duration", type=float, default=None, help="budget en secondes")
+    single.add_argument("--evaluations", type=int, default=None, help="budget en nombre d'évaluations")
+    add_solver_options(single)
+    single.set_defaults(run=solve)
+
+    grid = commands.add_parser("sweep", help="lance la grille d'expériences")
+    grid.add_argument("--sizes", type=int, nargs="+", default=graph_sizes)
+    grid.add_argument("--densities", type=float, nargs="+", default=graph_densities)
+    grid.add_argument("--durations", type=float, nargs="+", default=durations)
+    grid.add_argument("--evaluations", type=int, nargs="+", default=None,
+                      help="budgets en nombre d'évaluations (reproductibles), à la place des durées")
+    grid.add_argument("--graphs", type=int, default=num_graphs, help="instances par (taille, densité)")
+    grid.add_argument("--methods", nargs="+", choices=list(METHODS), default=None)
+    grid.add_argument("--workers", type=int, default=None, help="processus (par défaut, un par cœur)")
+    grid.add_argument("--resume", action="store_true", help="reprend un balayage interrompu")
+    grid.add_argument("--store", default=store_path)
+    grid.add_argument("--summary", default=output_file)
+    grid.add_argument("--no-plots", action="store_true", help="n'écrit ni résumé ni figures")
+    add_solver_options(grid)
+    grid.set_defaults(run=sweep)
+
+    figures = commands.add_parser("plot", help="trace les figures d'un fichier de résultats")
+    figures.add_argument("--store", default=store_path)
+    figures.add_argument("--summary", default=output_file)
+    figures.set_defaults(run=plot)
+    return parser
+
+def main(argv=None):
+    """
+    Point d'entrée en ligne de commande (voir `build_parser`).
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "solve" and args.duration is None and args.evaluations is None:
+        args.duration = durations[-1]
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
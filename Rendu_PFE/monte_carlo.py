@@ -1,7 +1,13 @@
+import asyncio
+import os
 import random
-import time
-from collections import defaultdict
-from blackbox_interface import get_path_cost_with_blackbox
+import numpy as np
+from blackbox_interface import get_path_cost, get_path_cost_async, get_path_costs, get_batch_size
+from graph_utils import CSRGraph, compute_hop_distances
+from rollouts import generate_random_paths, hop_length_cap
+from anytime import SearchBudget
+from profiling import SolverProfile
+from surrogate import EdgeCostSurrogate
 
 def generate_random_path(G, source, target):
     """
@@ -20,164 +26,623 @@ def generate_random_path(G, source, target):
         current = next_node
     return path
 
-def generate_random_path_weighted(G, source, target, memory):
+def generate_random_path_weighted(csr, source, target, memory, hops=None, max_length=None):
     """
     Génère un chemin pondéré où les transitions avec moins de visites sont favorisées.
+    `csr` est la représentation `CSRGraph` du graphe et `memory` un tableau de poids
+    indexé par identifiant d'arc.
+    Avec `hops` et `max_length`, seuls les voisins depuis lesquels la cible reste atteignable
+    dans la limite de `max_length` arcs sont candidats (voir `generate_random_paths`).
     """
+    indptr, indices = csr.indptr, csr.indices
     path = [source]
     current = source
-    visited = set(path)
+    visited = np.zeros(csr.num_nodes, dtype=bool)
+    visited[source] = True
     while current != target:
-        neighbors = list(set(G.neighbors(current)) - visited)
-        if not neighbors:
+        first, last = indptr[current], indptr[current + 1]
+        feasible = ~visited[indices[first:last]]
+        if hops is not None:
+            feasible &= hops[indices[first:last]] <= max_length - len(path)
+        edges = np.arange(first, last)[feasible]
+        if not edges.size:
             return None
-        weights = [1 / (memory[(current, neighbor)] + 1e-6) for neighbor in neighbors]
-        next_node = random.choices(neighbors, weights=weights, k=1)[0]
-        path.append(next_node)
-        visited.add(next_node)
-        current = next_node
+        cumulative = np.cumsum(1 / (memory[edges] + 1e-6))
+        choice = np.searchsorted(cumulative, random.random() * cumulative[-1], side='right')
+        current = int(indices[edges[min(choice, edges.size - 1)]])
+        path.append(current)
+        visited[current] = True
     return path
 
-def monte_carlo_simulation(G, source, target, duration, seed, blackbox_path):
+def monte_carlo_simulation(G, source, target, duration, seed, blackbox_path, rollout_batch=64, trace=None,
+                           max_evaluations=None, profile=None, screen_fraction=None, max_stretch=None,
+                           solver_state=None):
     """
     Monte Carlo classique : teste des chemins aléatoires et sélectionne le meilleur.
     Affiche uniquement lorsqu'un nouveau meilleur chemin est trouvé.
     À la fin, affiche le nombre total d'itérations (exécutions) réalisées.
+    `blackbox_path` peut être un `BlackBoxEvaluator` : les chemins sont alors évalués par lots.
+    Les chemins sont générés par paquets de `rollout_batch` (`generate_random_paths`).
+    Si un `ConvergenceTrace` est fourni, chaque amélioration y est enregistrée.
+    Le budget est `duration` secondes et/ou `max_evaluations` chemins évalués ;
+    le temps de chaque phase est relevé dans `profile` (`SolverProfile`).
+    Avec `screen_fraction` (ex. 0.25), chaque lot compte 1 / `screen_fraction` fois plus de candidats,
+    triés par un `EdgeCostSurrogate` : seuls les plus prometteurs sont envoyés à la Black Box.
+    Avec `max_stretch` (ex. 2.0), les rollouts sont guidés par la distance en sauts à la cible
+    et ne dépassent pas `max_stretch` fois le plus court chemin en nombre d'arcs.
+    Avec un `SolverState` (`solver_state`), la recherche repart de son meilleur chemin, et chaque évaluation
+    est ajoutée à son journal (voir `checkpoint`).
     """
     best_path = None
     best_cost = float('inf')
-    start_time = time.time()
+    if solver_state is not None and solver_state.best_path is not None:
+        # Démarrage à chaud : le meilleur chemin d'un run précédent reste l'incumbent
+        best_path, best_cost = list(solver_state.best_path), solver_state.best_cost
+        if trace is not None:
+            trace.record(0.0, 0, best_cost, best_path)
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Classique")
+    evaluator = profile.instrument(blackbox_path, budget)
     iteration = 0
+    batch_size = get_batch_size(blackbox_path)
+    csr = CSRGraph.from_networkx(G)
+    # Flux NumPy dérivé du module `random` : fixer random.seed rend le run reproductible
+    rng = np.random.default_rng(random.getrandbits(64))
+    surrogate = EdgeCostSurrogate(csr) if screen_fraction else None
+    hops = compute_hop_distances(G, target) if max_stretch else None
+    max_length = hop_length_cap(hops, source, max_stretch) if max_stretch else None
+    if max_stretch and not np.isfinite(hops[source]):
+        print(f"[INFO] Cible {target} inaccessible depuis {source}, aucun rollout possible.")
+        return None, float('inf')
+    pending = []
 
-    while time.time() - start_time < duration:
-        iteration += 1
-        path = generate_random_path(G, source, target)
-        if path:
-            cost = get_path_cost_with_blackbox(seed, path, blackbox_path)
+    while not budget.exhausted(iteration):
+        take = int(min(batch_size, budget.remaining_evaluations(iteration)))
+        wanted = take if surrogate is None else int(np.ceil(take / screen_fraction))
+        with profile.phase("generation"):
+            if len(pending) < wanted:
+                pending.extend(generate_random_paths(csr, source, target, max(rollout_batch, wanted), rng=rng,
+                                                     max_length=max_length, hops=hops))
+            paths, pending = pending[:wanted], pending[wanted:]
+        if surrogate is not None:
+            with profile.phase("screening"):
+                # Lot entièrement déjà évalué (petit espace de chemins) : on le laisse passer plutôt que
+                # de tourner à vide, le budget en évaluations s'épuise donc toujours
+                paths = surrogate.screen(paths, take) or paths[:take]
+        with profile.phase("evaluation"):
+            costs = get_path_costs(seed, paths, evaluator)
+        for path, cost in zip(paths, costs):
+            iteration += 1
+            if surrogate is not None:
+                surrogate.update(path, cost)
+            if solver_state is not None:
+                solver_state.record(path, cost)
             if cost is not None and cost < best_cost:
                 best_cost = cost
                 best_path = path
                 print(f"[Classique] it={iteration}, meilleur coût={best_cost}, chemin={best_path}")
+                if trace is not None:
+                    trace.record(budget.elapsed(), iteration, best_cost, best_path)
 
     print(f"[Classique] Nombre total d'itérations exécutées : {iteration}")
     return best_path, best_cost
 
-def monte_carlo_simulation_with_exploration(G, source, target, duration, seed, blackbox_path):
+def monte_carlo_simulation_with_exploration(G, source, target, duration, seed, blackbox_path, trace=None,
+                                            max_evaluations=None, profile=None, screen_fraction=None, max_stretch=None,
+                                            solver_state=None):
     """
     Monte Carlo amélioré : privilégie l'exploration en utilisant une mémoire de visites,
     et pénalise davantage les chemins de coût élevé (pénalité = 1 + cost * alpha).
     Affiche uniquement lorsqu'un nouveau meilleur chemin est trouvé,
     puis affiche à la fin le nombre total d'itérations réalisées.
+    La mémoire est un tableau plat indexé par identifiant d'arc (voir `CSRGraph`).
+    Avec un `BlackBoxEvaluator`, la mémoire est mise à jour après chaque lot de chemins.
+    Si un `ConvergenceTrace` est fourni, chaque amélioration y est enregistrée.
+    Le budget est `duration` secondes et/ou `max_evaluations` chemins évalués ;
+    le temps de chaque phase est relevé dans `profile` (`SolverProfile`).
+    Avec `screen_fraction`, les candidats sont présélectionnés par un `EdgeCostSurrogate`
+    (voir `monte_carlo_simulation`) ; avec `max_stretch`, les rollouts sont guidés et bornés en longueur.
+    Avec un `SolverState` (`solver_state`), la mémoire d'exploration et le meilleur chemin sont repris
+    de l'état, qui est mis à jour en fin de run.
     """
-    from collections import defaultdict
-    memory = defaultdict(lambda: 1.0)
+    csr = CSRGraph.from_networkx(G)
+    memory = solver_state.warm_array("memory", csr.num_edges, 1.0) if solver_state is not None else np.ones(csr.num_edges)
     best_path = None
     best_cost = float('inf')
-    start_time = time.time()
+    if solver_state is not None and solver_state.best_path is not None:
+        # Démarrage à chaud : le meilleur chemin d'un run précédent reste l'incumbent
+        best_path, best_cost = list(solver_state.best_path), solver_state.best_cost
+        if trace is not None:
+            trace.record(0.0, 0, best_cost, best_path)
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Exploration")
+    evaluator = profile.instrument(blackbox_path, budget)
 
     alpha = 100
     iteration = 0
+    batch_size = get_batch_size(blackbox_path)
+    rng = np.random.default_rng(random.getrandbits(64))
+    surrogate = EdgeCostSurrogate(csr) if screen_fraction else None
+    hops = compute_hop_distances(G, target) if max_stretch else None
+    max_length = hop_length_cap(hops, source, max_stretch) if max_stretch else None
+    if max_stretch and not np.isfinite(hops[source]):
+        print(f"[INFO] Cible {target} inaccessible depuis {source}, aucun rollout possible.")
+        return None, float('inf')
 
-    while time.time() - start_time < duration:
-        iteration += 1
-        path = generate_random_path_weighted(G, source, target, memory)
-        if path:
-            cost = get_path_cost_with_blackbox(seed, path, blackbox_path)
+    while not budget.exhausted(iteration):
+        # Un lot de chemins est tiré d'un coup avec les poids courants de la mémoire
+        # (le générateur vectorisé ne devient rentable qu'à partir de quelques marches)
+        take = int(min(batch_size, budget.remaining_evaluations(iteration)))
+        wanted = take if surrogate is None else int(np.ceil(take / screen_fraction))
+        with profile.phase("generation"):
+            if wanted > 1:
+                paths = generate_random_paths(csr, source, target, wanted, arc_weights=1 / (memory + 1e-6),
+                                              rng=rng, max_length=max_length, hops=hops).to_list()
+            else:
+                paths = [generate_random_path_weighted(csr, source, target, memory, hops, max_length)]
+                paths = [path for path in paths if path]
+        if surrogate is not None:
+            with profile.phase("screening"):
+                # Lot entièrement déjà évalué (petit espace de chemins) : on le laisse passer plutôt que
+                # de tourner à vide, le budget en évaluations s'épuise donc toujours
+                paths = surrogate.screen(paths, take) or paths[:take]
+        with profile.phase("evaluation"):
+            costs = get_path_costs(seed, paths, evaluator)
+        for path, cost in zip(paths, costs):
+            iteration += 1
+            if surrogate is not None:
+                surrogate.update(path, cost)
+            if solver_state is not None:
+                solver_state.record(path, cost)
             if cost is not None:
                 penalty = 1 + cost * alpha
-                for i in range(len(path) - 1):
-                    memory[(path[i], path[i+1])] += penalty
+                memory[csr.path_edges(path)] += penalty
 
                 if cost < best_cost:
                     best_cost = cost
                     best_path = path
                     print(f"[Exploration-MODIF] it={iteration}, meilleur coût={best_cost}, chemin={best_path}")
+                    if trace is not None:
+                        trace.record(budget.elapsed(), iteration, best_cost, best_path)
 
+    if solver_state is not None:
+        solver_state.memory = memory
     print(f"[Exploration-MODIF] Nombre total d'itérations exécutées : {iteration}")
     return best_path, best_cost
 
-def monte_carlo_with_nested_rollouts(G, source, target, duration, seed, blackbox_path, depth=3):
+async def monte_carlo_pipeline(G, source, target, duration, seed, blackbox_path, concurrency=None, exploration=True,
+                               rollout_batch=16, queue_size=None, trace=None, max_evaluations=None, profile=None):
+    """
+    Monte Carlo en pipeline asyncio producteur/consommateur :
+      - un producteur génère des lots de chemins (`generate_random_paths`) dans une file bornée,
+        pondérés par la mémoire d'exploration courante si `exploration` est vrai ;
+      - `concurrency` évaluateurs vident la file (sous-processus `asyncio.create_subprocess_exec`
+        pour un chemin de binaire) : la génération recouvre la latence de la Black Box ;
+      - un consommateur suit le meilleur chemin et met à jour la mémoire d'exploration,
+        avec la pénalité de `monte_carlo_simulation_with_exploration`, dès qu'un résultat arrive.
+    Le budget en temps est appliqué par annulation des tâches (`asyncio.wait_for`) et non
+    en consultant l'horloge ; le budget en évaluations limite le nombre de chemins produits.
+    """
+    csr = CSRGraph.from_networkx(G)
+    memory = np.ones(csr.num_edges)
+    best_path = None
+    best_cost = float('inf')
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Async")
+    evaluator = profile.instrument(blackbox_path, budget)
+    concurrency = concurrency or max(get_batch_size(blackbox_path), os.cpu_count() or 1)
+    paths_queue = asyncio.Queue(maxsize=queue_size or 2 * concurrency)
+    results_queue = asyncio.Queue()
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    alpha = 100
+    iteration = 0
+
+    async def produce():
+        produced = 0
+        while produced < budget.remaining_evaluations(0):
+            with profile.phase("generation"):
+                weights = 1 / (memory + 1e-6) if exploration else None
+                batch = generate_random_paths(csr, source, target, rollout_batch, arc_weights=weights, rng=rng)
+            for path in batch.to_list()[:int(min(len(batch), budget.remaining_evaluations(produced)))]:
+                await paths_queue.put(path)
+                produced += 1
+        for _ in range(concurrency):
+            await paths_queue.put(None)
+
+    async def evaluate():
+        while True:
+            path = await paths_queue.get()
+            if path is None:
+                break
+            await results_queue.put((path, await get_path_cost_async(seed, path, evaluator)))
+
+    async def consume():
+        nonlocal best_path, best_cost, iteration
+        while True:
+            result = await results_queue.get()
+            if result is None:
+                break
+            path, cost = result
+            iteration += 1
+            if cost is None:
+                continue
+            if exploration:
+                memory[csr.path_edges(path)] += 1 + cost * alpha
+            if cost < best_cost:
+                best_cost = cost
+                best_path = path
+                print(f"[Async] it={iteration}, meilleur coût={best_cost}, chemin={best_path}")
+                if trace is not None:
+                    trace.record(budget.elapsed(), iteration, best_cost, best_path)
+
+    async def search():
+        workers = [asyncio.create_task(produce())] + [asyncio.create_task(evaluate()) for _ in range(concurrency)]
+        consumer = asyncio.create_task(consume())
+        try:
+            await asyncio.gather(*workers)
+            await results_queue.put(None)
+            await consumer
+        finally:
+            # Annulation (budget de temps) : les sous-processus en cours sont tués par leurs tâches
+            for task in workers + [consumer]:
+                task.cancel()
+            await asyncio.gather(*workers, consumer, return_exceptions=True)
+
+    try:
+        await asyncio.wait_for(search(), timeout=duration)
+    except asyncio.TimeoutError:
+        pass
+
+    print(f"[Async] Nombre total d'itérations exécutées : {iteration}")
+    return best_path, best_cost
+
+def monte_carlo_simulation_async(G, source, target, duration, seed, blackbox_path, concurrency=None, exploration=True,
+                                 trace=None, max_evaluations=None, profile=None):
     """
-    Monte Carlo avec Nested Rollouts amélioré :
-      1) Pas de 'return' immédiat si neighbor == target : on compare le coût.
-      2) Vérification du temps global 'time.time() - start_time' à chaque étape,
-         pour ne pas dépasser 'duration'.
-      3) Paramètres simplifiés dans la récursion (seed retiré).
-      4) Fallback aléatoire si depth == 0 (pas de profondeur).
-      5) On compare tous les chemins menant à la cible pour garder le meilleur.
-      6) Un compteur 'eval_count' incrémente à chaque évaluation d'un chemin complet.
+    Point d'entrée synchrone de `monte_carlo_pipeline`, avec la signature des autres solveurs.
     """
-    import random, time
-    from collections import defaultdict
-    random.seed(seed)
+    return asyncio.run(monte_carlo_pipeline(G, source, target, duration, seed, blackbox_path,
+                                            concurrency=concurrency, exploration=exploration, trace=trace,
+                                            max_evaluations=max_evaluations, profile=profile))
+
+def monte_carlo_with_nested_rollouts(G, source, target, duration, seed, blackbox_path, depth=3, trace=None,
+                                     max_evaluations=None, profile=None, iterations=20, alpha=1.0, prior_weight=1.0, rng=None):
+    """
+    Monte Carlo avec Nested Rollouts, sous la forme d'une recherche NRPA
+    (Nested Rollout Policy Adaptation) :
+      1) Une politique de logits par arc (indexée comme `CSRGraph`) guide les rollouts :
+         depuis un nœud, chaque voisin non visité est tiré avec une probabilité softmax.
+      2) Au niveau `depth`, on lance `iterations` recherches de niveau `depth - 1`, puis la politique
+         est adaptée (pas `alpha`) vers la meilleure séquence du niveau ; le niveau 0 est un rollout.
+      3) La politique de la racine est conservée d'une itération principale à l'autre,
+         adaptée vers le meilleur chemin global au lieu d'être oubliée ; si une itération
+         principale ne découvre aucun nouveau chemin, elle est réinitialisée, et une seconde
+         itération stérile consécutive arrête la recherche (espace épuisé à ce niveau).
+      4) Les coûts sont mémorisés localement : un chemin déjà rencontré n'est jamais réévalué,
+         et `eval_count` ne compte que les évaluations réellement envoyées à la Black Box.
+      5) Un biais fixe `-prior_weight * sauts restants` s'ajoute aux logits : les premiers rollouts
+         privilégient les voisins qui rapprochent de la cible au lieu d'errer dans le graphe.
+      6) Tirages sur un flux `np.random.Generator` propre (`rng`), sans réinitialiser `random`.
+      7) Budget en secondes (`duration`) et/ou en évaluations (`max_evaluations`) vérifié
+         à chaque rollout ; améliorations enregistrées dans `trace`, temps par phase dans `profile`.
+    """
+    csr = CSRGraph.from_networkx(G)
+    indptr, indices = csr.indptr, csr.indices
+    hops_to_target = compute_hop_distances(G, target)
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    finite_hops = np.where(np.isfinite(hops_to_target), hops_to_target, 0)
+    prior = -prior_weight * finite_hops[indices]
 
     best_path = None
     best_cost = float('inf')
-    start_time = time.time()
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("NRPA")
+    evaluator = profile.instrument(blackbox_path, budget)
+    known_costs = {}
     eval_count = 0
+    playouts = 0
     main_iterations = 0
 
-    def extend_randomly_to_target(current_path, max_fallback_length=50):
-        path = current_path[:]
-        visited = set(path)
-        current_node = path[-1]
-        steps = 0
+    def legal_arcs(node, visited):
+        first, last = indptr[node], indptr[node + 1]
+        neighbors = indices[first:last]
+        return np.arange(first, last)[~visited[neighbors] & (hops_to_target[neighbors] < np.inf)]
 
-        while current_node != target:
-            if time.time() - start_time >= duration:
-                return None
-            if steps > max_fallback_length:
-                return None
-            neighbors = list(set(G.neighbors(current_node)) - visited)
-            if not neighbors:
+    def softmax(policy, arcs):
+        logits = policy[arcs] + prior[arcs]
+        weights = np.exp(logits - logits.max())
+        return weights / weights.sum()
+
+    def playout(policy):
+        path = [source]
+        visited = np.zeros(csr.num_nodes, dtype=bool)
+        visited[source] = True
+        current = source
+        while current != target:
+            arcs = legal_arcs(current, visited)
+            if not arcs.size:
                 return None
-            next_node = random.choice(neighbors)
-            path.append(next_node)
-            visited.add(next_node)
-            current_node = next_node
-            steps += 1
+            current = int(indices[arcs[rng.choice(arcs.size, p=softmax(policy, arcs))]])
+            path.append(current)
+            visited[current] = True
         return path
 
-    def nested_rollout(current_path, depth_local):
-        nonlocal eval_count
-        if time.time() - start_time >= duration:
-            return None
-        if current_path[-1] == target:
-            return current_path
-        if depth_local == 0:
-            return extend_randomly_to_target(current_path)
+    def adapt(policy, path):
+        adapted = policy.copy()
+        visited = np.zeros(csr.num_nodes, dtype=bool)
+        for node, next_node in zip(path[:-1], path[1:]):
+            visited[node] = True
+            arcs = legal_arcs(node, visited)
+            adapted[arcs] -= alpha * softmax(policy, arcs)
+            adapted[csr.edge_id(node, next_node)] += alpha
+        return adapted
 
-        current_node = current_path[-1]
-        neighbors = list(G.neighbors(current_node))
-        random.shuffle(neighbors)
+    def evaluate(path):
+        nonlocal best_path, best_cost, eval_count
+        key = tuple(path)
+        if key not in known_costs:
+            eval_count += 1
+            with profile.phase("evaluation"):
+                known_costs[key] = get_path_cost(seed, path, evaluator)
+        cost = known_costs[key]
+        if cost is None:
+            return float('inf')
+        if cost < best_cost:
+            best_cost = cost
+            best_path = path
+            print(f"[NRPA] main_it={main_iterations}, eval_count={eval_count}, meilleur coût={best_cost}, chemin={best_path}")
+            if trace is not None:
+                trace.record(budget.elapsed(), eval_count, best_cost, best_path)
+        return cost
 
-        best_cost_local = float('inf')
-        best_path_local = None
+    def nrpa(level, policy):
+        nonlocal playouts
+        if level == 0:
+            playouts += 1
+            with profile.phase("generation"):
+                path = playout(policy)
+            return (evaluate(path), path) if path else (float('inf'), None)
 
-        for neighbor in neighbors:
-            if time.time() - start_time >= duration:
+        best_cost_level, best_path_level = float('inf'), None
+        for _ in range(iterations):
+            if budget.exhausted(eval_count):
                 break
-            if neighbor not in current_path:
-                new_path = current_path + [neighbor]
-                candidate_path = new_path if neighbor == target else nested_rollout(new_path, depth_local - 1)
-                if candidate_path and candidate_path[-1] == target:
-                    eval_count += 1
-                    cost_candidate = get_path_cost_with_blackbox(seed, candidate_path, blackbox_path)
-                    if cost_candidate is not None and cost_candidate < best_cost_local:
-                        best_cost_local = cost_candidate
-                        best_path_local = candidate_path
-        return best_path_local
-
-    while time.time() - start_time < duration:
+            cost, path = nrpa(level - 1, policy.copy())
+            if path is not None and cost <= best_cost_level:
+                best_cost_level, best_path_level = cost, path
+            if best_path_level is not None:
+                policy = adapt(policy, best_path_level)
+        return best_cost_level, best_path_level
+
+    root_policy = np.zeros(csr.num_edges)
+    stalled = 0
+    while not budget.exhausted(eval_count) and stalled < 2:
         main_iterations += 1
-        path_candidate = nested_rollout([source], depth)
-        if path_candidate and path_candidate[-1] == target:
-            cost = get_path_cost_with_blackbox(seed, path_candidate, blackbox_path)
-            if cost is not None and cost < best_cost:
-                best_cost = cost
-                best_path = path_candidate
-                print(f"[NestedRollouts-Improved] main_it={main_iterations}, eval_count={eval_count}, meilleur coût={best_cost}, chemin={best_path}")
+        evaluations_before = eval_count
+        nrpa(max(depth, 1), root_policy.copy())
+        stalled = stalled + 1 if eval_count == evaluations_before else 0
+        if stalled:
+            root_policy = np.zeros(csr.num_edges)
+        elif best_path is not None:
+            root_policy = adapt(root_policy, best_path)
+
+    print(f"[NRPA] Nombre total d'itérations principales : {main_iterations}")
+    print(f"[NRPA] Nombre total de rollouts : {playouts}")
+    print(f"[NRPA] Nombre total d'évaluations de chemins candidats : {eval_count}")
+    return best_path, best_cost
+
+class TranspositionTable:
+    """
+    Table de transposition de `monte_carlo_tree_search`.
+
+    Un nœud de l'arbre est un préfixe de chemin, identifié par son dernier nœud et le hachage
+    de Zobrist (XOR d'une clé aléatoire par nœud) de l'ensemble des nœuds visités : deux préfixes
+    qui visitent les mêmes nœuds et s'arrêtent au même endroit ont la même suite possible
+    et partagent donc leurs statistiques. Celles-ci (visites, somme des coûts des rollouts,
+    état épuisé ou non) sont rangées dans des tableaux NumPy, une case par état.
+    """
+    def __init__(self, num_nodes, capacity=1024):
+        """
+        Initialise une table vide ; les clés de Zobrist ne dépendent que de `num_nodes`,
+        une table sauvegardée reste donc valable d'un run à l'autre (voir `to_arrays`).
+        """
+        self.zobrist = np.random.default_rng(num_nodes).integers(1, 2 ** 62, size=num_nodes).tolist()
+        self.index = {}
+        self.visits = np.zeros(capacity)
+        self.cost_sums = np.zeros(capacity)
+        self.solved = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, node, visited_hash, create=False):
+        """
+        Renvoie l'indice de l'état (`node`, `visited_hash`), en le créant si `create`, sinon None.
+        """
+        index = self.index.get((node, visited_hash))
+        if index is None and create:
+            index = self.index[(node, visited_hash)] = len(self.index)
+            if index == self.visits.size:
+                self.visits = np.concatenate((self.visits, np.zeros(index)))
+                self.cost_sums = np.concatenate((self.cost_sums, np.zeros(index)))
+                self.solved = np.concatenate((self.solved, np.zeros(index, dtype=bool)))
+        return index
+
+    def backup(self, indices, visits, cost_sum):
+        """
+        Ajoute `visits` rollouts de coût total `cost_sum` à chaque état de `indices`.
+        """
+        self.visits[indices] += visits
+        self.cost_sums[indices] += cost_sum
+
+    def to_arrays(self):
+        """
+        Renvoie la table sous forme de tableaux (nœuds, hachages, visites, sommes des coûts, états épuisés).
+        """
+        keys = np.array(list(self.index), dtype=np.int64).reshape(-1, 2)
+        size = len(self.index)
+        return {"nodes": keys[:, 0], "hashes": keys[:, 1], "visits": self.visits[:size].copy(),
+                "cost_sums": self.cost_sums[:size].copy(), "solved": self.solved[:size].copy()}
+
+    @classmethod
+    def from_arrays(cls, num_nodes, arrays):
+        """
+        Reconstruit une table sauvegardée par `to_arrays`.
+        """
+        table = cls(num_nodes, capacity=max(1024, 2 * len(arrays["nodes"])))
+        for node, visited_hash in zip(arrays["nodes"].tolist(), arrays["hashes"].tolist()):
+            table.lookup(node, visited_hash, create=True)
+        table.visits[:len(table)] = arrays["visits"]
+        table.cost_sums[:len(table)] = arrays["cost_sums"]
+        table.solved[:len(table)] = arrays["solved"]
+        return table
+
+def monte_carlo_tree_search(G, source, target, duration, seed, blackbox_path, exploration=1.0, rollouts_per_leaf=None,
+                            trace=None, max_evaluations=None, profile=None, max_stretch=None, solver_state=None,
+                            table=None, rng=None):
+    """
+    Monte Carlo Tree Search (UCT) : l'arbre des préfixes de chemin est construit au fil des simulations.
+      1) Sélection : depuis `source`, on descend vers le voisin non visité de meilleur score UCT,
+         coût moyen normalisé par les coûts extrêmes observés + `exploration` * sqrt(ln N / n).
+      2) Expansion : dès qu'un voisin n'a pas encore d'état, un seul est ajouté à l'arbre (croissance incrémentale).
+         Un chemin complet déjà évalué, ou un état dont tous les successeurs le sont, est marqué épuisé
+         et n'est plus sélectionné ; la recherche s'arrête quand la racine l'est.
+      3) Simulation : `rollouts_per_leaf` chemins aléatoires (`generate_random_paths`, nœuds du préfixe exclus)
+         complètent le préfixe ; ils sont évalués en un seul lot (par défaut, la taille de lot de l'évaluateur).
+      4) Rétropropagation : visites et coûts sont ajoutés à chaque état du préfixe.
+    Les états sont partagés via une `TranspositionTable` (nœud courant, hachage des nœuds visités).
+    Un chemin déjà évalué n'est jamais renvoyé à la Black Box.
+    Passer la même `table` (ou un `SolverState`, qui la sauvegarde) à un nouvel appel prolonge la recherche
+    au lieu de la recommencer. Budget, `trace`, `profile` et `max_stretch` : voir `monte_carlo_simulation`.
+    Renvoie le meilleur chemin et son coût ; la table est conservée dans `solver_state.tree` s'il est fourni.
+    """
+    csr = CSRGraph.from_networkx(G)
+    indptr, indices = csr.indptr, csr.indices
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("MCTS")
+    evaluator = profile.instrument(blackbox_path, budget)
+    rollouts_per_leaf = rollouts_per_leaf or get_batch_size(blackbox_path)
+    hops = compute_hop_distances(G, target)
+    max_length = hop_length_cap(hops, source, max_stretch) if max_stretch else csr.num_nodes - 1
+    if not np.isfinite(hops[source]):
+        print(f"[INFO] Cible {target} inaccessible depuis {source}, aucun rollout possible.")
+        return None, float('inf')
+    if table is None and solver_state is not None and solver_state.tree is not None:
+        table = TranspositionTable.from_arrays(csr.num_nodes, solver_state.tree)
+    table = table if table is not None else TranspositionTable(csr.num_nodes)
+    zobrist = table.zobrist
+
+    best_path = None
+    best_cost = float('inf')
+    if solver_state is not None and solver_state.best_path is not None:
+        best_path, best_cost = list(solver_state.best_path), solver_state.best_cost
+        if trace is not None:
+            trace.record(0.0, 0, best_cost, best_path)
+    # Chemins du journal d'un run précédent : jamais réévalués
+    known_costs = {}
+    if solver_state is not None:
+        known_costs = {tuple(path): None if np.isnan(cost) else cost
+                       for path, cost in zip(solver_state.paths, solver_state.costs)}
+    finite_costs = [cost for cost in known_costs.values() if cost is not None]
+    lowest, highest = min(finite_costs, default=float('inf')), max(finite_costs, default=float('-inf'))
+    arc_weights = np.ones(csr.num_edges)
+    eval_count = 0
+    simulations = 0
+    stalled = 0
+
+    def incoming_arcs(node):
+        neighbors = indices[indptr[node]:indptr[node + 1]]
+        return csr.edge_ids(neighbors, np.full(neighbors.size, node))
+
+    def select():
+        # Descend dans l'arbre ; renvoie le préfixe et les indices des états traversés
+        node, visited_hash = source, zobrist[source]
+        prefix, visited = [source], {source}
+        chain = [root]
+        while node != target:
+            children = [int(v) for v in indices[indptr[node]:indptr[node + 1]]
+                        if v not in visited and len(prefix) + hops[v] <= max_length]
+            states = [table.lookup(v, visited_hash ^ zobrist[v]) for v in children]
+            fresh = [v for v, state in zip(children, states) if state is None]
+            if fresh:
+                node = fresh[rng.integers(len(fresh))]
+                visited_hash ^= zobrist[node]
+                prefix.append(node)
+                chain.append(table.lookup(node, visited_hash, create=True))
+                break
+            children = [v for v, state in zip(children, states) if not table.solved[state]]
+            states = [state for state in states if not table.solved[state]]
+            if not children:
+                # Tous les successeurs sont épuisés (ou il n'y en a aucun) : l'état l'est aussi
+                table.solved[chain[-1]] = True
+                return None, None
+            states = np.array(states)
+            visits = table.visits[states]
+            means = table.cost_sums[states] / np.maximum(visits, 1)
+            spread = highest - lowest if highest > lowest else 1.0
+            scores = (highest - means) / spread + exploration * np.sqrt(
+                np.log(max(table.visits[chain[-1]], 1)) / np.maximum(visits, 1))
+            scores[visits == 0] = np.inf
+            node = children[int(np.argmax(scores))]
+            visited_hash ^= zobrist[node]
+            prefix.append(node)
+            visited.add(node)
+            chain.append(table.lookup(node, visited_hash, create=True))
+        return prefix, chain
+
+    root = table.lookup(source, zobrist[source], create=True)
+    while not budget.exhausted(eval_count) and stalled < 1000 and not table.solved[root]:
+        simulations += 1
+        with profile.phase("selection"):
+            prefix, chain = select()
+        if prefix is None:
+            continue
+        with profile.phase("generation"):
+            if prefix[-1] == target:
+                paths = [prefix]
+            else:
+                blocked = np.concatenate([incoming_arcs(node) for node in prefix])
+                arc_weights[blocked] = 0.0
+                take = int(min(rollouts_per_leaf, budget.remaining_evaluations(eval_count)))
+                rollouts = generate_random_paths(csr, prefix[-1], target, take, arc_weights=arc_weights, rng=rng,
+                                                 max_length=max_length - len(prefix) + 1, hops=hops)
+                arc_weights[blocked] = 1.0
+                paths = [prefix[:-1] + rollout for rollout in rollouts]
+        new_paths = list({tuple(path): path for path in paths if tuple(path) not in known_costs}.values())
+        if new_paths:
+            with profile.phase("evaluation"):
+                new_costs = get_path_costs(seed, new_paths, evaluator)
+            for path, cost in zip(new_paths, new_costs):
+                eval_count += 1
+                known_costs[tuple(path)] = cost
+                if solver_state is not None:
+                    solver_state.record(path, cost)
+                if cost is None:
+                    continue
+                lowest, highest = min(lowest, cost), max(highest, cost)
+                if cost < best_cost:
+                    best_cost = cost
+                    best_path = path
+                    print(f"[MCTS] simulation={simulations}, eval_count={eval_count}, meilleur coût={best_cost}, "
+                          f"chemin={best_path}")
+                    if trace is not None:
+                        trace.record(budget.elapsed(), eval_count, best_cost, best_path)
+        stalled = 0 if new_paths else stalled + 1
+        if prefix[-1] == target:
+            table.solved[chain[-1]] = True
+        costs = [known_costs[tuple(path)] for path in paths]
+        costs = [cost for cost in costs if cost is not None]
+        with profile.phase("backup"):
+            if costs:
+                table.backup(chain, len(costs), sum(costs))
+            else:
+                # Impasse (aucun rollout n'aboutit) : une visite au pire coût observé
+                table.backup(chain, 1, highest if highest > float('-inf') else 0.0)
 
-    print(f"[NestedRollouts-Improved] Nombre total d'itérations principales : {main_iterations}")
-    print(f"[NestedRollouts-Improved] Nombre total d'évaluations de chemins candidats : {eval_count}")
+    if solver_state is not None:
+        solver_state.tree = table.to_arrays()
+    print(f"[MCTS] Nombre total de simulations : {simulations}, états dans l'arbre : {len(table)}")
+    print(f"[MCTS] Nombre total d'évaluations de chemins candidats : {eval_count}")
     return best_path, best_cost
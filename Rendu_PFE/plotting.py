@@ -0,0 +1,84 @@
+import networkx as nx
+
+from experiments import METHODS, average_costs, load_results
+
+# Couleur de chaque méthode, identique sur toutes les figures
+METHOD_COLORS = {
+    "Baseline": "black",
+    "Monte Carlo": "tab:blue",
+    "Monte Carlo Exploration": "tab:orange",
+    "Monte Carlo Nested Rollouts": "tab:green",
+    "MCTS": "tab:brown",
+    "Monte Carlo + Local Search": "tab:cyan",
+    "Q-Learning": "tab:red",
+    "Q-Learning Batch": "tab:purple",
+    "Portfolio": "tab:olive"
+}
+
+# Matplotlib n'est importé que dans les fonctions de tracé : les solveurs et les workers n'en dépendent pas.
+
+def generate_bar_plots(averages, budget_label="Durée"):
+    """
+    Genère un diagramme en barres des coûts moyens par configuration.
+    """
+    import matplotlib.pyplot as plt
+
+    for (num_nodes, density, budget), by_method in sorted(averages.items()):
+        methods = [method for method in METHODS if method in by_method]
+        costs = [by_method[method] for method in methods]
+
+        plt.figure(figsize=(8, 6))
+        plt.bar(methods, costs, color=[METHOD_COLORS[method] for method in methods])
+        plt.title(f"Graphe={num_nodes}, Densité={density}, {budget_label}={budget}")
+        plt.ylabel("Coût moyen final")
+        plt.xlabel("Méthodes")
+        plt.ylim([0, max([cost for cost in costs if cost != float('inf')], default=1) * 1.2])
+        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
+
+        plt.savefig(f"bar_G{num_nodes}_Dens{density}_Dur{budget}.png")
+        plt.close()
+
+def generate_convergence_plots(store, by_evaluations=False):
+    """
+    Genère courbe de convergence, directement à partir du fichier de résultats structurés.
+    Avec `by_evaluations`, l'abscisse est le budget en nombre d'évaluations.
+    """
+    import matplotlib.pyplot as plt
+
+    averages = average_costs(load_results(store))
+    sizes = sorted({num_nodes for num_nodes, _, _ in averages})
+    densities = sorted({density for _, density, _ in averages})
+    all_durations = sorted({duration for _, _, duration in averages})
+
+    for graphe in sizes:
+        fig, axes = plt.subplots(1, len(densities), figsize=(7 * len(densities), 5), sharey=True, squeeze=False)
+        for i, dens in enumerate(densities):
+            ax = axes[0][i]
+            for method in METHODS:
+                y = [averages.get((graphe, dens, dur), {}).get(method, None) for dur in all_durations]
+                ax.plot(all_durations, y, marker='o', label=method, color=METHOD_COLORS[method])
+            ax.set_title(f'Courbe de convergence - {graphe} nœuds (densité {dens})')
+            ax.set_xlabel("Nombre d'évaluations" if by_evaluations else "Temps d'entraînement (s)")
+            ax.set_ylabel("Coût")
+            ax.grid(True)
+            ax.legend()
+        fig.tight_layout()
+        plt.savefig(f"courbe_convergence_{graphe}_noeuds.png")
+        plt.close()
+
+def draw_graph(graph):
+    """
+    Affiche le graphe avec Matplotlib.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    pos = nx.spring_layout(graph)  # Disposition des nœuds
+    nx.draw(graph, pos, with_labels=True, node_color='lightblue', edge_color='gray', node_size=500, font_size=10)
+    plt.title("Visualisation du Graphe")
+    plt.show()
+
+# Exemple d'utilisation
+#from graph_utils import generate_connected_graph
+#graph = generate_connected_graph(10, 0.2)
+#draw_graph(graph)
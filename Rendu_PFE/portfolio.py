@@ -0,0 +1,135 @@
+import contextlib
+import io
+import math
+
+from anytime import SearchBudget
+from blackbox_interface import CachedEvaluator, EvaluationStats, InstrumentedEvaluator
+from checkpoint import SolverState
+from local_search import PathNeighborhood, local_search
+from profiling import SolverProfile
+from monte_carlo import (
+    monte_carlo_simulation,
+    monte_carlo_simulation_with_exploration,
+    monte_carlo_tree_search,
+    monte_carlo_with_nested_rollouts
+)
+from q_learning import GraphEnvironment, q_learning
+
+def _monte_carlo_arm(solver, resumable=True):
+    # Une tranche d'un solveur Monte Carlo, reprise depuis son `SolverState`
+    def run(portfolio, duration, max_evaluations, solver_state, progress):
+        options = {"solver_state": solver_state} if resumable else {}
+        return solver(portfolio["graph"], portfolio["source"], portfolio["target"], duration, portfolio["seed"],
+                      portfolio["evaluator"], max_evaluations=max_evaluations, profile=portfolio["profile"], **options)
+    return run
+
+def _q_learning_arm(portfolio, duration, max_evaluations, solver_state, progress):
+    # Epsilon reprend là où en est le portefeuille, et non au début de sa décroissance à chaque tranche
+    if "env" not in portfolio:
+        portfolio["env"] = GraphEnvironment(portfolio["graph"], portfolio["source"], portfolio["target"],
+                                            portfolio["seed"], portfolio["evaluator"])
+    epsilon_start, epsilon_end = 0.9, 0.1
+    q_learning(portfolio["env"], duration, portfolio["evaluator"], max_evaluations=max_evaluations,
+               epsilon_start=epsilon_start + (epsilon_end - epsilon_start) * progress, epsilon_end=epsilon_end,
+               profile=portfolio["profile"], solver_state=solver_state)
+    return solver_state.best_path, solver_state.best_cost
+
+def _local_search_arm(portfolio, duration, max_evaluations, solver_state, progress):
+    # Recherche locale autour de l'incumbent partagé ; rien à améliorer tant qu'aucun chemin n'est connu
+    if solver_state.best_path is None:
+        return None, float('inf')
+    if "neighborhood" not in portfolio:
+        portfolio["neighborhood"], portfolio["known_costs"] = PathNeighborhood(portfolio["graph"]), {}
+    return local_search(portfolio["graph"], solver_state.best_path, portfolio["seed"], portfolio["evaluator"],
+                        cost=solver_state.best_cost, duration=duration, max_evaluations=max_evaluations,
+                        profile=portfolio["profile"], neighborhood=portfolio["neighborhood"],
+                        known_costs=portfolio["known_costs"])
+
+# Solveurs que le portefeuille peut faire concourir, sous les noms de `experiments.METHODS`
+PORTFOLIO_ARMS = {
+    "Monte Carlo": _monte_carlo_arm(monte_carlo_simulation),
+    "Monte Carlo Exploration": _monte_carlo_arm(monte_carlo_simulation_with_exploration),
+    "Monte Carlo Nested Rollouts": _monte_carlo_arm(monte_carlo_with_nested_rollouts, resumable=False),
+    "MCTS": _monte_carlo_arm(monte_carlo_tree_search),
+    "Q-Learning": _q_learning_arm,
+    "Local Search": _local_search_arm,
+}
+
+def portfolio_search(G, source, target, duration, seed, blackbox_path, methods=None, slice_evaluations=200,
+                     slice_duration=None, exploration=0.3, decay=0.7, trace=None, max_evaluations=None, profile=None,
+                     quiet=True):
+    """
+    Portefeuille de solveurs (et recherche locale autour de l'incumbent) se partageant un seul budget : au lieu de donner tout le budget à chaque méthode
+    l'une après l'autre, les méthodes `methods` (noms de `PORTFOLIO_ARMS`, toutes par défaut) avancent
+    par tranches coopératives de `slice_evaluations` évaluations (et au plus `slice_duration` secondes,
+    par défaut un vingtième de `duration`).
+      1) Toutes les méthodes passent par un même `CachedEvaluator` : un chemin trouvé par l'une
+         n'est jamais réévalué pour une autre.
+      2) Chaque méthode garde son `SolverState` (table Q, mémoire, arbre, ...) d'une tranche à l'autre,
+         et reçoit avant chaque tranche le meilleur chemin global (incumbent partagé).
+      3) La tranche suivante revient à la méthode de meilleur score UCB, calculé sur ses gains récents :
+         baisse relative du meilleur coût global par évaluation, moyennée avec un oubli `decay`
+         et normalisée par le plus grand gain observé, plus `exploration` * sqrt(ln N / n).
+    Le budget (`duration` et/ou `max_evaluations`) compte les appels réels à la Black Box, hors cache.
+    Avec `quiet`, les messages des solveurs sont masqués ; l'allocation finale est affichée.
+    Renvoie le meilleur chemin et son coût.
+    """
+    methods = list(PORTFOLIO_ARMS) if methods is None else list(methods)
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Portefeuille")
+    slice_duration = slice_duration or (duration / 20 if duration else None)
+    # Appels réels : comptés sous le cache partagé
+    calls = EvaluationStats()
+    evaluator = CachedEvaluator(InstrumentedEvaluator(blackbox_path, calls))
+    portfolio = {"graph": G, "source": source, "target": target, "seed": seed, "evaluator": evaluator,
+                 "profile": profile}
+    states = {method: SolverState() for method in methods}
+    pulls = {method: 0 for method in methods}
+    gains = {method: 0.0 for method in methods}
+    spent = {method: 0 for method in methods}
+    best_path, best_cost = None, float('inf')
+    largest_gain = 0.0
+    idle_slices = 0
+
+    def score(method):
+        if not pulls[method]:
+            return float('inf')
+        total = sum(pulls.values())
+        return gains[method] + exploration * math.sqrt(math.log(total) / pulls[method])
+
+    while not budget.exhausted(calls.calls) and idle_slices < len(methods):
+        method = max(methods, key=score)
+        state = states[method]
+        if best_path is not None and best_cost < state.best_cost:
+            state.best_path, state.best_cost = list(best_path), best_cost
+        slice_time = None
+        if duration is not None:
+            slice_time = max(0.0, min(slice_duration, duration - budget.elapsed()))
+        slice_budget = int(min(slice_evaluations, budget.remaining_evaluations(calls.calls)))
+        calls_before, cost_before = calls.calls, best_cost
+        output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+        with output:
+            path, cost = PORTFOLIO_ARMS[method](portfolio, slice_time, slice_budget, state, budget.progress(calls.calls))
+        new_calls = calls.calls - calls_before
+        spent[method] += new_calls
+        idle_slices = idle_slices + 1 if not new_calls else 0
+        if path is not None and cost is not None and cost < best_cost:
+            best_path, best_cost = list(path), cost
+            if trace is not None:
+                trace.record(budget.elapsed(), calls.calls, best_cost, best_path)
+            print(f"[Portefeuille] {method} : meilleur coût={best_cost}, appels={calls.calls}")
+        if math.isinf(cost_before):
+            # Premier chemin trouvé : gain maximal, sans fausser la normalisation des suivants
+            gain = 1.0 if not math.isinf(best_cost) else 0.0
+        else:
+            rate = (cost_before - best_cost) / cost_before / max(new_calls, 1)
+            largest_gain = max(largest_gain, rate)
+            gain = rate / largest_gain if largest_gain else 0.0
+        gains[method] = decay * gains[method] + (1 - decay) * gain
+        pulls[method] += 1
+
+    evaluator.cache.close()
+    allocation = ", ".join(f"{method} : {pulls[method]} tranches / {spent[method]} appels" for method in methods)
+    print(f"[Portefeuille] Répartition du budget : {allocation}")
+    print(f"[Portefeuille] Appels à la Black Box : {calls.calls}, meilleur coût={best_cost}")
+    return best_path, best_cost
@@ -0,0 +1,53 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from blackbox_interface import EvaluationStats, InstrumentedEvaluator
+
+class SolverProfile:
+    """
+    Profil d'exécution d'un solveur : temps passé par phase (génération des chemins,
+    évaluation, gestion interne) et statistiques des appels à la Black Box.
+    """
+    def __init__(self, name=None):
+        """
+        Initialise un profil vide, éventuellement nommé d'après le solveur.
+        """
+        self.name = name
+        self.phase_times = defaultdict(float)
+        self.evaluations = EvaluationStats()
+        self.start_time = time.perf_counter()
+
+    def instrument(self, evaluator, budget=None):
+        """
+        Renvoie un évaluateur qui enregistre chaque évaluation du solveur dans ce profil ;
+        avec le `budget` du solveur, aucun appel à la Black Box ne survit longtemps à sa fin.
+        """
+        return InstrumentedEvaluator(evaluator, self.evaluations, budget)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Chronomètre le bloc `with` et l'ajoute au temps de la phase `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += time.perf_counter() - start
+
+    def add(self, name, seconds):
+        """
+        Ajoute directement `seconds` au temps de la phase `name`.
+        """
+        self.phase_times[name] += seconds
+
+    def summary(self):
+        """
+        Renvoie le profil sous forme de dictionnaire ; le temps non attribué à une phase
+        est compté comme gestion interne (« bookkeeping »).
+        """
+        total = time.perf_counter() - self.start_time
+        phases = dict(self.phase_times)
+        phases["bookkeeping"] = phases.get("bookkeeping", 0.0) + max(0.0, total - sum(phases.values()))
+        return {"name": self.name, "total_time": total, "phases": phases,
+                "evaluations": self.evaluations.summary()}
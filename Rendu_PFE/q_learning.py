@@ -2,8 +2,10 @@ import numpy as np
 import random
 import time
 from tqdm import tqdm
-from blackbox_interface import get_path_cost_with_blackbox
-import networkx as nx
+from blackbox_interface import get_path_cost, get_path_costs
+from graph_utils import CSRGraph, compute_hop_distances
+from anytime import SearchBudget
+from profiling import SolverProfile
 
 class GraphEnvironment:
     """
@@ -12,6 +14,7 @@ class GraphEnvironment:
     def __init__(self, graph, start, goal, seed, blackbox_path):
         """
         Initialise l'environnement du graphe avec la source, la cible et les paramètres nécessaires.
+        `blackbox_path` peut être le chemin du binaire ou un évaluateur (`BlackBoxEvaluator`, ...).
         """
         self.graph = graph
         self.start = start
@@ -23,6 +26,11 @@ class GraphEnvironment:
         self.blackbox_path = blackbox_path
         self.revisit_penalty = 50
         self.overlength_penalty = 100
+        self.last_cost = None
+        # Nombre de sauts restants jusqu'à la cible, calculé une seule fois
+        self.hops_to_goal = compute_hop_distances(graph, goal)
+        # Graphe compact : les actions d'un nœud sont ses arcs sortants, identifiés par un entier
+        self.csr = CSRGraph.from_networkx(graph)
 
     def reset(self):
         """
@@ -40,10 +48,7 @@ class GraphEnvironment:
         if action not in self.graph[self.current_node]:
             raise ValueError(f"Action {action} is not valid from node {self.current_node}")
 
-        try:
-            remaining_hops = nx.shortest_path_length(self.graph, source=action, target=self.goal)
-        except nx.NetworkXNoPath:
-            remaining_hops = float('inf')
+        remaining_hops = self.hops_to_goal[action]
 
         if len(self.path) + remaining_hops > len(self.graph.nodes):
             return self.current_node, -self.overlength_penalty, True
@@ -55,7 +60,8 @@ class GraphEnvironment:
         self.visited_nodes.add(action)
 
         if action == self.goal:
-            cost = get_path_cost_with_blackbox(self.seed, self.path, self.blackbox_path)
+            cost = get_path_cost(self.seed, self.path, self.blackbox_path)
+            self.last_cost = cost
             reward = 1 / cost if cost else -100
             return action, reward, True
 
@@ -64,63 +70,217 @@ class GraphEnvironment:
 
     def get_actions(self, node):
         """
-        Retourne la liste des actions possibles (voisins) depuis un nœud donné.
+        Retourne les actions possibles (voisins) depuis un nœud donné, sans construire de liste.
         """
-        return list(self.graph.neighbors(node))
+        return self.csr.neighbors(node)
 
-def q_learning(env, duration, blackbox_path, alpha=0.2, gamma=0.9, epsilon_start=0.9, epsilon_end=0.1):
+def q_learning(env, duration, blackbox_path, alpha=0.2, gamma=0.9, epsilon_start=0.9, epsilon_end=0.1, trace=None,
+               max_evaluations=None, profile=None, solver_state=None):
     """
     Exécute l'algorithme de Q-Learning sur un environnement de graphe pendant une durée donnée.
+    La table Q est un tableau plat indexé par l'identifiant d'arc de `env.csr` :
+    les valeurs des actions du nœud `u` sont `Q[indptr[u]:indptr[u + 1]]`.
+    Si un `ConvergenceTrace` est fourni, le meilleur chemin évalué en fin d'épisode y est
+    enregistré à chaque amélioration.
+    Le budget est `duration` secondes et/ou `max_evaluations` épisodes évalués par la Black Box ;
+    epsilon décroît avec la fraction consommée du budget. Le temps passé à dérouler les épisodes
+    et à évaluer les chemins est relevé dans `profile` (`SolverProfile`).
+    Avec un `SolverState` (`solver_state`), la table Q est reprise de l'état (démarrage à chaud)
+    et l'état reçoit en fin de run la table Q et le journal des chemins évalués.
     """
-    Q = {node: {action: 0 for action in env.get_actions(node)} for node in env.graph.nodes()}
+    Q = solver_state.warm_array("q", env.csr.num_edges) if solver_state is not None else np.zeros(env.csr.num_edges)
+    best_cost = solver_state.best_cost if solver_state is not None else float('inf')
+    if solver_state is not None and solver_state.best_path is not None and trace is not None:
+        trace.record(0.0, 0, solver_state.best_cost, solver_state.best_path)
+    evaluations = 0
+    indptr = env.csr.indptr.tolist()
+    indices = env.csr.indices
     total_rewards_per_episode = []
-    start_time = time.time()
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Q-Learning")
+    evaluator = env.blackbox_path
+    env.blackbox_path = profile.instrument(evaluator, budget)
 
     with tqdm(desc="Entraînement Q-Learning en cours") as pbar:
-        while time.time() - start_time < duration:
-            epsilon = epsilon_start + (epsilon_end - epsilon_start) * ((time.time() - start_time) / duration)
+        while not budget.exhausted(evaluations):
+            epsilon = epsilon_start + (epsilon_end - epsilon_start) * budget.progress(evaluations)
+            episode_start = time.perf_counter()
+            latency_start = profile.evaluations.total_latency
             state = env.reset()
             done = False
             total_reward = 0
 
             while not done:
-                if not env.get_actions(state):
+                first, last = indptr[state], indptr[state + 1]
+                if first == last:
                     break
 
                 if np.random.rand() < epsilon:
-                    action = random.choice(env.get_actions(state))
+                    edge = random.randrange(first, last)
                 else:
-                    action = max(Q[state], key=Q[state].get, default=random.choice(env.get_actions(state)))
+                    edge = first + int(Q[first:last].argmax())
+                action = int(indices[edge])
 
                 next_state, reward, done = env.step(action)
 
-                if next_state not in Q:
-                    Q[next_state] = {a: 0 for a in env.get_actions(next_state)}
+                if done and next_state == env.goal:
+                    evaluations += 1
+                    if solver_state is not None:
+                        solver_state.record(env.path, env.last_cost)
+                    if env.last_cost is not None and env.last_cost < best_cost:
+                        best_cost = env.last_cost
+                        if trace is not None:
+                            trace.record(budget.elapsed(), evaluations, best_cost, env.path)
 
-                best_next_value = max(Q[next_state].values(), default=0)
-                Q[state][action] += alpha * (reward + gamma * best_next_value - Q[state][action])
+                next_first, next_last = indptr[next_state], indptr[next_state + 1]
+                best_next_value = Q[next_first:next_last].max() if next_last > next_first else 0
+                Q[edge] += alpha * (reward + gamma * best_next_value - Q[edge])
 
                 total_reward += reward
                 state = next_state
 
             total_rewards_per_episode.append(total_reward)
             pbar.update(1)
-    
+            evaluation_time = profile.evaluations.total_latency - latency_start
+            profile.add("evaluation", evaluation_time)
+            profile.add("generation", time.perf_counter() - episode_start - evaluation_time)
+
+    env.blackbox_path = evaluator
+    if solver_state is not None:
+        solver_state.q = Q
+    return Q
+
+def batched_q_learning(env, duration, blackbox_path, num_agents=64, alpha=0.2, gamma=0.9, epsilon_start=0.9,
+                       epsilon_end=0.1, trace=None, max_evaluations=None, profile=None, rng=None, solver_state=None):
+    """
+    Q-Learning multi-agents : `num_agents` épisodes avancent en parallèle (pas synchrones, tableaux NumPy)
+    sur la même table Q indexée par arc, avec les récompenses de `GraphEnvironment`.
+
+    Les récompenses terminales sont différées : à la fin de chaque tour, tous les chemins ayant atteint
+    la cible sont évalués ensemble (`get_path_costs`, donc en parallèle avec un `BlackBoxEvaluator`
+    et dédupliqués par un `CachedEvaluator`), puis toutes les transitions du tour sont appliquées
+    en une passe vectorisée. Plusieurs transitions sur un même arc sont moyennées.
+    Epsilon n'est recalculé qu'une fois par tour, d'après la fraction consommée du budget.
+    Mêmes budget, `trace`, `profile` et `solver_state` que `q_learning` ; renvoie la table Q.
+    """
+    csr = env.csr
+    indptr, indices = csr.indptr, csr.indices
+    num_nodes = csr.num_nodes
+    degrees = np.diff(indptr)
+    hops = env.hops_to_goal
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    Q = solver_state.warm_array("q", csr.num_edges) if solver_state is not None else np.zeros(csr.num_edges)
+    best_cost = solver_state.best_cost if solver_state is not None else float('inf')
+    if solver_state is not None and solver_state.best_path is not None and trace is not None:
+        trace.record(0.0, 0, solver_state.best_cost, solver_state.best_path)
+    evaluations = 0
+    budget = SearchBudget(duration, max_evaluations)
+    profile = profile if profile is not None else SolverProfile("Q-Learning Batch")
+    evaluator = profile.instrument(blackbox_path, budget)
+    agents = np.arange(num_agents)
+
+    with tqdm(desc="Entraînement Q-Learning (lots) en cours") as pbar:
+        while not budget.exhausted(evaluations):
+            epsilon = epsilon_start + (epsilon_end - epsilon_start) * budget.progress(evaluations)
+            with profile.phase("generation"):
+                trail = np.full((num_agents, num_nodes), -1, dtype=np.int64)
+                trail[:, 0] = env.start
+                lengths = np.ones(num_agents, dtype=np.int64)
+                visited = np.zeros((num_agents, num_nodes), dtype=bool)
+                visited[:, env.start] = True
+                current = np.full(num_agents, env.start, dtype=np.int64)
+                active = agents[degrees[current] > 0] if env.start != env.goal else agents[:0]
+                reached = np.zeros(num_agents, dtype=bool)
+                steps = []  # (agents, arcs, récompenses, états suivants) de chaque pas
+
+                while active.size:
+                    first, degree = indptr[current[active]], degrees[current[active]]
+                    # Action gloutonne : premier arc de valeur maximale parmi les arcs sortants
+                    owners = np.repeat(np.arange(active.size), degree)
+                    arcs = np.arange(degree.sum()) - np.repeat(np.cumsum(degree) - degree - first, degree)
+                    maxima = np.maximum.reduceat(Q[arcs], np.cumsum(degree) - degree)
+                    candidates = np.flatnonzero(Q[arcs] == maxima[owners])
+                    greedy = arcs[candidates[np.unique(owners[candidates], return_index=True)[1]]]
+                    explore = rng.random(active.size) < epsilon
+                    edges = np.where(explore, first + (rng.random(active.size) * degree).astype(np.int64), greedy)
+                    actions = indices[edges].astype(np.int64)
+
+                    overlength = lengths[active] + hops[actions] > num_nodes
+                    revisit = ~overlength & visited[active, actions]
+                    moved = ~overlength & ~revisit
+                    rewards = np.where(overlength, -env.overlength_penalty, np.where(revisit, -env.revisit_penalty, 0.0))
+                    movers = active[moved]
+                    trail[movers, lengths[movers]] = actions[moved]
+                    lengths[movers] += 1
+                    visited[movers, actions[moved]] = True
+                    current[movers] = actions[moved]
+                    arrived = moved & (actions == env.goal)
+                    reached[active[arrived]] = True
+                    steps.append((active, edges, rewards.astype(np.float64), current[active].copy()))
+
+                    done = ~moved | arrived | (degrees[current[active]] == 0)
+                    active = active[~done]
+
+            # Évaluation groupée des chemins terminés, dans la limite du budget en évaluations
+            finished = np.flatnonzero(reached)[:int(min(reached.sum(), budget.remaining_evaluations(evaluations)))]
+            paths = [trail[agent, :lengths[agent]].tolist() for agent in finished]
+            with profile.phase("evaluation"):
+                costs = get_path_costs(env.seed, paths, evaluator)
+            terminal_rewards = np.zeros(num_agents)
+            for agent, path, cost in zip(finished, paths, costs):
+                evaluations += 1
+                terminal_rewards[agent] = 1 / cost if cost else -100
+                if solver_state is not None:
+                    solver_state.record(path, cost)
+                if cost is not None and cost < best_cost:
+                    best_cost = cost
+                    if trace is not None:
+                        trace.record(budget.elapsed(), evaluations, best_cost, path)
+            unevaluated = reached.copy()
+            unevaluated[finished] = False
+
+            with profile.phase("update"):
+                step_agents = np.concatenate([step[0] for step in steps]) if steps else agents[:0]
+                step_edges = np.concatenate([step[1] for step in steps]) if steps else agents[:0]
+                step_rewards = np.concatenate([step[2] for step in steps]) if steps else np.zeros(0)
+                step_next = np.concatenate([step[3] for step in steps]) if steps else agents[:0]
+                # La transition qui atteint la cible reçoit la récompense différée de son agent
+                at_goal = step_next == env.goal
+                step_rewards[at_goal] = terminal_rewards[step_agents[at_goal]]
+                keep = ~(at_goal & unevaluated[step_agents])
+                step_edges, step_rewards, step_next = step_edges[keep], step_rewards[keep], step_next[keep]
+
+                node_values = np.zeros(num_nodes)
+                nonempty = degrees > 0
+                if csr.num_edges:
+                    node_values[nonempty] = np.maximum.reduceat(Q, indptr[:-1][nonempty])
+                errors = step_rewards + gamma * node_values[step_next] - Q[step_edges]
+                totals = np.bincount(step_edges, weights=errors, minlength=csr.num_edges)
+                counts = np.bincount(step_edges, minlength=csr.num_edges)
+                updated = counts > 0
+                Q[updated] += alpha * totals[updated] / counts[updated]
+            pbar.update(num_agents)
+
+    if solver_state is not None:
+        solver_state.q = Q
+    print(f"[Q-Learning Batch] Nombre total d'évaluations : {evaluations}, meilleur coût={best_cost}")
     return Q
 
 def evaluate_policy(env, Q, blackbox_path):
     """
     Évalue la politique extraite de la table Q en suivant les actions maximisant la valeur.
     """
+    indptr = env.csr.indptr
     state = env.reset()
     path = [state]
     done = False
 
     while not done:
-        if state not in Q or not Q[state]:
+        first, last = indptr[state], indptr[state + 1]
+        if first == last:
             break
 
-        action = max(Q[state], key=Q[state].get)
+        action = int(env.csr.indices[first + Q[first:last].argmax()])
         if action in path:
             break
 
@@ -129,7 +289,7 @@ def evaluate_policy(env, Q, blackbox_path):
         state = next_state
 
     if state == env.goal:
-        real_cost = get_path_cost_with_blackbox(env.seed, path, blackbox_path)
+        real_cost = get_path_cost(env.seed, path, blackbox_path)
     else:
         real_cost = None
 
@@ -0,0 +1,116 @@
+import numpy as np
+
+class PathBatch:
+    """
+    Lot de chemins de longueurs variables stocké à plat (tableau « ragged ») :
+    le chemin `i` est `nodes[offsets[i]:offsets[i + 1]]`.
+    """
+    def __init__(self, nodes, offsets):
+        """
+        Initialise le lot à partir des nœuds concaténés et des positions de début de chaque chemin.
+        """
+        self.nodes = nodes
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """
+        Renvoie le chemin `i` sous forme de liste d'entiers, comme les générateurs de `monte_carlo`.
+        """
+        return self.nodes[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def lengths(self):
+        """
+        Renvoie le nombre de nœuds de chaque chemin.
+        """
+        return np.diff(self.offsets)
+
+    def to_list(self):
+        """
+        Convertit le lot en liste de listes.
+        """
+        return list(self)
+
+def hop_length_cap(hops, source, max_stretch):
+    """
+    Longueur maximale (en arcs) d'un rollout guidé : `max_stretch` fois le nombre minimal de sauts
+    entre `source` et la cible, tableau `hops` de `compute_hop_distances`.
+    Renvoie 0 si la cible est inaccessible depuis `source` : aucun rollout guidé n'est alors possible.
+    """
+    if not np.isfinite(hops[source]):
+        return 0
+    return max(int(np.ceil(max_stretch * hops[source])), int(hops[source]))
+
+def generate_random_paths(csr, source, target, num_paths, arc_weights=None, rng=None, max_length=None, hops=None):
+    """
+    Génère en un seul appel `num_paths` marches aléatoires simples de `source` vers `target`.
+
+    Toutes les marches avancent en parallèle : à chaque pas, les arcs sortants des marches actives
+    sont rassemblés, ceux qui mènent à un nœud déjà visité (masque par marche) reçoivent un poids nul,
+    puis un arc est tiré par marche proportionnellement à `arc_weights` (uniforme si None).
+    Les marches bloquées ou dépassant `max_length` arcs sont abandonnées, comme le `None`
+    de `generate_random_path` : le lot peut donc contenir moins de `num_paths` chemins.
+    `rng` est un `np.random.Generator` (ou une graine) ; le module `random` n'est pas utilisé.
+    Avec `hops` (distances en sauts vers la cible, voir `hop_length_cap`), seuls les arcs depuis
+    lesquels la cible reste atteignable dans les `max_length` arcs sont tirés : les marches restent
+    bornées et ne s'égarent plus dans les grands graphes peu denses.
+    """
+    rng = np.random.default_rng(rng)
+    indptr, indices = csr.indptr, csr.indices
+    num_nodes = csr.num_nodes
+    max_length = num_nodes - 1 if max_length is None else max_length
+
+    trail = np.full((num_paths, max_length + 1), -1, dtype=np.int32)
+    trail[:, 0] = source
+    lengths = np.ones(num_paths, dtype=np.int64)
+    visited = np.zeros((num_paths, num_nodes), dtype=bool)
+    visited[:, source] = True
+    reached = np.zeros(num_paths, dtype=bool)
+    walks = np.arange(num_paths) if source != target else np.arange(0)
+    reached[:] = source == target
+    current = np.full(walks.size, source, dtype=np.int64)
+
+    for step in range(1, max_length + 1):
+        if not walks.size:
+            break
+        first = indptr[current]
+        degrees = indptr[current + 1] - first
+        ends = np.cumsum(degrees)
+        owners = np.repeat(np.arange(walks.size), degrees)
+        arcs = np.arange(ends[-1] if ends.size else 0) - np.repeat(ends - degrees - first, degrees)
+        neighbors = indices[arcs]
+
+        weights = ~visited[walks[owners], neighbors]
+        if hops is not None:
+            weights &= hops[neighbors] <= max_length - step
+        weights = weights * arc_weights[arcs] if arc_weights is not None else weights.astype(np.float64)
+        cumulative = np.concatenate(([0.0], np.cumsum(weights)))
+        low, high = cumulative[ends - degrees], cumulative[ends]
+        alive = high > low
+
+        draws = low + rng.random(walks.size) * (high - low)
+        picks = np.searchsorted(cumulative, draws, side='right') - 1
+        picks = np.clip(picks, ends - degrees, np.maximum(ends - 1, 0))
+        walks, current, picks = walks[alive], current[alive], picks[alive]
+        if not walks.size:
+            break
+
+        current = neighbors[picks].astype(np.int64)
+        trail[walks, step] = current
+        lengths[walks] += 1
+        visited[walks, current] = True
+
+        done = current == target
+        reached[walks[done]] = True
+        walks, current = walks[~done], current[~done]
+
+    paths = trail[reached]
+    path_lengths = lengths[reached]
+    offsets = np.concatenate(([0], np.cumsum(path_lengths)))
+    nodes = paths[np.arange(paths.shape[1]) < path_lengths[:, None]]
+    return PathBatch(nodes, offsets)
@@ -0,0 +1,124 @@
+from collections import deque
+import numpy as np
+
+class EdgeCostSurrogate:
+    """
+    Modèle de substitution en ligne du coût d'un chemin : coût ≈ somme de contributions par arête.
+
+    Chaque chemin évalué fournit une équation (vecteur d'incidence de ses arêtes, coût observé).
+    Les contributions sont estimées par régression ridge, rappelée vers le coût moyen par arête
+    observé : une arête jamais vue vaut ce coût moyen, un chemin inconnu est donc estimé d'après
+    sa longueur. Le système est résolu par gradient conjugué, repris depuis la solution précédente
+    à chaque nouvelle observation (mise à jour en place, quelques itérations suffisent).
+    Seules les `max_history` dernières observations entrent dans le système : le coût d'une mise
+    à jour reste borné quelle que soit la durée du run (les contributions apprises avant sont
+    conservées par le démarrage à chaud).
+
+    Le modèle sert à trier des rollouts candidats pour n'envoyer à la Black Box que les plus prometteurs.
+    """
+    def __init__(self, csr, regularization=1.0, symmetric=True, min_observations=20, solver_iterations=10,
+                 max_history=1000):
+        """
+        Initialise le modèle pour le graphe `csr` (`CSRGraph`).
+        Avec `symmetric`, les arcs (u, v) et (v, u) partagent la même contribution.
+        Tant que moins de `min_observations` coûts sont connus, aucun candidat n'est écarté.
+        """
+        self.csr = csr
+        self.regularization = regularization
+        self.min_observations = min_observations
+        self.solver_iterations = solver_iterations
+        arcs = np.arange(csr.num_edges)
+        if symmetric:
+            sources = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+            reverse = csr.edge_ids(csr.indices, sources)
+            arcs = np.where(reverse >= 0, np.minimum(arcs, reverse), arcs)
+        self.arc_features = arcs
+        self.weights = np.zeros(csr.num_edges)
+        self.prior = 0.0
+        self.seen = set()
+        self._features = deque(maxlen=max_history)
+        self._lengths = deque(maxlen=max_history)
+        self._costs = deque(maxlen=max_history)
+        self._stale = False
+
+    def __len__(self):
+        return len(self._costs)
+
+    def features(self, path):
+        """
+        Renvoie les indices de contributions utilisés par un chemin.
+        """
+        return self.arc_features[self.csr.path_edges(path)]
+
+    def update(self, path, cost):
+        """
+        Ajoute une observation (chemin, coût) ; les coûts None (erreurs) sont ignorés.
+        """
+        self.seen.add(tuple(path))
+        if cost is None:
+            return
+        self._features.append(self.features(path))
+        self._lengths.append(len(path) - 1)
+        self._costs.append(cost)
+        self._stale = True
+
+    def _fit(self):
+        """
+        Résout (XᵀX + λI) δ = Xᵀ(y - X·prior) par gradient conjugué, en repartant de la solution courante.
+        """
+        features = np.concatenate(self._features)
+        lengths = np.asarray(self._lengths)
+        costs = np.asarray(self._costs)
+        self.prior = costs.sum() / max(lengths.sum(), 1)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        nonempty = lengths > 0
+
+        def apply(delta):
+            # (XᵀX + λI) δ, X étant la matrice d'incidence creuse chemins × arêtes
+            sums = np.zeros(len(lengths))
+            sums[nonempty] = np.add.reduceat(delta[features], starts[nonempty]) if features.size else 0.0
+            return np.bincount(features, weights=np.repeat(sums, lengths),
+                               minlength=delta.size) + self.regularization * delta
+
+        residual_costs = costs - self.prior * lengths
+        rhs = np.bincount(features, weights=np.repeat(residual_costs, lengths), minlength=self.weights.size)
+        delta = self.weights
+        residual = rhs - apply(delta)
+        direction = residual.copy()
+        norm = residual @ residual
+        for _ in range(self.solver_iterations):
+            if norm < 1e-18:
+                break
+            product = apply(direction)
+            step = norm / (direction @ product)
+            delta = delta + step * direction
+            residual = residual - step * product
+            new_norm = residual @ residual
+            direction = residual + (new_norm / norm) * direction
+            norm = new_norm
+        self.weights = delta
+        self._stale = False
+
+    def predict(self, paths):
+        """
+        Renvoie le coût estimé de chaque chemin.
+        """
+        if self._stale:
+            self._fit()
+        return np.array([self.prior * (len(path) - 1) + self.weights[self.features(path)].sum() for path in paths])
+
+    def screen(self, paths, keep):
+        """
+        Renvoie les `keep` chemins jugés les plus prometteurs, sans ceux déjà observés.
+        Tant que le modèle a trop peu d'observations, les premiers chemins sont renvoyés tels quels.
+        """
+        fresh, keys = [], set()
+        for path in paths:
+            key = tuple(path)
+            if key not in self.seen and key not in keys:
+                keys.add(key)
+                fresh.append(path)
+        if len(self) < self.min_observations or len(fresh) <= keep:
+            return fresh[:keep]
+        order = np.argsort(self.predict(fresh), kind='stable')
+        return [fresh[i] for i in order[:keep]]
@@ -0,0 +1,40 @@
+import random
+
+import networkx as nx
+
+from baseline import baseline_method
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+
+def test_single_neighbor_steps_only_evaluate_the_final_path(counting_oracle):
+    oracle = counting_oracle()
+    path, cost = baseline_method(nx.path_graph(6), 0, 5, 0, oracle)
+    assert path == [0, 1, 2, 3, 4, 5]
+    assert oracle.paths == [(0, 1, 2, 3, 4, 5)]
+    assert cost == LocalBlackBox()(0, path)
+
+def test_beam_search_returns_its_best_evaluated_simple_path(counting_oracle):
+    graph = generate_connected_graph(60, 0.1, seed=5)
+    oracle = counting_oracle()
+    random.seed(0)
+    path, cost = baseline_method(graph, 0, 59, 0, oracle, max_stretch=2.0, beam_width=4, completions=2)
+    assert path[0] == 0 and path[-1] == 59 and len(set(path)) == len(path)
+    assert all(graph.has_edge(u, v) for u, v in zip(path[:-1], path[1:]))
+    assert cost == min(LocalBlackBox()(0, list(evaluated)) for evaluated in oracle.paths)
+    assert len(oracle.paths) == len(set(oracle.paths))
+
+def test_narrow_beam_stops_like_the_greedy_method(counting_oracle):
+    graph = generate_connected_graph(100, 0.3, seed=1)
+    greedy, beam = counting_oracle(), counting_oracle()
+    random.seed(0)
+    baseline_method(graph, 0, 99, 0, greedy, max_stretch=2.0)
+    random.seed(0)
+    path, cost = baseline_method(graph, 0, 99, 0, beam, max_stretch=2.0, beam_width=1)
+    assert path[-1] == 99 and len(beam.paths) <= 3 * len(greedy.paths)
+
+def test_beam_search_respects_its_budget(counting_oracle):
+    graph = generate_connected_graph(100, 0.3, seed=1)
+    oracle = counting_oracle()
+    random.seed(0)
+    path, cost = baseline_method(graph, 0, 99, 0, oracle, beam_width=8, completions=4, max_evaluations=50)
+    assert len(oracle.paths) == 50 and cost == min(LocalBlackBox()(0, list(evaluated)) for evaluated in oracle.paths)
@@ -0,0 +1,21 @@
+from benchmark import benchmark_cases, compare_reports, run_case
+
+def test_case_reports_throughput_and_time_to_target():
+    case, = benchmark_cases(sizes=[30], densities=[0.2], methods=["Monte Carlo"], max_evaluations=300, duration=30)
+    result = run_case(case)
+    assert result["evaluations"] == 300
+    assert result["evaluations_per_second"] > 0 and result["overhead_cpu_per_evaluation"] >= 0
+    assert result["best_cost"] >= result["reference_cost"] * 0.5
+    if result["evaluations_to_target"] is not None:
+        assert result["evaluations_to_target"] <= 300 and result["time_to_target"] <= result["wall_time"]
+    # Instances et graines fixes : le même cas donne le même résultat
+    assert run_case(case)["best_cost"] == result["best_cost"]
+
+def test_compare_flags_regressions():
+    before = {"num_nodes": 50, "density": 0.2, "method": "MCTS", "evaluations_per_second": 1000.0,
+              "overhead_cpu_per_evaluation": 1e-3, "peak_memory_mb": 100.0, "evaluations_to_target": 200}
+    after = dict(before, evaluations_per_second=600.0, evaluations_to_target=None)
+    regressions = compare_reports({"results": [before]}, {"results": [after]}, threshold=0.25)
+    assert {regression["metric"] for regression in regressions} == {"evaluations_per_second",
+                                                                    "evaluations_to_target"}
+    assert compare_reports({"results": [before]}, {"results": [dict(before, peak_memory_mb=110.0)]}) == []
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+from anytime import SearchBudget
+from blackbox_interface import (
+    LOCAL_SERVE_COMMAND,
+    EvaluationStats,
+    InstrumentedEvaluator,
+    PersistentEvaluator,
+    get_path_cost_async,
+    get_path_cost_with_blackbox,
+    get_path_cost_with_blackbox_async,
+    get_path_costs
+)
+from local_blackbox import LocalBlackBox
+
+def random_paths(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 100, rng.integers(1, 20)).tolist() for _ in range(count)]
+
+def test_persistent_workers_match_the_oracle():
+    oracle, paths = LocalBlackBox(), random_paths(300)
+    with PersistentEvaluator(LOCAL_SERVE_COMMAND, max_workers=2) as evaluator:
+        assert get_path_costs(7, paths, evaluator) == [oracle(7, path) for path in paths]
+        assert evaluator.evaluate(7, paths[0]) == oracle(7, paths[0])
+        assert evaluator.submit(7, paths[1]).result() == oracle(7, paths[1])
+
+def test_dead_worker_is_restarted():
+    oracle, paths = LocalBlackBox(), random_paths(10)
+    with PersistentEvaluator(LOCAL_SERVE_COMMAND, max_workers=1, retries=0) as evaluator:
+        process = evaluator._processes.queue[0]
+        process.kill()
+        process.wait()
+        # Les chemins du bloc interrompu sont perdus (pas de `fallback`), le worker relancé prend la suite
+        assert evaluator.evaluate_batch(3, paths) == [None] * len(paths)
+        assert evaluator.restarts == 1
+        assert evaluator.evaluate_batch(3, paths) == [oracle(3, path) for path in paths]
+
+def test_retry_replaces_a_dead_worker():
+    oracle, paths, stats = LocalBlackBox(), random_paths(10), EvaluationStats()
+    with PersistentEvaluator(LOCAL_SERVE_COMMAND, max_workers=1, retries=1) as evaluator:
+        process = evaluator._processes.queue[0]
+        process.kill()
+        process.wait()
+        assert evaluator.evaluate_batch(3, paths, stats=stats) == [oracle(3, path) for path in paths]
+        assert stats.failure_kinds == {"exit": 1} and stats.retries == 1
+
+def test_stuck_worker_is_killed_at_the_deadline():
+    stats = EvaluationStats()
+    hanging = [sys.executable, "-c", "import time; time.sleep(60)"]
+    with PersistentEvaluator(hanging, max_workers=1, retries=1, backoff=0.0) as evaluator:
+        start = time.monotonic()
+        assert evaluator.evaluate(0, [1, 2], deadline=start + 0.3, stats=stats) is None
+        assert time.monotonic() - start < 5
+        assert stats.failure_kinds["timeout"] >= 1 and evaluator.restarts >= 1
+
+def test_wrapped_worker_is_killed_with_its_children():
+    # Le worker est un shell qui lance un petit-enfant : tuer le seul shell laisserait le tube ouvert
+    wrapper = ["sh", "-c", "sleep 60; :"]
+    with PersistentEvaluator(wrapper, max_workers=1, timeout=0.3, retries=0) as evaluator:
+        start = time.monotonic()
+        assert evaluator.evaluate(0, [1, 2]) is None
+        assert time.monotonic() - start < 5
+
+def fake_blackbox(tmp_path, body):
+    script = tmp_path / "blackbox.py"
+    script.write_text(f"#!{sys.executable}\n{body}\n")
+    os.chmod(script, 0o755)
+    return str(script)
+
+def test_one_shot_failures_are_counted_by_type(tmp_path):
+    stats = EvaluationStats()
+    garbage = fake_blackbox(tmp_path, "print('erreur')")
+    assert get_path_cost_with_blackbox(0, [1, 2], garbage, retries=2, backoff=0.0, stats=stats) is None
+    assert stats.failure_kinds == {"parse": 3} and stats.retries == 2
+
+    stats = EvaluationStats()
+    slow = fake_blackbox(tmp_path, "import time; time.sleep(60)")
+    start = time.monotonic()
+    assert get_path_cost_with_blackbox(0, [1, 2], slow, timeout=0.2, retries=1, backoff=0.0, stats=stats) is None
+    assert time.monotonic() - start < 5
+    assert stats.failure_kinds == {"timeout": 2}
+
+    wrapped = fake_blackbox(tmp_path, "import subprocess; subprocess.run(['sleep', '60'])")
+    start = time.monotonic()
+    assert get_path_cost_with_blackbox(0, [1, 2], wrapped, timeout=0.2, retries=0) is None
+    assert time.monotonic() - start < 5
+    assert stats.summary()["failure_kinds"] == {"timeout": 2}
+
+def test_async_calls_go_through_the_watchdog(tmp_path):
+    stats = EvaluationStats()
+    hanging = fake_blackbox(tmp_path, "import subprocess; subprocess.run(['sleep', '60'])")
+    start = time.monotonic()
+    cost = asyncio.run(get_path_cost_with_blackbox_async(0, [1, 2], hanging, timeout=0.2, retries=1, backoff=0.0,
+                                                         stats=stats))
+    assert cost is None and time.monotonic() - start < 5
+    assert stats.failure_kinds == {"timeout": 2} and stats.retries == 1
+
+    # Sans délai par appel, c'est la fin du budget (plus le délai de grâce) qui arrête l'oracle bloqué
+    evaluator = InstrumentedEvaluator(hanging, budget=SearchBudget(duration=0.2))
+    start = time.monotonic()
+    assert asyncio.run(evaluator.evaluate_async(0, [1, 2])) is None
+    assert time.monotonic() - start < 5
+    assert evaluator.stats.failure_kinds == {"timeout": 1} and evaluator.stats.failures == 1
+
+    stats = EvaluationStats()
+    garbage = fake_blackbox(tmp_path, "print('erreur')")
+    assert asyncio.run(get_path_cost_async(0, [1, 2], garbage, stats=stats)) is None
+    assert stats.failure_kinds == {"parse": 3} and stats.retries == 2
@@ -0,0 +1,32 @@
+import multiprocessing
+
+from cost_cache import PathCostCache
+
+def share_costs(db_path, worker, barrier, found):
+    # Chaque processus écrit ses coûts (plus une partie commune) puis relit ceux de l'autre
+    cache = PathCostCache(db_path=db_path, flush_every=7)
+    barrier.wait()
+    for i in range(300):
+        cache.put(0, [worker, i], float(i))
+        cache.put(0, [2, i], float(i))
+    cache.flush()
+    barrier.wait()
+    other = 1 - worker
+    found.put(sum(cache.get(0, [other, i]) == float(i) for i in range(300)))
+    cache.close()
+
+def test_processes_share_one_database(tmp_path):
+    db_path = str(tmp_path / "costs.sqlite")
+    barrier, found = multiprocessing.Barrier(2), multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=share_costs, args=(db_path, worker, barrier, found)) for worker in (0, 1)]
+    for worker in workers:
+        worker.start()
+    counts = [found.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+    assert [worker.exitcode for worker in workers] == [0, 0]
+    assert counts == [300, 300]
+    cache = PathCostCache(db_path=db_path)
+    assert all(cache.get(0, [node, i]) == float(i) for node in (0, 1, 2) for i in range(300))
+    assert cache.stats()["hits"] == 900
+    cache.close()
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import numpy as np
+
+from blackbox_interface import EvaluationStats
+from eval_server import EvaluationServer, RemoteEvaluator
+from local_blackbox import LocalBlackBox
+
+def test_clients_share_one_cache_and_are_accounted_separately(counting_oracle):
+    oracle = counting_oracle()
+    rng = np.random.default_rng(0)
+    paths = [rng.integers(0, 50, rng.integers(2, 15)).tolist() for _ in range(200)]
+    expected = [LocalBlackBox()(4, path) for path in paths]
+    results = {}
+    with EvaluationServer(oracle) as server:
+        def run(name):
+            with RemoteEvaluator(server.url, client=name, max_workers=4) as client:
+                results[name] = (client.evaluate_batch(4, paths),
+                                 [future.result() for future in [client.submit(4, path) for path in paths[:20]]])
+        threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = server.stats()
+    for name in ("a", "b"):
+        assert results[name] == (expected, expected[:20])
+        assert stats["clients"][name]["paths"] == 220
+    # Chaque chemin distinct n'est évalué qu'une fois, quel que soit le nombre de clients
+    assert oracle.calls == len({tuple(path) for path in paths})
+    assert sum(client["cache_hits"] for client in stats["clients"].values()) >= 40
+
+def test_hanging_server_is_cut_off_by_the_watchdog():
+    def slow_oracle(seed, path):
+        time.sleep(1.0)
+        return float(len(path))
+
+    stats = EvaluationStats()
+    with EvaluationServer(slow_oracle) as server:
+        with RemoteEvaluator(server.url, max_workers=1, timeout=0.2, retries=1, backoff=0.0) as client:
+            start = time.monotonic()
+            assert client.evaluate_batch(0, [[1, 2, 3]], stats=stats) == [None]
+            assert time.monotonic() - start < 1.0
+            assert stats.failure_kinds == {"timeout": 2} and stats.retries == 1
+            # La deadline du solveur l'emporte sur un délai par requête plus long
+            client.timeout = 60
+            start = time.monotonic()
+            assert client.evaluate(0, [4, 5], deadline=time.monotonic() + 0.2) is None
+            assert time.monotonic() - start < 1.0
+            # L'évaluation abandonnée par le client termine quand même dans le cache du serveur
+            assert client.evaluate(0, [1, 2, 3]) == 3.0
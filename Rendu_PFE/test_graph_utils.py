@@ -0,0 +1,40 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+
+from graph_utils import CSRGraph, generate_connected_graph, sample_gnp_edges
+
+def test_sample_gnp_edges_decodes_every_pair():
+    for num_nodes in (2, 3, 10, 57):
+        edges = sample_gnp_edges(num_nodes, 1.0, np.random.default_rng(0))
+        assert sorted(map(tuple, edges.tolist())) == list(itertools.combinations(range(num_nodes), 2))
+
+def test_sample_gnp_edges_are_unique_ordered_and_dense_enough():
+    num_nodes, probability = 400, 0.05
+    edges = sample_gnp_edges(num_nodes, probability, np.random.default_rng(0))
+    assert (edges[:, 0] < edges[:, 1]).all()
+    assert edges.min() >= 0 and edges.max() < num_nodes
+    assert len(set(map(tuple, edges.tolist()))) == len(edges)
+    expected = probability * num_nodes * (num_nodes - 1) / 2
+    assert abs(len(edges) - expected) < 4 * np.sqrt(expected)
+
+def test_sample_gnp_edges_empty_cases():
+    rng = np.random.default_rng(0)
+    assert sample_gnp_edges(50, 0.0, rng).shape == (0, 2)
+    assert sample_gnp_edges(1, 0.5, rng).shape == (0, 2)
+
+def test_generated_graph_is_connected_and_reproducible(tmp_path):
+    graph = generate_connected_graph(500, 0.002, seed=7)
+    assert nx.is_connected(graph) and graph.number_of_nodes() == 500
+    cached = generate_connected_graph(500, 0.002, seed=7, cache_dir=tmp_path)
+    reloaded = generate_connected_graph(500, 0.002, seed=7, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert sorted(graph.edges()) == sorted(cached.edges()) == sorted(reloaded.edges())
+
+def test_edge_ids_match_edge_id():
+    graph = generate_connected_graph(40, 0.2, seed=3)
+    csr = CSRGraph.from_networkx(graph)
+    pairs = np.array(list(itertools.product(range(40), repeat=2)))
+    expected = [csr.edge_id(u, v) for u, v in pairs]
+    assert csr.edge_ids(pairs[:, 0], pairs[:, 1]).tolist() == expected
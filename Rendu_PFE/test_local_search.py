@@ -0,0 +1,33 @@
+import random
+
+import networkx as nx
+
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from local_search import PathNeighborhood, local_search, remove_loops
+
+def test_remove_loops():
+    assert remove_loops([0, 1, 2, 1, 3]) == [0, 1, 3]
+    assert remove_loops([0, 1, 2, 3, 1, 4, 2, 5]) == [0, 1, 4, 2, 5]
+    assert remove_loops([0, 1, 2]) == [0, 1, 2]
+
+def test_moves_are_simple_paths_of_the_graph():
+    graph = generate_connected_graph(50, 0.1, seed=8)
+    path = remove_loops(nx.shortest_path(graph, 0, 25) + nx.shortest_path(graph, 25, 49)[1:])
+    for move in PathNeighborhood(graph, rng=0).moves(path, 200):
+        assert move[0] == 0 and move[-1] == 49 and len(set(move)) == len(move)
+        assert all(graph.has_edge(u, v) for u, v in zip(move[:-1], move[1:]))
+
+def test_local_search_only_improves_and_never_reevaluates():
+    graph = generate_connected_graph(60, 0.08, seed=9)
+    oracle, seen = LocalBlackBox(), []
+
+    def counting(seed, path):
+        seen.append(tuple(path))
+        return oracle(seed, path)
+
+    start = nx.shortest_path(graph, 0, 59)
+    random.seed(0)
+    path, cost = local_search(graph, start, 0, counting, cost=oracle(0, start), max_evaluations=300)
+    assert cost <= oracle(0, start) and cost == oracle(0, path)
+    assert len(seen) == len(set(seen)) <= 300 and tuple(start) not in seen
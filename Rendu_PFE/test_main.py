@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+from blackbox_interface import LOCAL_SERVE_COMMAND
+from experiments import cell_seed
+from main import build_parser, main, resolve_evaluator
+
+def test_solver_modules_do_not_import_matplotlib():
+    code = "import sys, main, experiments, graph_utils, benchmark; print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip() == "False"
+
+def test_cli_settings():
+    args = build_parser().parse_args(["sweep", "--sizes", "30", "--evaluations", "100", "200", "--blackbox", "serve"])
+    assert args.sizes == [30] and args.evaluations == [100, 200] and args.graphs == 2
+    assert resolve_evaluator(args.blackbox) == (LOCAL_SERVE_COMMAND, "path_costs_local.sqlite")
+    assert resolve_evaluator("http://localhost:8765") == ("http://localhost:8765", None)
+    assert resolve_evaluator("introuvable.exe") == (None, "path_costs_local.sqlite")
+
+def test_seed_selects_the_instances(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    main(["solve", "--nodes", "20", "--density", "0.3", "--evaluations", "20", "--blackbox", "local", "--seed", "3"])
+    record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert record["graph_seed"] == cell_seed(3, 20, 0.3, 0)
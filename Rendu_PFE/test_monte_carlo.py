@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from anytime import ConvergenceTrace
+from checkpoint import SolverState
+from experiments import build_cells, checkpoint_file, solve_cell
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from monte_carlo import TranspositionTable, monte_carlo_tree_search, monte_carlo_with_nested_rollouts
+
+def test_mcts_returns_a_valid_path_and_never_reevaluates(counting_oracle):
+    graph = generate_connected_graph(40, 0.15, seed=2)
+    oracle = counting_oracle()
+    random.seed(0)
+    path, cost = monte_carlo_tree_search(graph, 0, 39, None, 0, oracle, max_evaluations=300)
+    assert path[0] == 0 and path[-1] == 39 and len(set(path)) == len(path)
+    assert all(graph.has_edge(u, v) for u, v in zip(path[:-1], path[1:]))
+    assert cost == LocalBlackBox()(0, path)
+    assert len(oracle.paths) == len(set(oracle.paths)) <= 300
+
+def test_nrpa_improves_on_its_first_rollout(counting_oracle):
+    graph = generate_connected_graph(50, 0.1, seed=3)
+    oracle, trace = counting_oracle(), ConvergenceTrace()
+    random.seed(0)
+    # Sans biais vers la cible, le premier rollout est une marche aléatoire : l'adaptation doit faire mieux
+    path, cost = monte_carlo_with_nested_rollouts(graph, 0, 49, None, 0, oracle, trace=trace, max_evaluations=200,
+                                                  prior_weight=0.0)
+    assert trace.evaluations[0] == 1 and cost < trace.costs[0] / 2
+    assert cost == LocalBlackBox()(0, path)
+    assert len(oracle.paths) == len(set(oracle.paths)) <= 200
+
+def test_tree_grows_across_budget_extensions():
+    graph = generate_connected_graph(40, 0.15, seed=3)
+    table = TranspositionTable(40)
+    random.seed(0)
+    monte_carlo_tree_search(graph, 0, 39, None, 0, LocalBlackBox(), max_evaluations=100, table=table)
+    size, root_visits = len(table), table.visits[0]
+    monte_carlo_tree_search(graph, 0, 39, None, 0, LocalBlackBox(), max_evaluations=100, table=table)
+    assert len(table) > size and table.visits[0] > root_visits
+
+def test_tree_survives_a_checkpoint(tmp_path):
+    graph = generate_connected_graph(30, 0.2, seed=4)
+    state = SolverState()
+    random.seed(0)
+    monte_carlo_tree_search(graph, 0, 29, None, 0, LocalBlackBox(), max_evaluations=50, solver_state=state)
+    state.save(str(tmp_path / "mcts.npz"))
+    restored = TranspositionTable.from_arrays(30, SolverState.load(str(tmp_path / "mcts.npz")).tree)
+    original = TranspositionTable.from_arrays(30, state.tree)
+    assert restored.index == original.index
+    assert (restored.visits[:len(restored)] == original.visits[:len(original)]).all()
+
+def test_resumed_cell_only_spends_the_remaining_budget(tmp_path):
+    def cell(evaluation_budgets, seed=0):
+        return build_cells([30], [0.2], None, 1, seed, methods=["Monte Carlo"], evaluation_budgets=evaluation_budgets,
+                           checkpoint_dir=str(tmp_path))[0]
+
+    first = solve_cell(cell([100]))
+    state = SolverState.load(checkpoint_file(cell([100])))
+    assert state.seed == 0 and state.evaluations == 100 and state.elapsed > 0
+
+    resumed = solve_cell(cell([100, 200]))
+    assert resumed[0]["profile"]["evaluations"]["calls"] == 100
+    # Le résultat à 100 évaluations est celui du premier run, l'historique continue après lui
+    assert resumed[0]["cost"] == first[0]["cost"] and resumed[1]["cost"] <= first[0]["cost"]
+    state = SolverState.load(checkpoint_file(cell([100])))
+    assert state.evaluations == 200 and min(state.trace.evaluations) <= 100
+
+    # Budget déjà consommé : rien n'est réévalué
+    again = solve_cell(cell([200]))
+    assert again[0]["profile"]["evaluations"]["calls"] == 0 and again[0]["cost"] == resumed[1]["cost"]
+
+    assert checkpoint_file(cell([100], seed=1)) != checkpoint_file(cell([100]))
+    with pytest.raises(ValueError):
+        SolverState.load_or_create(checkpoint_file(cell([100])), seed=1)
@@ -0,0 +1,31 @@
+import random
+
+import numpy as np
+
+from anytime import ConvergenceTrace
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from portfolio import PORTFOLIO_ARMS, portfolio_search
+
+def test_portfolio_shares_one_budget_and_one_cache(counting_oracle):
+    graph = generate_connected_graph(30, 0.2, seed=6)
+    oracle, trace = counting_oracle(), ConvergenceTrace()
+    random.seed(0)
+    np.random.seed(0)
+    path, cost = portfolio_search(graph, 0, 29, None, 0, oracle, max_evaluations=600, slice_evaluations=50,
+                                  trace=trace)
+    assert len(oracle.paths) <= 600
+    # Cache partagé : aucun chemin n'est envoyé deux fois à la Black Box, quelle que soit la méthode
+    assert len(oracle.paths) == len(set(oracle.paths))
+    assert path[0] == 0 and path[-1] == 29 and cost == LocalBlackBox()(0, path)
+    assert trace.best_within_evaluations(600) == (path, cost)
+
+def test_every_arm_gets_a_slice(capsys):
+    graph = generate_connected_graph(40, 0.2, seed=7)
+    random.seed(0)
+    np.random.seed(0)
+    portfolio_search(graph, 0, 39, None, 0, LocalBlackBox(), max_evaluations=len(PORTFOLIO_ARMS) * 40,
+                     slice_evaluations=20)
+    allocation = [line for line in capsys.readouterr().out.splitlines() if "Répartition" in line][0]
+    for method in PORTFOLIO_ARMS:
+        assert f"{method} : 0 tranches" not in allocation
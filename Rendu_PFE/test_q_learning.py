@@ -0,0 +1,17 @@
+import numpy as np
+
+from graph_utils import generate_connected_graph
+from local_blackbox import LocalBlackBox
+from q_learning import GraphEnvironment, batched_q_learning, q_learning
+
+def test_vectorized_update_matches_the_single_agent_update():
+    # Politique gloutonne (epsilon nul) : les épisodes sont déterministes, les deux versions voient les mêmes transitions
+    for graph_seed in range(3):
+        graph = generate_connected_graph(8, 0.5, seed=graph_seed)
+        env = GraphEnvironment(graph, 0, 7, 0, LocalBlackBox())
+        single = q_learning(env, None, LocalBlackBox(), epsilon_start=0.0, epsilon_end=0.0, max_evaluations=20)
+        for num_agents in (1, 4):
+            # Des agents identiques font les mêmes transitions : leur moyenne est la mise à jour d'un seul agent
+            batched = batched_q_learning(env, None, LocalBlackBox(), num_agents=num_agents, epsilon_start=0.0,
+                                         epsilon_end=0.0, max_evaluations=20 * num_agents)
+            assert np.abs(single).sum() > 0 and np.allclose(batched, single)
@@ -0,0 +1,51 @@
+import networkx as nx
+import numpy as np
+
+from graph_utils import CSRGraph, compute_hop_distances, generate_connected_graph
+from rollouts import generate_random_paths, hop_length_cap
+
+def check_walks(graph, batch, source, target, max_length=None):
+    """
+    Vérifie que chaque chemin du lot est simple, suit des arêtes du graphe et relie source et cible.
+    """
+    for path in batch:
+        assert path[0] == source and path[-1] == target
+        assert len(set(path)) == len(path)
+        assert all(graph.has_edge(u, v) for u, v in zip(path[:-1], path[1:]))
+        if max_length is not None:
+            assert len(path) - 1 <= max_length
+
+def test_paths_are_simple_contiguous_and_reach_target():
+    graph = generate_connected_graph(60, 0.1, seed=1)
+    csr = CSRGraph.from_networkx(graph)
+    batch = generate_random_paths(csr, 0, 59, 200, rng=0)
+    assert 0 < len(batch) <= 200
+    assert list(batch.lengths()) == [len(path) for path in batch]
+    check_walks(graph, batch, 0, 59)
+
+def test_arc_weights_restrict_choices():
+    graph = nx.cycle_graph(8)
+    csr = CSRGraph.from_networkx(graph)
+    # Poids nul sur l'arc 0 -> 7 : toutes les marches partent par 1 et suivent le cycle
+    weights = np.ones(csr.num_edges)
+    weights[csr.edge_id(0, 7)] = 0.0
+    batch = generate_random_paths(csr, 0, 4, 50, arc_weights=weights, rng=0)
+    assert len(batch) == 50
+    assert all(path == [0, 1, 2, 3, 4] for path in batch)
+
+def test_hop_guided_walks_respect_length_cap():
+    graph = generate_connected_graph(300, 0.01, seed=2)
+    csr = CSRGraph.from_networkx(graph)
+    hops = compute_hop_distances(graph, 299)
+    max_length = hop_length_cap(hops, 0, 1.5)
+    batch = generate_random_paths(csr, 0, 299, 100, rng=0, max_length=max_length, hops=hops)
+    # Une marche simple peut encore se bloquer (voisins utiles déjà visités), mais jamais dépasser la borne
+    assert 0 < len(batch) <= 100
+    check_walks(graph, batch, 0, 299, max_length)
+
+def test_unreachable_target_gives_empty_batch():
+    graph = nx.Graph([(0, 1), (2, 3)])
+    csr = CSRGraph.from_networkx(graph)
+    hops = compute_hop_distances(graph, 3)
+    assert hop_length_cap(hops, 0, 2.0) == 0
+    assert len(generate_random_paths(csr, 0, 3, 10, rng=0)) == 0
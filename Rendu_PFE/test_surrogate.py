@@ -0,0 +1,33 @@
+import numpy as np
+
+from graph_utils import CSRGraph, generate_connected_graph
+from rollouts import generate_random_paths
+from surrogate import EdgeCostSurrogate
+
+def additive_instance(num_nodes, density, seed=0):
+    # Graphe dont le coût d'un chemin est exactement la somme de coûts d'arêtes connus
+    csr = CSRGraph.from_networkx(generate_connected_graph(num_nodes, density, seed=seed))
+    rng = np.random.default_rng(seed)
+    arc_costs = rng.uniform(0.01, 0.1, csr.num_edges)[EdgeCostSurrogate(csr).arc_features]
+    return csr, rng, lambda path: arc_costs[csr.path_edges(path)].sum()
+
+def distinct_paths(csr, target, count, rng):
+    return list({tuple(path): path for path in generate_random_paths(csr, 0, target, count, rng=rng).to_list()}.values())
+
+def test_ridge_fit_recovers_additive_costs():
+    csr, rng, cost = additive_instance(20, 0.3)
+    model = EdgeCostSurrogate(csr, regularization=1e-3, solver_iterations=200, max_history=5000)
+    for path in distinct_paths(csr, 19, 2000, rng):
+        model.update(path, cost(path))
+    held_out = distinct_paths(csr, 19, 200, rng)
+    assert np.allclose(model.predict(held_out), [cost(path) for path in held_out], atol=1e-4)
+
+def test_screening_drops_obviously_bad_paths():
+    csr, rng, cost = additive_instance(40, 0.2)
+    model = EdgeCostSurrogate(csr)
+    for path in distinct_paths(csr, 39, 300, rng):
+        model.update(path, cost(path))
+    candidates = sorted((path for path in distinct_paths(csr, 39, 400, rng) if tuple(path) not in model.seen), key=cost)
+    good, bad = candidates[:5], candidates[-100:]
+    kept = model.screen(bad + good, 5)
+    assert sorted(map(tuple, kept)) == sorted(map(tuple, good))